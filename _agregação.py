@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Agregação das estatísticas dos livros em totais por autor e do
+conjunto de todos os livros, por redução em árvore: a cada nível, os
+itens de cada grupo são combinados dois a dois, de forma que as
+combinações de um mesmo nível sejam independentes e possam ser
+executadas em paralelo em um concurrent.futures.ProcessPoolExecutor,
+em log2 do número de livros níveis.
+
+A combinação de Estatísticas é associativa e comutativa (ver
+_estatísticas), de forma que o resultado não depende da ordem dos
+pares; somente os tokens mantidos pelos resumos dos modos resumido e
+aproximado (ver _resumo_tokens) podem depender dela, sempre dentro
+dos limites de erro do resumo.
+"""
+
+from _transporte import desempacota_estatísticas, empacota_estatísticas
+
+
+def agrupa_por_autor(estatísticas_por_livro):
+    """Agrupa as estatísticas dos livros por autor.
+
+    Args:
+        estatísticas_por_livro: dict cujas chaves são tuplas
+                                (nome do livro, nome do autor) e
+                                cujos respectivos valores são
+                                instâncias de Estatísticas obtidas de
+                                cada livro.
+
+    Returns:
+        Instância de dict cujas chaves são os nomes dos autores e
+        cujos respectivos valores são list das Estatísticas de cada
+        livro do autor, em ordem de nome do livro.
+    """
+    por_autor = {}
+    for nome_livro, nome_autor in sorted(estatísticas_por_livro,
+                                         key=lambda tupla: tupla[::-1]):
+        por_autor.setdefault(nome_autor, []).append(
+            estatísticas_por_livro[(nome_livro, nome_autor)])
+    return por_autor
+
+
+def divide_nível(grupos):
+    """Divide um nível da redução em árvore em pares a serem
+       combinados.
+
+    Args:
+        grupos: dict cujas chaves identificam os grupos e cujos
+                respectivos valores são list dos itens do nível.
+
+    Returns:
+        Tupla (list de tuplas (chave, item, item) dos pares a serem
+        combinados, dict de cada chave para a list dos itens que passam
+        ao próximo nível sem combinação: o último de um grupo ímpar ou
+        o único de um grupo já reduzido).
+    """
+    pares = []
+    restantes = {}
+    for chave, itens in grupos.items():
+        pares.extend((chave, itens[índice], itens[índice + 1])
+                     for índice in range(0, len(itens) - 1, 2))
+        restantes[chave] = itens[len(itens) - len(itens) % 2:]
+    return pares, restantes
+
+
+def junta_nível(pares, resultados, restantes):
+    """Monta o próximo nível da redução em árvore.
+
+    Args:
+        pares: list de tuplas (chave, item, item), de divide_nível.
+        resultados: iterável das combinações de cada par, na mesma
+                    ordem de pares.
+        restantes: dict de cada chave para a list dos itens sem par,
+                   de divide_nível.
+
+    Returns:
+        Instância de dict de cada chave para a list dos itens do
+        próximo nível.
+    """
+    grupos = {chave: [] for chave in restantes}
+    for (chave, _, _), resultado in zip(pares, resultados):
+        grupos[chave].append(resultado)
+    for chave, itens in restantes.items():
+        grupos[chave].extend(itens)
+    return grupos
+
+
+def reduzido(grupos):
+    """Indica se todos os grupos foram reduzidos a um único item.
+
+    Args:
+        grupos: dict de cada chave para a list dos itens do nível.
+
+    Returns:
+        bool.
+    """
+    return all(len(itens) <= 1 for itens in grupos.values())
+
+
+def soma_local(primeira, segunda, originais):
+    """Combina duas instâncias de Estatísticas no processo atual:
+       somas intermediárias da redução são reaproveitadas no lugar e
+       as estatísticas originais dos livros, preservadas.
+
+    Args:
+        primeira: instância de Estatísticas.
+        segunda: instância de Estatísticas.
+        originais: set dos id das instâncias que não podem ser
+                   alteradas.
+
+    Returns:
+        Instância de Estatísticas da combinação.
+    """
+    if id(primeira) in originais:
+        return primeira + segunda
+    primeira += segunda
+    return primeira
+
+
+def soma_empacotadas(primeira, segunda):
+    """Combina duas estatísticas empacotadas por empacota_estatísticas,
+       em um processo de um concurrent.futures.ProcessPoolExecutor.
+
+    Note que a função precisa estar no nível do módulo para que possa
+    ser serializada com pickle e enviada ao processo.
+
+    Args:
+        primeira: estatísticas empacotadas.
+        segunda: estatísticas empacotadas.
+
+    Returns:
+        A combinação empacotada por empacota_estatísticas.
+    """
+    estatísticas = desempacota_estatísticas(primeira)
+    estatísticas += desempacota_estatísticas(segunda)
+    return empacota_estatísticas(estatísticas)
+
+
+def reduz_em_árvore(grupos, executor=None):
+    """Reduz cada grupo de estatísticas ao seu total por redução em
+       árvore, sem alterar as estatísticas recebidas.
+
+    Args:
+        grupos: dict cujas chaves identificam os grupos e cujos
+                respectivos valores são list não vazias de instâncias
+                de Estatísticas.
+        executor: instância de concurrent.futures.ProcessPoolExecutor
+                  em cujos processos os pares de cada nível são
+                  combinados, empacotados por empacota_estatísticas, ou
+                  None para combiná-los no próprio processo.
+
+    Returns:
+        Instância de dict de cada chave para a instância de
+        Estatísticas do total do grupo.
+    """
+    if executor is None:
+        originais = {id(estatísticas) for itens in grupos.values()
+                     for estatísticas in itens}
+        while not reduzido(grupos):
+            pares, restantes = divide_nível(grupos)
+            grupos = junta_nível(
+                pares,
+                [soma_local(primeira, segunda, originais)
+                 for _, primeira, segunda in pares],
+                restantes)
+        return {chave: itens[0] for chave, itens in grupos.items()}
+
+    # Os pares de um nível são combinados em paralelo; as estatísticas
+    # permanecem empacotadas entre os níveis.
+    grupos = {chave: [empacota_estatísticas(estatísticas)
+                      for estatísticas in itens]
+              for chave, itens in grupos.items()}
+    while not reduzido(grupos):
+        pares, restantes = divide_nível(grupos)
+        grupos = junta_nível(
+            pares,
+            executor.map(soma_empacotadas,
+                         [primeira for _, primeira, _ in pares],
+                         [segunda for _, _, segunda in pares]),
+            restantes)
+    return {chave: desempacota_estatísticas(itens[0])
+            for chave, itens in grupos.items()}
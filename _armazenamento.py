@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Armazenamento local dos arquivos obtidos do Project Gutenberg: escrita
+em arquivo parcial com renomeação atômica ao final.
+"""
+
+import os
+
+from _metadados_cache import grava_metadados
+
+
+# TAMANHO_BLOCO é o tamanho, em bytes, dos blocos em que o corpo das
+# respostas é escrito em disco à medida que chega.
+TAMANHO_BLOCO = 64 * 2**10
+
+
+def caminho_parcial(caminho_arquivo):
+    """Obtém o caminho do arquivo parcial usado durante o download.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo final.
+
+    Returns:
+        Instância de pathlib.Path do arquivo parcial, no mesmo
+        diretório do arquivo final.
+    """
+    return caminho_arquivo.with_name(
+        f"{caminho_arquivo.name}.{os.getpid()}.parcial")
+
+
+def conclui_arquivo(caminho_arquivo_parcial, caminho_arquivo, metadados):
+    """Renomeia atomicamente o arquivo parcial para o arquivo final e
+       grava seus metadados.
+
+    Args:
+        caminho_arquivo_parcial: pathlib.Path do arquivo parcial.
+        caminho_arquivo: pathlib.Path do arquivo final.
+        metadados: dict de metadados do arquivo final.
+    """
+    os.replace(str(caminho_arquivo_parcial), str(caminho_arquivo))
+    grava_metadados(caminho_arquivo, metadados)
+
+
+def descarta_parcial(caminho_arquivo_parcial):
+    """Remove um arquivo parcial de um download interrompido.
+
+    Args:
+        caminho_arquivo_parcial: pathlib.Path do arquivo parcial.
+    """
+    try:
+        caminho_arquivo_parcial.unlink()
+    except FileNotFoundError:
+        pass
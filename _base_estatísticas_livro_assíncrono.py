@@ -5,15 +5,72 @@ Project Gutenbert.
 """
 
 import asyncio
+import collections
+import functools
 import pathlib
-import re
 import sys
 
 import aiofiles
 import aiohttp
-from bs4 import BeautifulSoup
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
 import yarl
 
+from _agregação import (
+    agrupa_por_autor,
+    divide_nível,
+    junta_nível,
+    reduz_em_árvore,
+    reduzido,
+    soma_empacotadas,
+)
+from _armazenamento import (
+    TAMANHO_BLOCO,
+    caminho_parcial,
+    conclui_arquivo,
+    descarta_parcial,
+)
+from _corte_livro import corta_livro
+from _decodificação import charset_declarado, decodifica_arquivo
+from _esboços import EsboçoTokens
+from _estatísticas import cria_estatísticas
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    conta_caracteres,
+    por_livro,
+)
+from _estatísticas_linha import calcula_estatísticas_linha
+from _espelhos import extrai_espelhos
+from _limitador import LimitadorPorHost
+from _metadados_cache import (
+    atualiza_metadados,
+    cabeçalhos_condicionais,
+    lê_metadados,
+    metadados_não_modificado,
+    metadados_resposta,
+    precisa_revalidar,
+)
+from _resolução_url import (
+    CAMINHO_ESPELHOS,
+    CAMINHO_PÁGINA_LIVRO,
+    CAMINHO_ÍNDICE,
+    URL_BASE_SÍTIO,
+    ExtratorLinkTexto,
+    MapaURLs,
+    candidatos_sítio,
+    url_sítio,
+)
+from _resumo_tokens import ResumoTokens
+from _transporte import (
+    desempacota_estatísticas,
+    empacota_estatísticas,
+    obtém_texto,
+)
+from _varredura_índice import filtra_autores
+from _índice_autores import busca_livros_autores, grava_índice_autores
+
 
 _PROJECT_GUTENBERG_SOFT_LIMIT = 100
 
@@ -28,58 +85,468 @@ DIRETÓRIO_RAIZ = pathlib.Path([CAMINHO_ARGUMENTO
                                else CAMINHO_ARGUMENTO.parent][0],
                               'arquivos_project_gutenberg')
 
-# NOME_AUTOR_ÍNDICE é uma expressão regular (regex) ingênua para
-# obter dados de linhas do tipo:
-# 'Nome do Livro, by Nome do Autor                                 42'
-# como ('Nome do Livro', 'Nome do Autor', '42')
-# Observação: essa regex é ingênua pois existem livros com nome de
-#             mais de uma linha; sem autor; múltiplos autores
-#             (geralmente não cabe na mesma linha nesse caso); etc.
-NOME_AUTOR_ÍNDICE = re.compile(r'^(\S+.*?),\s+by\s+(\S.*?)\s+([0-9]+)\s*$')
+# LIMITE_CONEXÕES_POR_HOST, TTL_CACHE_DNS e TEMPO_KEEPALIVE são os
+# valores padrão do conector TCP da sessão compartilhada pelas coletas.
+LIMITE_CONEXÕES_POR_HOST = 4
+TTL_CACHE_DNS = 300
+TEMPO_KEEPALIVE = 30.
+
+# TAMANHO_LOTE_LINHAS é o número padrão de linhas distintas analisadas
+# por tarefa na análise de um livro.
+TAMANHO_LOTE_LINHAS = 1024
+
+# TENTATIVAS_REQUISIÇÃO é o número máximo de tentativas de cada
+# requisição ao sítio principal que falhe por erro de rede, tempo
+# esgotado ou status 5xx, e ESPERA_INICIAL_TENTATIVAS é a espera, em
+# segundos, antes da segunda tentativa, dobrada a cada nova tentativa.
+TENTATIVAS_REQUISIÇÃO = 3
+ESPERA_INICIAL_TENTATIVAS = .5
+
+
+def cria_sessão(limite_por_host=LIMITE_CONEXÕES_POR_HOST,
+                ttl_cache_dns=TTL_CACHE_DNS,
+                tempo_keepalive=TEMPO_KEEPALIVE,
+                usa_aiodns=True):
+    """Cria uma sessão HTTP para ser compartilhada por todas as
+       requisições de uma execução, reaproveitando conexões TCP e
+       resoluções de DNS entre os downloads.
+
+    Deve ser chamada com o event loop em execução, preferencialmente
+    como gerenciador de contexto assíncrono:
+
+        async with cria_sessão() as sessão:
+            textos_livros = await coleta(autores, sessão=sessão)
+
+    Args:
+        limite_por_host: número máximo de conexões simultâneas por host.
+        ttl_cache_dns: tempo, em segundos, que uma resolução de DNS
+                       permanece em cache.
+        tempo_keepalive: tempo, em segundos, que uma conexão ociosa
+                         permanece aberta para reuso.
+        usa_aiodns: se True e aiodns estiver disponível, resolve nomes
+                    de forma assíncrona por aiodns.
+
+    Returns:
+        Instância de aiohttp.ClientSession.
+    """
+    resolvedor = None
+    if usa_aiodns and aiodns is not None:
+        resolvedor = aiohttp.AsyncResolver()
+
+    conector = aiohttp.TCPConnector(limit_per_host=limite_por_host,
+                                    use_dns_cache=True,
+                                    ttl_dns_cache=ttl_cache_dns,
+                                    keepalive_timeout=tempo_keepalive,
+                                    resolver=resolvedor)
+    return aiohttp.ClientSession(connector=conector)
+
+
+async def grava_resposta(resposta, caminho_arquivo):
+    """Escreve o corpo de uma resposta em disco à medida que os blocos
+       chegam, sem materializar o corpo inteiro em memória: os blocos
+       são escritos num arquivo parcial, renomeado atomicamente para
+       caminho_arquivo ao final.
+
+    Args:
+        resposta: instância de aiohttp.ClientResponse com status 200.
+        caminho_arquivo: pathlib.Path do arquivo a ser gravado.
+
+    Returns:
+        Instância de dict com os metadados gravados do arquivo.
+    """
+    caminho_arquivo_parcial = caminho_parcial(caminho_arquivo)
+    try:
+        async with aiofiles.open(str(caminho_arquivo_parcial),
+                                 'wb') as arquivo:
+            async for bloco in resposta.content.iter_chunked(TAMANHO_BLOCO):
+                await arquivo.write(bloco)
+    except BaseException:
+        descarta_parcial(caminho_arquivo_parcial)
+        raise
+
+    metadados = metadados_resposta(resposta.headers)
+    metadados['codificação'] = charset_declarado(resposta.headers)
+    conclui_arquivo(caminho_arquivo_parcial, caminho_arquivo, metadados)
+    return metadados
+
+
+async def baixa_arquivo(sessão, url, caminho_arquivo, saída):
+    """Obtém url escrevendo o corpo da resposta diretamente em disco.
+
+    Args:
+        sessão: instância de aiohttp.ClientSession.
+        url: str ou yarl.URL do arquivo.
+        caminho_arquivo: pathlib.Path do arquivo a ser gravado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        Instância de dict com os metadados gravados do arquivo ou None
+        caso o arquivo não exista (status 404).
+
+    Raises:
+        aiohttp.ClientResponseError caso o status seja outro que não
+        200 ou 404.
+    """
+    async with sessão.get(url) as resposta:
+        # Status 200 é OK e 404 é Not Found
+        # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+        if resposta.status == 404:
+            return None
+        resposta.raise_for_status()
+        metadados = await grava_resposta(resposta, caminho_arquivo)
+    saída.write(f"Obtido e armazenado o conteúdo de '{url}' em "
+                f"'{caminho_arquivo}'.\n")
+    saída.flush()
+    return metadados
+
+
+async def lê_arquivo(caminho_arquivo, saída):
+    """Lê o texto de um arquivo armazenado, decodificando-o uma única
+       vez com a codificação registrada nos seus metadados ou detectada
+       por decodifica_arquivo.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        str do conteúdo do arquivo.
+    """
+    async with aiofiles.open(str(caminho_arquivo), 'rb') as arquivo:
+        dados = await arquivo.read()
+    return decodifica_arquivo(caminho_arquivo, dados, saída)
 
 
-# VAZIO, START_OF, PRODUCED_BY, END_OF e END_OF_NORMAL são regex para
-# processamento de corte do arquivo obtido do Project Gutenberg para
-# obter o conteúdo de fato dos livros.
-VAZIO = re.compile(r'^\s*$')
-START_OF = re.compile(r'^\s*{0}\s+START\s+OF'.format(re.escape('***')))
-PRODUCED_BY = re.compile(r'^\s*Produced\s+by\s+')
-END_OF = re.compile(r'^\s*{0}\s+END\s+OF'.format(re.escape('***')))
-END_OF_NORMAL = re.compile(r'^\s*End\s+of')
+async def obtém_espelhos(sessão, limitador, saída=sys.stderr,
+                         url_base=URL_BASE_SÍTIO, diretório=DIRETÓRIO_RAIZ):
+    """Obtém as URLs base dos mirrors listados em MIRRORS.ALL: caso o
+       arquivo esteja armazenado localmente, fará a leitura do arquivo;
+       caso contrário, coletará do próprio Project Gutenberg.
 
-# CARACTERE_VISÍVEL e VISÍVEL_CONTÍGUO são regex para estatísticas
-# de linha de texto.
-CARACTERE_VISÍVEL = re.compile(r'\S')
-VISÍVEL_CONTÍGUO = re.compile(r'\S+')
+    Args:
+        sessão: instância de aiohttp.ClientSession.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   da requisição.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+        url_base: str da URL base do sítio de onde MIRRORS.ALL é obtido.
+        diretório: pathlib.Path do diretório onde MIRRORS.ALL é
+                   armazenado.
+
+    Returns:
+        Instância de list das URLs base dos mirrors.
+    """
+    url_espelhos = yarl.URL(url_sítio(CAMINHO_ESPELHOS, url_base))
+    caminho_arquivo_espelhos = pathlib.Path(
+        diretório, url_espelhos.path.split('/')[-1])
+
+    if not caminho_arquivo_espelhos.is_file():
+        await limitador.adquire(url_espelhos)
+        metadados = await baixa_arquivo(sessão, url_espelhos,
+                                        caminho_arquivo_espelhos, saída)
+        assert metadados is not None
+
+    texto_espelhos = await lê_arquivo(caminho_arquivo_espelhos, saída)
+    saída.write(f"Lido conteúdo de '{url_espelhos}' a partir de "
+                f"'{caminho_arquivo_espelhos}'.\n")
+    saída.flush()
+
+    return extrai_espelhos(texto_espelhos)
 
 
-async def extrai_nome_autor_índice(linha, futuro):
-    """Extrai nome do livro, autor do livro e índice do
-       Project Gutenberg, quando possível.
+async def obtém_texto_livro(tupla, sessão, limitador, espelhos,
+                            mapa_urls, url_base, diretório, saída,
+                            futuro):
+    """Obtém o texto da versão txt de um livro: caso esteja armazenado
+       localmente, fará a leitura do arquivo; caso contrário, coletará
+       do próprio Project Gutenberg, respeitando o limitador, e
+       armazenará o arquivo antes de lê-lo.
 
     Args:
-        linha: str a ser analisada.
+        tupla: tupla (nome do livro, nome do autor, índice).
+        sessão: instância de aiohttp.ClientSession.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   de cada requisição.
+        espelhos: instância de ConjuntoEspelhos a ser tentada antes do
+                  sítio principal ou None para usar somente o sítio
+                  principal.
+        mapa_urls: instância de MapaURLs com as URLs já resolvidas.
+        url_base: str da URL base do sítio principal.
+        diretório: pathlib.Path do diretório onde o livro é
+                   armazenado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
         futuro: instância de asyncio.Future a armazenar o resultado.
 
     Returns:
         Oficialmente, None.
 
-        Via futuro.set_result, é entregue None caso não case
-        a expressão regular NOME_AUTOR_ÍNDICE ou a tupla contendo
-        os valores capturados da regex.
+        Via futuro.set_result, é entregue a str da versão txt do livro
+        ou None caso não seja encontrada uma URL para a versão txt.
     """
-    nome_autor_índice = re.findall(NOME_AUTOR_ÍNDICE, linha)
-
-    # Caso em que a regex não casou.
-    if not nome_autor_índice:
-        futuro.set_result(None)
-        return
+    nome_livro, _, índice = tupla
+
+    nome_arquivo_livro = f"{índice}.txt"
+    caminho_arquivo_livro = pathlib.Path(diretório, nome_arquivo_livro)
+
+    if not caminho_arquivo_livro.is_file():
+        url_texto = None
+
+        # Tenta obter a versão txt diretamente de um mirror.
+        if espelhos:
+            url_texto = await espelhos.baixa_livro(
+                índice,
+                functools.partial(baixa_arquivo, sessão,
+                                  caminho_arquivo=caminho_arquivo_livro,
+                                  saída=saída),
+                saída)
+
+        if url_texto is None:
+            url_texto = await baixa_livro_sítio_principal(
+                nome_livro, índice, caminho_arquivo_livro, sessão,
+                limitador, mapa_urls, url_base, saída)
+
+        # Caso não encontre uma url válida, não há texto a devolver.
+        if url_texto is None:
+            futuro.set_result(None)
+            return
+
+    # Abre o arquivo armazenado e lê seu conteúdo.
+    texto_livro = await lê_arquivo(caminho_arquivo_livro, saída)
+    saída.write(f"Lido conteúdo de '{nome_livro}' a partir de "
+                f"'{caminho_arquivo_livro}'.\n")
+    saída.flush()
 
-    futuro.set_result(nome_autor_índice[0])
+    futuro.set_result(texto_livro)
     return
 
 
-async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
+async def requisita_com_tentativas(requisição, url, limitador, saída):
+    """Executa uma requisição ao sítio principal, repetindo-a com
+       espera crescente caso falhe por erro de rede, tempo esgotado ou
+       status de erro; cada tentativa respeita o limitador.
+
+    Args:
+        requisição: função sem argumentos que devolve a corrotina da
+                    requisição.
+        url: str ou yarl.URL requisitada.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   de cada tentativa.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        O resultado da corrotina de requisição.
+
+    Raises:
+        aiohttp.ClientError ou asyncio.TimeoutError da última tentativa
+        caso todas falhem.
+    """
+    espera = ESPERA_INICIAL_TENTATIVAS
+    for tentativa in range(1, TENTATIVAS_REQUISIÇÃO + 1):
+        await limitador.adquire(url)
+        try:
+            return await requisição()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as erro:
+            if tentativa == TENTATIVAS_REQUISIÇÃO:
+                raise
+            saída.write(f"Falha ao obter '{url}': {erro!r}. Nova "
+                        f"tentativa em {espera:.1f} s.\n")
+            saída.flush()
+        await asyncio.sleep(espera)
+        espera *= 2
+
+
+async def extrai_url_página(nome_livro, índice, sessão, limitador,
+                            url_base, saída):
+    """Obtém a URL da versão txt de um livro a partir da sua página
+       HTML, lendo a página em blocos somente até o primeiro link para
+       a versão txt.
+
+    Args:
+        nome_livro: str do nome do livro.
+        índice: str do índice do livro.
+        sessão: instância de aiohttp.ClientSession.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   de cada tentativa da requisição.
+        url_base: str da URL base do sítio principal.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        str da URL da versão txt ou None caso não seja encontrada.
+
+    Raises:
+        aiohttp.ClientError ou asyncio.TimeoutError caso todas as
+        tentativas falhem.
+    """
+    url_versões = yarl.URL(
+        url_sítio(CAMINHO_PÁGINA_LIVRO.format(id=índice), url_base))
+
+    async def lê_página():
+        async with sessão.get(url_versões) as resposta:
+            # Status 200 é OK e 404 é Not Found
+            # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+            if resposta.status == 404:
+                return None
+            resposta.raise_for_status()
+            extrator = ExtratorLinkTexto(url_versões, resposta.charset)
+            async for bloco in resposta.content.iter_chunked(
+                    TAMANHO_BLOCO):
+                if extrator.alimenta(bloco) is not None:
+                    break
+        return extrator
+
+    extrator = await requisita_com_tentativas(lê_página, url_versões,
+                                              limitador, saída)
+    if extrator is None:
+        saída.write(f"Não encontrada a página de '{nome_livro}' em "
+                    f"'{url_versões}'.\n")
+        saída.flush()
+        return None
+    saída.write(f"Obtido conteúdo de '{url_versões}'.\n")
+    saída.flush()
+
+    if extrator.url_texto is None:
+        saída.write(f"Não encontrado nenhum path para URL de "
+                    f"versão txt de '{nome_livro}'.\n")
+    else:
+        saída.write(f"Encontrado path da URL da versão "
+                    f"txt de '{nome_livro}'.\n")
+    saída.flush()
+    return extrator.url_texto
+
+
+async def baixa_livro_sítio_principal(nome_livro, índice,
+                                      caminho_arquivo_livro, sessão,
+                                      limitador, mapa_urls, url_base,
+                                      saída):
+    """Obtém a versão txt de um livro a partir do sítio principal do
+       Project Gutenberg, armazenando-a em caminho_arquivo_livro.
+
+    São tentadas, nesta ordem: a URL já resolvida em mapa_urls, os
+    caminhos conhecidos da estrutura de arquivos do sítio e, em último
+    caso, o link encontrado na página HTML do livro. A URL que resultar
+    no download é registrada em mapa_urls. Cada requisição é repetida
+    por requisita_com_tentativas; caso as tentativas se esgotem, a
+    falha é exibida e o livro, ignorado nesta execução.
+
+    Args:
+        nome_livro: str do nome do livro.
+        índice: str do índice do livro.
+        caminho_arquivo_livro: pathlib.Path do arquivo a ser gravado.
+        sessão: instância de aiohttp.ClientSession.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   de cada requisição.
+        mapa_urls: instância de MapaURLs com as URLs já resolvidas.
+        url_base: str da URL base do sítio principal.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        str da URL de onde a versão txt foi obtida ou None caso não
+        seja encontrada ou não possa ser obtida.
+    """
+    try:
+        return await _baixa_livro_sítio_principal(
+            nome_livro, índice, caminho_arquivo_livro, sessão, limitador,
+            mapa_urls, url_base, saída)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as erro:
+        saída.write(f"Falha ao obter '{nome_livro}' do sítio principal "
+                    f"após {TENTATIVAS_REQUISIÇÃO} tentativas: {erro!r}. "
+                    f"O livro será ignorado.\n")
+        saída.flush()
+        return None
+
+
+async def _baixa_livro_sítio_principal(nome_livro, índice,
+                                       caminho_arquivo_livro, sessão,
+                                       limitador, mapa_urls, url_base,
+                                       saída):
+    """Implementa baixa_livro_sítio_principal, propagando as falhas
+       das requisições após esgotadas as tentativas.
+    """
+    url_resolvida = mapa_urls.obtém(índice)
+    candidatos = ([url_resolvida] if url_resolvida is not None else [])
+    candidatos.extend(url
+                      for url in candidatos_sítio(índice, url_base)
+                      if url != url_resolvida)
+
+    # Obtém o arquivo contendo a versão txt do livro solicitado,
+    # escrevendo-o em disco à medida que é recebido.
+    for url_texto in candidatos:
+        metadados = await requisita_com_tentativas(
+            functools.partial(baixa_arquivo, sessão, url_texto,
+                              caminho_arquivo_livro, saída),
+            url_texto, limitador, saída)
+        if metadados is not None:
+            mapa_urls.registra(índice, url_texto)
+            return url_texto
+
+    # Nenhum caminho conhecido existe: recorre à página do livro.
+    url_texto = await extrai_url_página(nome_livro, índice, sessão,
+                                        limitador, url_base, saída)
+    if url_texto is None:
+        mapa_urls.registra(índice, None)
+        return None
+
+    metadados = await requisita_com_tentativas(
+        functools.partial(baixa_arquivo, sessão, url_texto,
+                          caminho_arquivo_livro, saída),
+        url_texto, limitador, saída)
+    if metadados is None:
+        # O link da página aponta para um arquivo inexistente: a URL
+        # não é registrada, para que seja resolvida novamente.
+        saída.write(f"Não encontrada a versão txt de '{nome_livro}' em "
+                    f"'{url_texto}'.\n")
+        saída.flush()
+        return None
+    mapa_urls.registra(índice, url_texto)
+
+    return url_texto
+
+
+async def revalida_arquivo(sessão, limitador, url, caminho_arquivo, saída):
+    """Revalida um arquivo armazenado por meio de um GET condicional
+       (If-None-Match / If-Modified-Since): caso o servidor responda
+       304, somente os metadados são atualizados; caso contrário, o
+       arquivo é substituído pelo novo conteúdo.
+
+    Args:
+        sessão: instância de aiohttp.ClientSession.
+        limitador: instância de LimitadorPorHost a ser respeitada antes
+                   da requisição.
+        url: yarl.URL do arquivo.
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+    """
+    cabeçalhos = cabeçalhos_condicionais(lê_metadados(caminho_arquivo))
+    await limitador.adquire(url)
+    async with sessão.get(url, headers=cabeçalhos) as resposta:
+        # Status 304 é Not Modified
+        # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+        if resposta.status == 304:
+            atualiza_metadados(caminho_arquivo,
+                               **metadados_não_modificado(
+                                   resposta.headers))
+            saída.write(f"Conteúdo de '{url}' não modificado desde a "
+                        f"última obtenção.\n")
+            saída.flush()
+            return
+        assert resposta.status == 200
+        await grava_resposta(resposta, caminho_arquivo)
+    saída.write(f"Obtido e armazenado o conteúdo de '{url}' em "
+                f"'{caminho_arquivo}'.\n")
+    saída.flush()
+
+
+async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr,
+                 sessão=None, limitador=None, espelhos=None,
+                 idade_máxima_índice=None, url_base=URL_BASE_SÍTIO,
+                 diretório=DIRETÓRIO_RAIZ, manifesto=None):
     """Efetua a coleta dos textos dos livros de um autor disponíveis no
        Project Gutenberg: caso estejam armazenados localmente, fará
        a leitura dos arquivo; caso contrário, coletará do próprio
@@ -90,6 +557,34 @@ async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                  buscados.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        sessão: instância de aiohttp.ClientSession utilizada em todas
+                as requisições, podendo ser reutilizada entre chamadas.
+                Caso None, uma sessão é criada por cria_sessão e
+                fechada ao final da coleta.
+        limitador: instância de LimitadorPorHost que controla o
+                   intervalo entre requisições a um mesmo host, podendo
+                   ser compartilhada entre chamadas. Caso None, é
+                   criado um limitador com o intervalo padrão.
+        espelhos: instância de ConjuntoEspelhos de onde os livros não
+                  armazenados localmente são obtidos preferencialmente,
+                  cada mirror com seu próprio intervalo entre
+                  requisições. Caso None, é utilizado somente o sítio
+                  principal.
+        idade_máxima_índice: idade máxima, em segundos, do arquivo de
+                             índices armazenado localmente antes de ser
+                             revalidado por um GET condicional. Caso
+                             None, o arquivo armazenado é sempre
+                             utilizado.
+        url_base: str da URL base do sítio de onde o índice e os livros
+                  são obtidos; permite direcionar a coleta a outro
+                  servidor com a mesma estrutura, como
+                  servidor_gutenberg_local.py.
+        diretório: pathlib.Path do diretório onde os arquivos obtidos
+                   são armazenados.
+        manifesto: instância de ManifestoIncremental, no modo
+                   incremental, ou None. Caso fornecido, os livros já
+                   analisados cujo arquivo não mudou não são lidos e
+                   somente os livros novos ou alterados são devolvidos.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
@@ -98,6 +593,12 @@ async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
         versão txt dos livros.
     """
 
+    if sessão is None:
+        async with cria_sessão() as sessão_coleta:
+            return await coleta(autores, saída, sessão_coleta, limitador,
+                                espelhos, idade_máxima_índice, url_base,
+                                diretório, manifesto)
+
     # Variável que irá armazenar o resultado final.
     textos_livros = {}
 
@@ -120,64 +621,68 @@ async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
     # http://www.gutenberg.org/MIRRORS.ALL
 
     # Lista de todos os livros:
-    URL_ÍNDICE = yarl.URL('http://www.gutenberg.org/dirs/GUTINDEX.ALL')
+    URL_ÍNDICE = yarl.URL(url_sítio(CAMINHO_ÍNDICE, url_base))
     nome_arquivo_índice = URL_ÍNDICE.path.split('/')[-1]
 
     # Obtém as linhas do arquivo de índices.
     texto_índice = ''
-    caminho_arquivo_índice = pathlib.Path(DIRETÓRIO_RAIZ,
-                                          nome_arquivo_índice)
-    if caminho_arquivo_índice.is_file():
-        # Abre arquivo prévio e lê seu conteúdo.
-        async with aiofiles.open(str(caminho_arquivo_índice),
-                                 'rt',
-                                 encoding='utf-8') as arquivo_índice:
-            texto_índice = await arquivo_índice.read()
-        saída.write(f"Lido conteúdo de '{nome_arquivo_índice}' a partir de "
+    caminho_arquivo_índice = pathlib.Path(diretório, nome_arquivo_índice)
+
+    if limitador is None:
+        limitador = LimitadorPorHost()
+
+    # Caso o arquivo de índices armazenado seja mais antigo que o
+    # permitido, revalida-o antes de utilizá-lo.
+    if (caminho_arquivo_índice.is_file() and
+            precisa_revalidar(caminho_arquivo_índice, idade_máxima_índice)):
+        await revalida_arquivo(sessão, limitador, URL_ÍNDICE,
+                               caminho_arquivo_índice, saída)
+
+    # Caso exista um índice auxiliar válido para o arquivo de índices
+    # armazenado localmente, consulta diretamente os livros dos autores
+    # solicitados, sem ler nem varrer o arquivo de índices.
+    loop = asyncio.get_event_loop()
+    tuplas_livros_autor = await loop.run_in_executor(
+        None, busca_livros_autores, caminho_arquivo_índice, autores_set)
+    if tuplas_livros_autor is not None:
+        saída.write(f"Consultado o índice de autores de "
                     f"'{caminho_arquivo_índice}'.\n")
         saída.flush()
     else:
-        # Obtém o arquivo de índices de Project Gutenberg.
-        async with aiohttp.ClientSession() as sessão:
-            async with sessão.get(URL_ÍNDICE) as resposta:
-                # Status 200 é OK
-                # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-                assert resposta.status == 200
-                texto_índice = await resposta.text()
-        saída.write(f"Obtido conteúdo de '{URL_ÍNDICE}'.\n")
-        saída.flush()
-        # Armazena o arquivo de índices de Project Gutenberg.
-        async with aiofiles.open(str(caminho_arquivo_índice),
-                                 'wt',
-                                 encoding='utf-8') as arquivo_índice:
-            await arquivo_índice.write(texto_índice)
-        saída.write(f"Armazenado o conteúdo de '{URL_ÍNDICE}' em "
+        if not caminho_arquivo_índice.is_file():
+            # Obtém o arquivo de índices de Project Gutenberg,
+            # armazenando-o à medida que é recebido.
+            await limitador.adquire(URL_ÍNDICE)
+            metadados_índice = await baixa_arquivo(
+                sessão, URL_ÍNDICE, caminho_arquivo_índice, saída)
+            assert metadados_índice is not None
+
+        # Abre arquivo armazenado e lê seu conteúdo.
+        texto_índice = await lê_arquivo(caminho_arquivo_índice, saída)
+        saída.write(f"Lido conteúdo de '{nome_arquivo_índice}' a partir de "
                     f"'{caminho_arquivo_índice}'.\n")
         saída.flush()
 
-    # Divide o conteúdo em linhas.
-    linhas_índice = texto_índice.split('\n')
-
-    # Instancia um asyncio.Future para cada linha.
-    futuros_linha = {linha: asyncio.Future()
-                     for linha in linhas_índice}
-
-    # Obtém as tuplas de nome, autor, índice.
-    saída.write(f"Processando as linhas de '{caminho_arquivo_índice}'.\n")
-    saída.flush()
-    await asyncio.wait(
-        [asyncio.ensure_future(
-            extrai_nome_autor_índice(linha, futuros_linha[linha]))
-         for linha in futuros_linha])
-    saída.write(f"Processadas as linhas de '{caminho_arquivo_índice}'.\n")
-    saída.flush()
-
-    # Filtra as tuplas de acordo com o autor estando em autores_set.
-    tuplas_livros_autor = (
-        [tupla
-         for linha in futuros_linha
-         for tupla in (futuros_linha[linha].result(), )
-         if tupla and tupla[1] in autores_set])
+    if tuplas_livros_autor is None:
+        # Obtém as tuplas de nome, autor, índice numa única passada pelo
+        # texto do índice, armazenando-as no índice auxiliar para que as
+        # próximas execuções não precisem varrer o arquivo novamente.
+        # Em seguida, filtra as tuplas de acordo com o autor estando em
+        # autores_set.
+        saída.write(f"Processando as linhas de "
+                    f"'{caminho_arquivo_índice}'.\n")
+        saída.flush()
+        await loop.run_in_executor(
+            None, grava_índice_autores, caminho_arquivo_índice,
+            texto_índice)
+        tuplas_livros_autor = await loop.run_in_executor(
+            None, busca_livros_autores, caminho_arquivo_índice,
+            autores_set)
+        if tuplas_livros_autor is None:
+            tuplas_livros_autor = filtra_autores(texto_índice, autores_set)
+        saída.write(f"Processadas as linhas de "
+                    f"'{caminho_arquivo_índice}'.\n")
+        saída.flush()
 
     # Lista os livros obtidos por autor solicitado.
     autores_livros = {autor: set()
@@ -205,23 +710,20 @@ async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                         f"{', '.join(sorted(autores_livros[nome_autor]))}.\n")
         saída.flush()
 
-    # Para este exemplo, iremos usar o sítio principal para coletar
-    # a versão txt dos livros, com a URL base do Project Gutenberg.
-    URL_BASE_LIVRO = "http://www.gutenberg.org/ebooks/{id}"
-
     # Sobre uso de robôs:
     # http://www.gutenberg.org/wiki/Gutenberg:Information_About_Robot_Access_to_our_Pages
     # Algumas regras sobre a coleta automatizada:
     # - Esperar 2 segundos entre as coletas;
     # - Usar mirrors para coletar os livros
-    #   (deveríamos utilizar neste exemplo).
+    #   (utilizados quando espelhos é informado).
 
-    # Em condições normais fora do escopo do Project Gutenberg,
-    # poderíamos deixar todo o processo a seguir de maneira concorrente.
-    # No pior caso, temos que obter os livros do Project Gutenberg e
-    # os seus Termos de Uso pedem para esperarmos um intervalo de
-    # 2 segundos entre os downloads. Considerando isso, iremos iterar
-    # as tuplas de maneira sequencial.
+    # Os Termos de Uso do Project Gutenberg pedem para esperarmos um
+    # intervalo entre os downloads. Em vez de iterar as tuplas de
+    # maneira sequencial, todos os livros são obtidos concorrentemente
+    # e somente as requisições de rede passam pelo limitador, que
+    # garante o intervalo entre requisições a um mesmo host. Leituras
+    # de arquivos já armazenados, análise de HTML e escrita em disco
+    # acontecem enquanto as requisições aguardam sua vez.
 
     if len(tuplas_livros_autor) > _PROJECT_GUTENBERG_SOFT_LIMIT:
         saída.write(f"\n\nOBSERVAÇÃO: foram encontradas mais de "
@@ -230,90 +732,60 @@ async def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                     f"Project Gutenberg!\n\n")
         saída.flush()
 
-    for tupla in tuplas_livros_autor:
-        nome_livro, nome_autor, índice = tupla
-
-        nome_arquivo_livro = f"{índice}.txt"
-        texto_livro = ''
-        caminho_arquivo_livro = pathlib.Path(DIRETÓRIO_RAIZ,
-                                             nome_arquivo_livro)
-
-        if caminho_arquivo_livro.is_file():
-            # Abre arquivo prévio e lê seu conteúdo.
-            async with aiofiles.open(str(caminho_arquivo_livro),
-                                     'rt',
-                                     encoding='utf-8') as arquivo_livro:
-                texto_livro = await arquivo_livro.read()
-            saída.write(f"Lido conteúdo de '{nome_livro}' a partir de "
-                        f"'{caminho_arquivo_livro}'.\n")
-            saída.flush()
-        else:
-            # Obtém o arquivo contendo as versões do livro solicitado.
-            url_versões = yarl.URL(URL_BASE_LIVRO.format(id=índice))
-            async with aiohttp.ClientSession() as sessão:
-                async with sessão.get(url_versões) as resposta:
-                    # Status 200 é OK
-                    # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-                    assert resposta.status == 200
-                    texto_versões = await resposta.text()
-                    saída.write(f"Obtido conteúdo de '{url_versões}'.\n")
-                    saída.flush()
-
-            # Analisa o HTML para extrair a URL da versão txt.
-            url_texto_sem_scheme = ''
-            soup = BeautifulSoup(texto_versões, 'html.parser')
-            for a_href in soup.find_all('a', href=True):
-                if ('.txt' in a_href.attrs['href'] and
-                        '-readme' not in a_href.attrs['href']):
-                    url_texto_sem_scheme = a_href.attrs['href']
-                    saída.write(f"Encontrado path da URL da versão "
-                                f"txt de '{nome_livro}'.\n")
-                    saída.flush()
-                    break
+    # No modo incremental, os livros já analisados cujo arquivo não
+    # mudou não são lidos.
+    if manifesto is not None:
+        quantidade_listados = len(tuplas_livros_autor)
+        tuplas_livros_autor = manifesto.filtra_inalterados(
+            tuplas_livros_autor)
+        saída.write(f"Modo incremental: "
+                    f"{quantidade_listados - len(tuplas_livros_autor)} de "
+                    f"{quantidade_listados} livros já analisados.\n")
+        saída.flush()
 
-            # Caso não encontre uma url válida, continua para
-            # o próximo livro.
-            if not url_texto_sem_scheme:
-                saída.write(f"Não encontrado nenhum path para URL de "
-                            f"versão txt de '{nome_livro}'.\n")
-                saída.flush()
-                continue
-
-            # Obtém o arquivo contendo a versão txt do livro solicitado.
-            url_texto = yarl.URL(f"{url_versões.scheme}:"
-                                 f"{url_texto_sem_scheme}")
-            async with aiohttp.ClientSession() as sessão:
-                async with sessão.get(url_texto) as resposta:
-                    # Status 200 é OK
-                    # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-                    assert resposta.status == 200
-                    texto_livro = await resposta.text()
-                    saída.write(f"Obtido conteúdo de '{url_texto}'.\n")
-                    saída.flush()
-
-            # Armazena o arquivo contendo a versão txt do livro solicitado.
-            async with aiofiles.open(str(caminho_arquivo_livro),
-                                     'wt',
-                                     encoding='utf-8') as arquivo_livro:
-                await arquivo_livro.write(texto_livro)
-                saída.write(f"Armazenado o conteúdo de '{url_texto}' em "
-                            f"'{caminho_arquivo_livro}'.\n")
-                saída.flush()
-
-            # Respeitando a regra de coleta automatizada,
-            # esperaremos 2 segundos
-            saída.write(f"Esperando 2 segundos após o download de "
-                        f"'{url_texto}'.\n")
-            saída.flush()
-            await asyncio.sleep(2.)
-            saída.write(f"Esperados 2 segundos após o download de "
-                        f"'{url_texto}'.\n")
-            saída.flush()
+    # Instancia um asyncio.Future para cada livro.
+    futuros_livro = {tupla: asyncio.Future()
+                     for tupla in tuplas_livros_autor}
+
+    # URLs da versão txt já resolvidas em execuções anteriores.
+    mapa_urls = MapaURLs(diretório)
+
+    # Obtém os textos de todos os livros.
+    if futuros_livro:
+        tarefas = [asyncio.ensure_future(
+            obtém_texto_livro(tupla, sessão, limitador, espelhos,
+                              mapa_urls, url_base, diretório, saída,
+                              futuros_livro[tupla]))
+                   for tupla in futuros_livro]
+        await asyncio.wait(tarefas)
+        mapa_urls.grava()
+
+        # Propaga eventuais exceções ocorridas na obtenção dos textos.
+        for tarefa in tarefas:
+            tarefa.result()
+
+    for tupla in futuros_livro:
+        nome_livro, nome_autor, _ = tupla
+        texto_livro = futuros_livro[tupla].result()
+
+        # Caso não tenha sido possível obter o texto, continua para
+        # o próximo livro.
+        if texto_livro is None:
+            continue
+
+        # Caso o texto não tenha mudado desde a análise registrada no
+        # manifesto, o livro não é devolvido.
+        if manifesto is not None and not manifesto.pendente(tupla,
+                                                            texto_livro):
+            continue
 
         # Armazena num dict usando o nome do livro como chave e
         # o texto como valor.
         textos_livros[(nome_livro, nome_autor)] = texto_livro
 
+    if espelhos:
+        espelhos.exibe_resumo(saída)
+
     saída.write('Terminada a coleta dos arquivos.\n\n')
     saída.flush()
     return textos_livros
@@ -334,8 +806,8 @@ async def processa_livro(tupla_livro, texto_bruto, saída, futuro):
     Returns:
         Oficialmente, None.
 
-        Via futuro.set_result, é entregue a list contendo todas
-        as linhas a serem analisadas do livro.
+        Via futuro.set_result, é entregue a instância de CorpoLivro
+        contendo todas as linhas a serem analisadas do livro.
     """
     nome_livro, nome_autor = tupla_livro
     saída.write(f"Processando o corte do conteúdo bruto de "
@@ -361,92 +833,10 @@ async def processa_livro(tupla_livro, texto_bruto, saída, futuro):
     # Também é possível que existam outros comentários antes do
     # título do livro.
 
-    # Como o corte possui regras de linhas sequenciais, aparentemente
-    # não há vantagem em fazer o processamento concorrentemente entre
-    # as linhas.
-
-    # Divide o texto bruto do Project Gutenberg por linhas.
-    linhas = texto_bruto.split('\n')
-    range_linhas = range(len(linhas))
-
-    # Busca a primeira linha que começa com
-    # *** START OF
-    índice_start_of = None
-    for índice in range_linhas:
-        if re.findall(START_OF, linhas[índice]):
-            índice_start_of = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_start_of:
-        futuro.set_result(list())
-        return
-
-    # Busca a primeira linha que começa com
-    # Produced by
-    # após a linha que começa com
-    # *** START OF
-    índice_produced_by = None
-    for índice in range_linhas[índice_start_of+1:]:
-        if re.findall(PRODUCED_BY, linhas[índice]):
-            índice_produced_by = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_produced_by:
-        futuro.set_result(list())
-        return
-
-    # Busca a primeira linha com todos os caracteres de letras em
-    # maiúsculo após a linha que começa com
-    # Produced by
-    índice_primeiro_upper = None
-    for índice in range_linhas[índice_produced_by+1:]:
-        if linhas[índice].isupper():
-            índice_primeiro_upper = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_primeiro_upper:
-        futuro.set_result(list())
-        return
-
-    # Busca a última linha que começa com
-    # *** END OF
-    # Note que a sequência é feita da último linha para a primeira.
-    índice_end_of = None
-    for índice in range_linhas[::-1]:
-        if re.findall(END_OF, linhas[índice]):
-            índice_end_of = índice
-            break
-
-    # Busca a última linha que começa com
-    # End of
-    # antes da linha que começa com
-    # *** END OF
-    índice_end_of_normal = None
-    for índice in range_linhas[índice_end_of-1::-1]:
-        if re.findall(END_OF_NORMAL, linhas[índice]):
-            índice_end_of_normal = índice
-            break
-
-    # Busca a última linha com caracteres visíveis antes da linha que
-    # começa com
-    # End of
-    índice_último_visível = None
-    for índice in range_linhas[índice_end_of_normal-1::-1]:
-        if not re.findall(VAZIO, linhas[índice]):
-            índice_último_visível = índice
-            break
-
-    # Uma vez determinada a primeira linha do título e a última linha
-    # com caracteres visíveis, devolve um list contendo todas as linhas
-    # nesse intervalo, inclusive as duas.
-    futuro.set_result(
-        linhas[índice_primeiro_upper:índice_último_visível+1])
+    # As fronteiras do conteúdo são encontradas por buscas ancoradas
+    # sobre o texto bruto, que devolvem posições de caracteres: somente
+    # o trecho mantido é dividido em linhas.
+    futuro.set_result(corta_livro(texto_bruto))
 
     saída.write(f"Processado o corte do conteúdo bruto de "
                 f"'{nome_livro}' de '{nome_autor}'.\n")
@@ -454,93 +844,34 @@ async def processa_livro(tupla_livro, texto_bruto, saída, futuro):
     return
 
 
-async def analisa_linha_livro(linha, futuro):
-    """Extrai dados de uma linha a ser analisada de um livro.
+async def analisa_lote_linhas(linhas, futuro, com_caracteres=True):
+    """Extrai dados de um lote de linhas a serem analisadas de um livro.
 
     Args:
-        linha: str a ser analisada.
+        linhas: list de str a serem analisadas.
         futuro: instância de asyncio.Future a armazenar o resultado.
+        com_caracteres: bool indicando se as estatísticas de
+                        caracteres são calculadas nas linhas.
 
     Returns:
         Oficialmente, None.
 
-        Via futuro.set_result, é entregue um dict cujas chaves são
-        estatísticas calculadas na linha.
+        Via futuro.set_result, é entregue um list, na ordem de linhas,
+        das instâncias de Estatísticas de cada linha (None para as que
+        não são str).
     """
 
-    # Variável que irá armazenar o resultado final.
-    estatísticas_linha = {}
-
-    # Caso não possua linha a ser analisada,
-    # devolve sem informações úteis.
-    if not isinstance(linha, str):
-        futuro.set_result(estatísticas_linha)
-        return
-
-    # Verifica se a linha é composta somente de caracteres invisíveis.
-    vazio = bool(re.findall(VAZIO, linha))
-    estatísticas_linha[VAZIO] = vazio
-
-    if vazio:
-        estatísticas_linha['linha_visível'] = 0
-        estatísticas_linha[CARACTERE_VISÍVEL] = 0
-        estatísticas_linha[VISÍVEL_CONTÍGUO] = 0
-        estatísticas_linha['caracteres visíveis'] = {}
-        estatísticas_linha['visíveis contíguos'] = {}
-        estatísticas_linha['caracteres visíveis insensíveis'] = {}
-        estatísticas_linha['visíveis contíguos insensíveis'] = {}
-    else:
-        # Encontra caracteres visíveis e sequências contíguas de
-        # caracteres visíveis.
-        caracteres_visíveis = re.findall(CARACTERE_VISÍVEL, linha)
-        visíveis_contíguos = re.findall(VISÍVEL_CONTÍGUO, linha)
-
-        # Gera conjuntos para facilitar o histograma.
-        caracteres_visíveis_set = frozenset(caracteres_visíveis)
-        visíveis_contíguos_set = frozenset(visíveis_contíguos)
-
-        # Considera a versão minúscula como versão insensível ao caso.
-        caracteres_visíveis_insensíveis = [cv_.lower()
-                                           for cv_ in caracteres_visíveis]
-        visíveis_contíguos_insensíveis = [vc_.lower()
-                                          for vc_ in visíveis_contíguos]
-
-        # Gera conjuntos para facilitar o histograma.
-        caracteres_visíveis_insensíveis_set = (
-            frozenset(caracteres_visíveis_insensíveis))
-        visíveis_contíguos_insensíveis_set = (
-            frozenset(visíveis_contíguos_insensíveis))
-
-        # Utiliza o método count de lista para gerar os histogramas.
-        caracteres_visíveis_dict = {cv_: caracteres_visíveis.count(cv_)
-                                    for cv_ in caracteres_visíveis_set}
-        visíveis_contíguos_dict = {vc_: visíveis_contíguos.count(vc_)
-                                   for vc_ in visíveis_contíguos_set}
-        caracteres_visíveis_insensíveis_dict = {
-            cvi: caracteres_visíveis_insensíveis.count(cvi)
-            for cvi in caracteres_visíveis_insensíveis_set}
-        visíveis_contíguos_insensíveis_dict = {
-            vci: visíveis_contíguos_insensíveis.count(vci)
-            for vci in visíveis_contíguos_insensíveis_set}
-
-        # Atribui os valores obtidos.
-        estatísticas_linha['linha_visível'] = 1
-        estatísticas_linha[CARACTERE_VISÍVEL] = len(caracteres_visíveis)
-        estatísticas_linha[VISÍVEL_CONTÍGUO] = len(visíveis_contíguos)
-        estatísticas_linha['caracteres visíveis'] = (
-            caracteres_visíveis_dict)
-        estatísticas_linha['visíveis contíguos'] = (
-            visíveis_contíguos_dict)
-        estatísticas_linha['caracteres visíveis insensíveis'] = (
-            caracteres_visíveis_insensíveis_dict)
-        estatísticas_linha['visíveis contíguos insensíveis'] = (
-            visíveis_contíguos_insensíveis_dict)
-
-    futuro.set_result(estatísticas_linha)
+    # Os quatro histogramas de cada linha são obtidos em uma passada
+    # linear sobre a linha, compartilhada com a versão síncrona.
+    futuro.set_result([calcula_estatísticas_linha(linha, com_caracteres)
+                       for linha in linhas])
     return
 
 
-async def analisa_livro(tupla_livro, linhas_a_analisar, saída, futuro):
+async def analisa_livro(tupla_livro, linhas_a_analisar, saída, futuro,
+                        backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+                        tamanho_lote=TAMANHO_LOTE_LINHAS,
+                        modelo_tokens=None):
     """Efetua a análise dos texto de um livro de Machado de Assis
        disponível no Project Gutenberg: efetua uma análise
        estatística arbitrária para fins de exemplo no texto de
@@ -548,21 +879,37 @@ async def analisa_livro(tupla_livro, linhas_a_analisar, saída, futuro):
 
     Args:
         tupla_livro: tupla (nome do livro, nome do autor).
-        linhas_a_analisar: list das linhas a serem analisadas de
-                           cada livro.
+        linhas_a_analisar: CorpoLivro (ou outra sequência de str) das
+                           linhas a serem analisadas de cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
         futuro: instância de asyncio.Future a armazenar o resultado.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        tamanho_lote: int do número de linhas distintas analisadas
+                      por tarefa.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
 
     Returns:
         Oficialmente, None.
 
-        Via futuro.set_result, é entregue o dict contendo todas
-        as estatísticas analisadas do livro.
+        Via futuro.set_result, é entregue a instância de Estatísticas
+        contendo todas as estatísticas analisadas do livro ou, via
+        futuro.set_exception, ValueError caso tamanho_lote não seja
+        positivo.
     """
 
+    # Um tamanho de lote não positivo não divide as linhas em lotes; o
+    # erro é entregue via futuro para que não seja mascarado ao obter
+    # o resultado.
+    if tamanho_lote < 1:
+        futuro.set_exception(ValueError('tamanho_lote deve ser positivo'))
+        return
+
     # Variável que irá armazenar o resultado final.
-    estatísticas = {}
+    estatísticas = cria_estatísticas(modelo_tokens)
 
     nome_livro, nome_autor = tupla_livro
 
@@ -575,78 +922,247 @@ async def analisa_livro(tupla_livro, linhas_a_analisar, saída, futuro):
         futuro.set_result(estatísticas)
         return
 
-    # Instancia um asyncio.Future para cada linha.
-    futuros_linha = {linha: asyncio.Future()
-                     for linha in linhas_a_analisar}
+    # Conta as ocorrências de cada linha: linhas repetidas (linhas em
+    # branco, separadores como "* * *") são analisadas uma única vez e
+    # suas estatísticas, multiplicadas pelo número de ocorrências.
+    multiplicidades = collections.Counter(linhas_a_analisar)
+    linhas_distintas = list(multiplicidades)
+
+    # Instancia um asyncio.Future para cada lote de linhas distintas.
+    lotes = [linhas_distintas[início:início + tamanho_lote]
+             for início in range(0, len(linhas_distintas), tamanho_lote)]
+    futuros_lote = [asyncio.Future() for _ in lotes]
 
     saída.write(f"Analisando as linhas de '{nome_livro}' de "
                 f"'{nome_autor}'.\n")
     saída.flush()
 
-    # Obtém as estatísticas de cada linha.
+    # Obtém as estatísticas de cada lote. Caso as estatísticas de
+    # caracteres sejam calculadas sobre o livro inteiro, não são
+    # calculadas por linha.
+    caracteres_por_livro = por_livro(backend_caracteres)
     await asyncio.wait(
         [asyncio.ensure_future(
-            analisa_linha_livro(linha, futuros_linha[linha]))
-         for linha in futuros_linha])
+            analisa_lote_linhas(lote, futuro_lote,
+                                not caracteres_por_livro))
+         for lote, futuro_lote in zip(lotes, futuros_lote)])
 
     saída.write(f"Analisadas as linhas de '{nome_livro}' de "
                 f"'{nome_autor}'.\n")
     saída.flush()
 
-    # Filtra os resultados válidos.
-    estatísticas_a_considerar = [resultado
-                                 for linha in futuros_linha
-                                 for resultado in
-                                 (futuros_linha[linha].result(), )
+    # Filtra os resultados válidos, acompanhados da multiplicidade de
+    # cada linha.
+    estatísticas_a_considerar = [(resultado, multiplicidades[linha])
+                                 for lote, futuro_lote
+                                 in zip(lotes, futuros_lote)
+                                 for linha, resultado
+                                 in zip(lote, futuro_lote.result())
                                  if resultado]
 
-    # Inicializa as entradas a serem utilizadas.
-    estatísticas[VAZIO] = 0
-    estatísticas['linha_visível'] = 0
-    estatísticas[CARACTERE_VISÍVEL] = 0
-    estatísticas[VISÍVEL_CONTÍGUO] = 0
-    estatísticas['caracteres visíveis'] = {}
-    estatísticas['visíveis contíguos'] = {}
-    estatísticas['caracteres visíveis insensíveis'] = {}
-    estatísticas['visíveis contíguos insensíveis'] = {}
-
-    # Atualiza os valores de acordo com os resultados encontrados.
-    for resultado_linha in estatísticas_a_considerar:
-        for chave_int in (VAZIO, 'linha_visível', CARACTERE_VISÍVEL,
-                          VISÍVEL_CONTÍGUO):
-            estatísticas[chave_int] += resultado_linha[chave_int]
-        for chave_dict in ('caracteres visíveis', 'visíveis contíguos',
-                           'caracteres visíveis insensíveis',
-                           'visíveis contíguos insensíveis'):
-            for chave_chave in resultado_linha[chave_dict]:
-                estatísticas[chave_dict].setdefault(chave_chave, 0)
-                estatísticas[chave_dict][chave_chave] += (
-                    resultado_linha[chave_dict][chave_chave])
-
-    # Altera as chaves para facilitar o entendimento.
-    for tupla in ((VAZIO, 'linhas somente caracteres invisíveis'),
-                  ('linha_visível', 'linhas caracteres visíveis'),
-                  (CARACTERE_VISÍVEL, 'quantidade caracteres visíveis'),
-                  (VISÍVEL_CONTÍGUO,
-                   'sequências visíveis contíguas')):
-        chave_anterior, chave_nova = tupla
-        estatísticas[chave_nova] = estatísticas[chave_anterior]
-        del estatísticas[chave_anterior]
-
-    # Uma vez calculadas as estatísticas do texto, devolve um dict
-    # contendo todos os dados levantados.
+    # Combina os resultados encontrados, ponderados pela
+    # multiplicidade de cada linha. Os tokens são internados no
+    # vocabulário e somados aos vetores de contagens do livro.
+    for resultado_linha, multiplicidade in estatísticas_a_considerar:
+        estatísticas.acumula(resultado_linha, multiplicidade)
+
+    # Calcula as estatísticas de caracteres sobre o livro inteiro, de
+    # uma só vez.
+    if caracteres_por_livro:
+        (estatísticas.quantidade_caracteres,
+         estatísticas.caracteres,
+         estatísticas.caracteres_insensíveis) = (
+             conta_caracteres(linhas_a_analisar))
+
+    # Uma vez calculadas as estatísticas do texto, devolve uma
+    # instância de Estatísticas contendo todos os dados levantados.
     futuro.set_result(estatísticas)
 
     return
 
 
+def processa_e_analisa_em_processo(
+        tupla_livro, referência_texto,
+        backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+        tamanho_lote=TAMANHO_LOTE_LINHAS,
+        modelo_tokens=None):
+    """Efetua o processamento e a análise do texto de um livro fora do
+       event loop principal, em um processo de um
+       concurrent.futures.ProcessPoolExecutor: as corrotinas
+       processa_livro e analisa_livro são executadas em um event loop
+       próprio do processo, criado a cada chamada.
+
+    Note que a função precisa estar no nível do módulo para que possa
+    ser serializada com pickle e enviada ao processo; o andamento é
+    exibido na saída de erro padrão do processo.
+
+    Args:
+        tupla_livro: tupla (nome do livro, nome do autor).
+        referência_texto: referência à versão txt do livro devolvida
+                          por TransporteLivros.publica.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        tamanho_lote: int do número de linhas distintas analisadas
+                      por tarefa.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+
+    Returns:
+        As estatísticas analisadas do livro empacotadas por
+        empacota_estatísticas, a serem reconstruídas no processo
+        principal por desempacota_estatísticas.
+    """
+    texto_bruto = obtém_texto(referência_texto)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        futuro_processa_livro = loop.create_future()
+        loop.run_until_complete(
+            processa_livro(tupla_livro, texto_bruto, sys.stderr,
+                           futuro_processa_livro))
+
+        futuro_analisa_livro = loop.create_future()
+        loop.run_until_complete(
+            analisa_livro(tupla_livro, futuro_processa_livro.result(),
+                          sys.stderr, futuro_analisa_livro,
+                          backend_caracteres, tamanho_lote,
+                          modelo_tokens))
+        return empacota_estatísticas(futuro_analisa_livro.result())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def reduz_em_processos(grupos, executor):
+    """Reduz cada grupo de estatísticas ao seu total por redução em
+       árvore (ver _agregação), combinando os pares de cada nível em
+       paralelo nos processos de executor sem bloquear o event loop.
+
+    Args:
+        grupos: dict cujas chaves identificam os grupos e cujos
+                respectivos valores são list não vazias de instâncias
+                de Estatísticas.
+        executor: instância de concurrent.futures.ProcessPoolExecutor.
+
+    Returns:
+        Instância de dict de cada chave para a instância de
+        Estatísticas do total do grupo.
+    """
+    # As estatísticas permanecem empacotadas entre os níveis.
+    loop = asyncio.get_event_loop()
+    grupos = {chave: [empacota_estatísticas(estatísticas)
+                      for estatísticas in itens]
+              for chave, itens in grupos.items()}
+    while not reduzido(grupos):
+        pares, restantes = divide_nível(grupos)
+        futuros = [loop.run_in_executor(executor, soma_empacotadas,
+                                        primeira, segunda)
+                   for _, primeira, segunda in pares]
+        await asyncio.wait(futuros)
+        grupos = junta_nível(pares,
+                             [futuro.result() for futuro in futuros],
+                             restantes)
+    return {chave: desempacota_estatísticas(itens[0])
+            for chave, itens in grupos.items()}
+
+
+async def agrega(estatísticas_por_livro, saída=sys.stderr, executor=None,
+                 manifesto=None, cache=None):
+    """Agrega as estatísticas dos livros em totais por autor e de todos
+       os livros por redução em árvore (ver _agregação): os totais de
+       todos os livros são reduzidos a partir dos totais dos autores.
+
+    Args:
+        estatísticas_por_livro: dict cujas chaves são tuplas
+                                (nome do livro, nome do autor) e
+                                cujos respectivos valores são
+                                instâncias de Estatísticas obtidas de
+                                cada livro.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+        executor: instância de concurrent.futures.ProcessPoolExecutor
+                  em cujos processos os pares de cada nível são
+                  combinados ou None para combiná-los no próprio
+                  processo.
+        manifesto: instância de ManifestoIncremental passada a coleta,
+                   no modo incremental, ou None. Caso fornecido, as
+                   estatísticas dos livros são somadas aos totais
+                   armazenados dos autores (ver _incremental), sempre
+                   no próprio processo.
+        cache: instância de CacheResultados de onde o manifesto obtém
+               as estatísticas dos demais livros de um autor cujo
+               total precise ser reconstruído, ou None.
+
+    Returns:
+        Tupla (dict cujas chaves são os nomes dos autores e cujos
+        respectivos valores são Estatísticas do total de cada autor,
+        Estatísticas do total de todos os livros) ou None caso não haja
+        estatísticas.
+    """
+    if manifesto is not None:
+        plural = len(estatísticas_por_livro) != 1
+        saída.write(f"Atualizando os totais armazenados com as "
+                    f"estatísticas de {len(estatísticas_por_livro)} "
+                    f"livro{'s' if plural else ''} "
+                    f"novo{'s' if plural else ''}.\n")
+        saída.flush()
+        totais = manifesto.atualiza_totais(estatísticas_por_livro, saída,
+                                           cache)
+        saída.write('Atualizados os totais armazenados.\n\n')
+        saída.flush()
+        return totais
+
+    if not estatísticas_por_livro:
+        return None
+
+    livros_por_autor = agrupa_por_autor(estatísticas_por_livro)
+    saída.write(f"Agregando as estatísticas de "
+                f"{len(estatísticas_por_livro)} livro"
+                f"{'s' if len(estatísticas_por_livro) > 1 else ''} por "
+                f"autor.\n")
+    saída.flush()
+    if executor is None:
+        totais_autores = reduz_em_árvore(livros_por_autor)
+        total = reduz_em_árvore(
+            {None: list(totais_autores.values())})[None]
+    else:
+        totais_autores = await reduz_em_processos(livros_por_autor,
+                                                  executor)
+        total = (await reduz_em_processos(
+            {None: list(totais_autores.values())}, executor))[None]
+    saída.write(f"Agregadas as estatísticas de "
+                f"{len(estatísticas_por_livro)} livro"
+                f"{'s' if len(estatísticas_por_livro) > 1 else ''} por "
+                f"autor.\n\n")
+    saída.flush()
+
+    return totais_autores, total
+
+
 async def exibe_livro(tupla_livro, estatísticas, saída):
     """Exibe os principais valores de estatísticas obtidas para
        o livro.
 
     Args:
         tupla_livro: tupla (nome do livro, nome do autor).
-        estatísticas: dict contendo as estatísticas obtidas do livro.
+        estatísticas: instância de Estatísticas obtidas do livro.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+    """
+    nome_livro, nome_autor = tupla_livro
+    await exibe_estatísticas(f"Estatísticas de '{nome_livro}' de "
+                             f"'{nome_autor}'", estatísticas, saída)
+
+
+async def exibe_estatísticas(título, estatísticas, saída):
+    """Exibe os principais valores de estatísticas obtidas de um livro
+       ou de um conjunto de livros.
+
+    Args:
+        título: str do título da seção.
+        estatísticas: instância de Estatísticas.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
     """
@@ -656,37 +1172,20 @@ async def exibe_livro(tupla_livro, estatísticas, saída):
     if not estatísticas:
         return
 
-    nome_livro, nome_autor = tupla_livro
+    linhas_invisíveis = estatísticas.linhas_invisíveis
+    linhas_visíveis = estatísticas.linhas_visíveis
+    total_linhas = estatísticas.total_linhas
+
+    # Os histogramas mantêm os caracteres mais utilizados a cada soma
+    # (ver HistogramaCaracteres), sem que sejam percorridos aqui.
+    (quantidade_caractere_mais_utilizado,
+     caracteres_mais_utilizados) = (
+         estatísticas.caracteres.mais_frequentes())
+    (quantidade_caractere_insensível_mais_utilizado,
+     caracteres_insensíveis_mais_utilizados) = (
+         estatísticas.caracteres_insensíveis.mais_frequentes())
 
-    linhas_invisíveis = estatísticas['linhas somente caracteres invisíveis']
-    linhas_visíveis = estatísticas['linhas caracteres visíveis']
-    total_linhas = linhas_invisíveis + linhas_visíveis
-
-    quantidade_caractere_mais_utilizado = 0
-    caracteres_mais_utilizados = set()
-    for cv_ in estatísticas['caracteres visíveis']:
-        if (estatísticas['caracteres visíveis'][cv_]
-                > quantidade_caractere_mais_utilizado):
-            quantidade_caractere_mais_utilizado = (
-                estatísticas['caracteres visíveis'][cv_])
-            caracteres_mais_utilizados = set({cv_})
-        elif (estatísticas['caracteres visíveis'][cv_]
-              == quantidade_caractere_mais_utilizado):
-            caracteres_mais_utilizados.add(cv_)
-
-    quantidade_caractere_insensível_mais_utilizado = 0
-    caracteres_insensíveis_mais_utilizados = set()
-    for cvi in estatísticas['caracteres visíveis insensíveis']:
-        if (estatísticas['caracteres visíveis insensíveis'][cvi]
-                > quantidade_caractere_insensível_mais_utilizado):
-            quantidade_caractere_insensível_mais_utilizado = (
-                estatísticas['caracteres visíveis insensíveis'][cvi])
-            caracteres_insensíveis_mais_utilizados = set({cvi})
-        elif (estatísticas['caracteres visíveis insensíveis'][cvi]
-              == quantidade_caractere_insensível_mais_utilizado):
-            caracteres_insensíveis_mais_utilizados.add(cvi)
-
-    saída.write(f"[ Estatísticas de '{nome_livro}' de '{nome_autor}' ]\n")
+    saída.write(f"[ {título} ]\n")
     saída.write('\n')
     saída.write(f"    Número de linhas sem nenhum caractere visível: "
                 f"{linhas_invisíveis}\n")
@@ -695,10 +1194,10 @@ async def exibe_livro(tupla_livro, estatísticas, saída):
     saída.write(f"    Total de linhas: {total_linhas}\n")
     saída.write('\n')
     saída.write(f"    Número de caracteres visíveis: "
-                f"{estatísticas['quantidade caracteres visíveis']}\n")
+                f"{estatísticas.quantidade_caracteres}\n")
     saída.write(f"    Número de sequências contíguas de caracteres "
                 f"visíveis: "
-                f"{estatísticas['sequências visíveis contíguas']}\n")
+                f"{estatísticas.quantidade_sequências}\n")
     saída.write('\n')
 
     vezes = quantidade_caractere_mais_utilizado > 1
@@ -740,45 +1239,51 @@ async def exibe_livro(tupla_livro, estatísticas, saída):
                     f").\n")
     saída.write('\n')
 
-    quantidade_sequência_mais_utilizada = 0
-    sequências_mais_utilizadas = set()
-    comprimento_maior_sequência = 0
-    maiores_sequências = set()
-    for vc_ in estatísticas['visíveis contíguos']:
-        if len(vc_) > comprimento_maior_sequência:
-            comprimento_maior_sequência = len(vc_)
-            maiores_sequências = set({vc_})
-        elif len(vc_) == comprimento_maior_sequência:
-            maiores_sequências.add(vc_)
-
-        if (estatísticas['visíveis contíguos'][vc_]
-                > quantidade_sequência_mais_utilizada):
-            quantidade_sequência_mais_utilizada = (
-                estatísticas['visíveis contíguos'][vc_])
-            sequências_mais_utilizadas = set({vc_})
-        elif (estatísticas['visíveis contíguos'][vc_]
-              == quantidade_sequência_mais_utilizada):
-            sequências_mais_utilizadas.add(vc_)
-
-    quantidade_sequência_insensível_mais_utilizada = 0
-    sequências_insensíveis_mais_utilizadas = set()
-    comprimento_maior_sequência_insensível = 0
-    maiores_sequências_insensíveis = set()
-    for vci in estatísticas['visíveis contíguos insensíveis']:
-        if len(vci) > comprimento_maior_sequência_insensível:
-            comprimento_maior_sequência_insensível = len(vci)
-            maiores_sequências_insensíveis = set({vci})
-        elif len(vci) == comprimento_maior_sequência_insensível:
-            maiores_sequências_insensíveis.add(vci)
-
-        if (estatísticas['visíveis contíguos insensíveis'][vci]
-                > quantidade_sequência_insensível_mais_utilizada):
-            quantidade_sequência_insensível_mais_utilizada = (
-                estatísticas['visíveis contíguos insensíveis'][vci])
-            sequências_insensíveis_mais_utilizadas = set({vci})
-        elif (estatísticas['visíveis contíguos insensíveis'][vci]
-              == quantidade_sequência_insensível_mais_utilizada):
-            sequências_insensíveis_mais_utilizadas.add(vci)
+    # Os histogramas de tokens, exatos, resumidos (ver _resumo_tokens)
+    # ou aproximados (ver _esboços), fornecem os tokens mais frequentes
+    # e os mais longos, mantidos a cada soma ou limitados à capacidade.
+    (quantidade_sequência_mais_utilizada,
+     sequências_mais_utilizadas) = (
+         estatísticas.sequências.mais_frequentes())
+    (comprimento_maior_sequência,
+     maiores_sequências) = estatísticas.sequências.mais_longos()
+    (quantidade_sequência_insensível_mais_utilizada,
+     sequências_insensíveis_mais_utilizadas) = (
+         estatísticas.sequências_insensíveis.mais_frequentes())
+    (comprimento_maior_sequência_insensível,
+     maiores_sequências_insensíveis) = (
+         estatísticas.sequências_insensíveis.mais_longos())
+
+    # No modo resumido, as contagens das sequências podem ser
+    # estimativas que excedem as contagens reais em no máximo erro
+    # vezes.
+    erro = 0
+    if isinstance(estatísticas.sequências, ResumoTokens):
+        erro = max(estatísticas.sequências.erro_máximo(),
+                   estatísticas.sequências_insensíveis.erro_máximo())
+    # No modo aproximado, o erro das contagens é garantido com uma
+    # probabilidade e o número de sequências distintas é estimado.
+    confiança = ''
+    if isinstance(estatísticas.sequências, EsboçoTokens):
+        probabilidade = estatísticas.sequências.contagem_mínima.confiança
+        confiança = f" com probabilidade de {probabilidade * 100:g}%"
+    if erro:
+        saída.write(f"    Contagens de sequências estimadas, com erro "
+                    f"de até {erro} vez{'es' if erro > 1 else ''}"
+                    f"{confiança}.\n")
+    if isinstance(estatísticas.sequências, EsboçoTokens):
+        distintos = estatísticas.sequências.distintos
+        distintos_insensíveis = (
+            estatísticas.sequências_insensíveis.distintos)
+        saída.write(f"    Número estimado de sequências distintas "
+                    f"sensíveis a maiúsculas e minúsculas: "
+                    f"{distintos.estima()} "
+                    f"(erro padrão de {distintos.erro_padrão():.1%}).\n")
+        saída.write(f"    Número estimado de sequências distintas "
+                    f"insensíveis a maiúsculas e minúsculas: "
+                    f"{distintos_insensíveis.estima()} "
+                    f"(erro padrão de "
+                    f"{distintos_insensíveis.erro_padrão():.1%}).\n")
 
     vezes = quantidade_sequência_mais_utilizada > 1
     mais_utilizadas_ordenadas = (
@@ -852,23 +1357,31 @@ async def exibe_livro(tupla_livro, estatísticas, saída):
     saída.flush()
 
 
-async def exibe(estatísticas_por_livro, saída=sys.stdout):
+async def exibe(estatísticas_por_livro, saída=sys.stdout, totais=None,
+                livros_por_autor=None):
     """Exibe os principais valores de estatísticas obtidas de
-       cada livro.
+       cada livro e, caso fornecidos, os totais de cada autor com mais
+       de um livro e de todos os livros, caso haja mais de um autor.
 
     Args:
         estatísticas_por_livro: dict cujas chaves são tuplas
                                 (nome do livro, nome do autor) e
-                                cujos respectivos valores são dict
-                                contendo as estatísticas obtidas de
+                                cujos respectivos valores são
+                                instâncias de Estatísticas obtidas de
                                 cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        totais: tupla devolvida por agrega ou None.
+        livros_por_autor: dict do nome de cada autor para o número de
+                          livros incluídos nos totais, quando diferente
+                          do número de livros em estatísticas_por_livro
+                          (ver ManifestoIncremental.livros_por_autor),
+                          ou None.
     """
 
     # Caso não existam estatísticas a serem processadas,
     # devolve a função.
-    if not estatísticas_por_livro:
+    if not estatísticas_por_livro and totais is None:
         return
 
     # Distribui os livros pelos autores.
@@ -877,12 +1390,29 @@ async def exibe(estatísticas_por_livro, saída=sys.stdout):
         nome_livro, nome_autor = tupla_livro
         entrada_autor = autores_livros.setdefault(nome_autor, set())
         entrada_autor.add(nome_livro)
+    if livros_por_autor is None:
+        livros_por_autor = {nome_autor: len(autores_livros[nome_autor])
+                            for nome_autor in autores_livros}
 
     # Exibe as estatísticas de livro ordenado primeiramente por autor
     # seguido de nome de livro.
-    for nome_autor in sorted(autores_livros):
-        for nome_livro in sorted(autores_livros[nome_autor]):
+    for nome_autor in sorted(autores_livros.keys() |
+                             livros_por_autor.keys()):
+        for nome_livro in sorted(autores_livros.get(nome_autor, ())):
             tupla_livro = (nome_livro, nome_autor)
             await exibe_livro(tupla_livro,
                               estatísticas_por_livro[tupla_livro],
                               saída)
+        quantidade_livros = livros_por_autor.get(nome_autor, 0)
+        if (totais is not None and quantidade_livros > 1 and
+                nome_autor in totais[0]):
+            await exibe_estatísticas(
+                f"Estatísticas dos {quantidade_livros} livros de "
+                f"'{nome_autor}'", totais[0][nome_autor], saída)
+
+    # Os totais de todos os livros só diferem dos de um autor caso
+    # haja mais de um autor.
+    if totais is not None and len(livros_por_autor) > 1:
+        await exibe_estatísticas(
+            f"Estatísticas dos {sum(livros_por_autor.values())} livros "
+            f"dos {len(livros_por_autor)} autores", totais[1], saída)
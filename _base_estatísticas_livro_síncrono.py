@@ -4,15 +4,52 @@ Cálculo de estatísticas de livros solicitados disponíveis no
 Project Gutenbert.
 """
 
+import collections
 import pathlib
-import re
 import sys
 import time
 
-from bs4 import BeautifulSoup
 import requests
 import yarl
 
+from _agregação import agrupa_por_autor, reduz_em_árvore
+from _armazenamento import (
+    TAMANHO_BLOCO,
+    caminho_parcial,
+    conclui_arquivo,
+    descarta_parcial,
+)
+from _corte_livro import corta_livro
+from _decodificação import charset_declarado, decodifica_arquivo
+from _esboços import EsboçoTokens
+from _estatísticas import cria_estatísticas
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    conta_caracteres,
+    por_livro,
+)
+from _estatísticas_linha import calcula_estatísticas_linha
+from _metadados_cache import (
+    atualiza_metadados,
+    cabeçalhos_condicionais,
+    lê_metadados,
+    metadados_não_modificado,
+    metadados_resposta,
+    precisa_revalidar,
+)
+from _resolução_url import (
+    CAMINHO_PÁGINA_LIVRO,
+    CAMINHO_ÍNDICE,
+    URL_BASE_SÍTIO,
+    ExtratorLinkTexto,
+    MapaURLs,
+    candidatos_sítio,
+    url_sítio,
+)
+from _resumo_tokens import ResumoTokens
+from _varredura_índice import filtra_autores
+from _índice_autores import busca_livros_autores, grava_índice_autores
+
 
 _PROJECT_GUTENBERG_SOFT_LIMIT = 100
 
@@ -27,53 +64,235 @@ DIRETÓRIO_RAIZ = pathlib.Path([CAMINHO_ARGUMENTO
                                else CAMINHO_ARGUMENTO.parent][0],
                               'arquivos_project_gutenberg')
 
-# NOME_AUTOR_ÍNDICE é uma expressão regular (regex) ingênua para
-# obter dados de linhas do tipo:
-# 'Nome do Livro, by Nome do Autor                                 42'
-# como ('Nome do Livro', 'Nome do Autor', '42')
-# Observação: essa regex é ingênua pois existem livros com nome de
-#             mais de uma linha; sem autor; múltiplos autores
-#             (geralmente não cabe na mesma linha nesse caso); etc.
-NOME_AUTOR_ÍNDICE = re.compile(r'^(\S+.*?),\s+by\s+(\S.*?)\s+([0-9]+)\s*$')
 
+def grava_resposta(resposta, caminho_arquivo):
+    """Escreve o corpo de uma resposta em disco à medida que os blocos
+       chegam, sem materializar o corpo inteiro em memória: os blocos
+       são escritos num arquivo parcial, renomeado atomicamente para
+       caminho_arquivo ao final.
+
+    Args:
+        resposta: instância de requests.Response obtida com stream=True
+                  e com status 200.
+        caminho_arquivo: pathlib.Path do arquivo a ser gravado.
 
-# VAZIO, START_OF, PRODUCED_BY, END_OF e END_OF_NORMAL são regex para
-# processamento de corte do arquivo obtido do Project Gutenberg para
-# obter o conteúdo de fato dos livros.
-VAZIO = re.compile(r'^\s*$')
-START_OF = re.compile(r'^\s*{0}\s+START\s+OF'.format(re.escape('***')))
-PRODUCED_BY = re.compile(r'^\s*Produced\s+by\s+')
-END_OF = re.compile(r'^\s*{0}\s+END\s+OF'.format(re.escape('***')))
-END_OF_NORMAL = re.compile(r'^\s*End\s+of')
+    Returns:
+        Instância de dict com os metadados gravados do arquivo.
+    """
+    caminho_arquivo_parcial = caminho_parcial(caminho_arquivo)
+    try:
+        with caminho_arquivo_parcial.open('wb') as arquivo:
+            for bloco in resposta.iter_content(TAMANHO_BLOCO):
+                arquivo.write(bloco)
+    except BaseException:
+        descarta_parcial(caminho_arquivo_parcial)
+        raise
 
-# CARACTERE_VISÍVEL e VISÍVEL_CONTÍGUO são regex para estatísticas
-# de linha de texto.
-CARACTERE_VISÍVEL = re.compile(r'\S')
-VISÍVEL_CONTÍGUO = re.compile(r'\S+')
+    metadados = metadados_resposta(resposta.headers)
+    metadados['codificação'] = charset_declarado(resposta.headers)
+    conclui_arquivo(caminho_arquivo_parcial, caminho_arquivo, metadados)
+    return metadados
 
 
-def extrai_nome_autor_índice(linha):
-    """Extrai nome do livro, autor do livro e índice do
-       Project Gutenberg, quando possível.
+def baixa_arquivo(sessão, url, caminho_arquivo, saída):
+    """Obtém url escrevendo o corpo da resposta diretamente em disco.
 
     Args:
-        linha: str a ser analisada.
+        sessão: instância de requests.Session.
+        url: str ou yarl.URL do arquivo.
+        caminho_arquivo: pathlib.Path do arquivo a ser gravado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        Instância de dict com os metadados gravados do arquivo ou None
+        caso o arquivo não exista (status 404).
+
+    Raises:
+        requests.HTTPError caso o status seja outro que não 200 ou 404.
+    """
+    with sessão.get(str(url), stream=True) as resposta:
+        # Status 200 é OK e 404 é Not Found
+        # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+        if resposta.status_code == 404:
+            return None
+        resposta.raise_for_status()
+        metadados = grava_resposta(resposta, caminho_arquivo)
+    saída.write(f"Obtido e armazenado o conteúdo de '{url}' em "
+                f"'{caminho_arquivo}'.\n")
+    saída.flush()
+    return metadados
+
+
+def lê_arquivo(caminho_arquivo, saída):
+    """Lê o texto de um arquivo armazenado, decodificando-o uma única
+       vez com a codificação registrada nos seus metadados ou detectada
+       por decodifica_arquivo.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
 
     Returns:
-        Entrega None caso não case a expressão regular
-        NOME_AUTOR_ÍNDICE ou a tupla contendo os valores capturados da
-        regex.
+        str do conteúdo do arquivo.
+    """
+    with caminho_arquivo.open('rb') as arquivo:
+        dados = arquivo.read()
+    return decodifica_arquivo(caminho_arquivo, dados, saída)
+
+
+def aguarda_intervalo(url, saída):
+    """Respeitando a regra de coleta automatizada, espera 2 segundos
+       após uma requisição ao sítio principal.
+
+    Args:
+        url: str ou yarl.URL da requisição realizada.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
     """
-    nome_autor_índice = re.findall(NOME_AUTOR_ÍNDICE, linha)
+    saída.write(f"Esperando 2 segundos após o download de "
+                f"'{url}'.\n")
+    saída.flush()
+    time.sleep(2.)
+    saída.write(f"Esperados 2 segundos após o download de "
+                f"'{url}'.\n")
+    saída.flush()
+
+
+def extrai_url_página(nome_livro, índice, sessão, url_base, saída):
+    """Obtém a URL da versão txt de um livro a partir da sua página
+       HTML, lendo a página em blocos somente até o primeiro link para
+       a versão txt.
+
+    Args:
+        nome_livro: str do nome do livro.
+        índice: str do índice do livro.
+        sessão: instância de requests.Session.
+        url_base: str da URL base do sítio principal.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
 
-    # Caso em que a regex não casou.
-    if not nome_autor_índice:
+    Returns:
+        str da URL da versão txt ou None caso não seja encontrada.
+    """
+    url_versões = yarl.URL(
+        url_sítio(CAMINHO_PÁGINA_LIVRO.format(id=índice), url_base))
+    with sessão.get(str(url_versões), stream=True) as resposta:
+        # Status 200 é OK
+        # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+        assert resposta.status_code == 200
+        extrator = ExtratorLinkTexto(url_versões,
+                                     charset_declarado(resposta.headers))
+        for bloco in resposta.iter_content(TAMANHO_BLOCO):
+            if extrator.alimenta(bloco) is not None:
+                break
+    saída.write(f"Obtido conteúdo de '{url_versões}'.\n")
+    saída.flush()
+    aguarda_intervalo(url_versões, saída)
+
+    if extrator.url_texto is None:
+        saída.write(f"Não encontrado nenhum path para URL de "
+                    f"versão txt de '{nome_livro}'.\n")
+    else:
+        saída.write(f"Encontrado path da URL da versão "
+                    f"txt de '{nome_livro}'.\n")
+    saída.flush()
+    return extrator.url_texto
+
+
+def baixa_livro_sítio_principal(nome_livro, índice, caminho_arquivo_livro,
+                                sessão, mapa_urls, url_base, saída):
+    """Obtém a versão txt de um livro a partir do sítio principal do
+       Project Gutenberg, armazenando-a em caminho_arquivo_livro.
+
+    São tentadas, nesta ordem: a URL já resolvida em mapa_urls, os
+    caminhos conhecidos da estrutura de arquivos do sítio e, em último
+    caso, o link encontrado na página HTML do livro. A URL que resultar
+    no download é registrada em mapa_urls.
+
+    Args:
+        nome_livro: str do nome do livro.
+        índice: str do índice do livro.
+        caminho_arquivo_livro: pathlib.Path do arquivo a ser gravado.
+        sessão: instância de requests.Session.
+        mapa_urls: instância de MapaURLs com as URLs já resolvidas.
+        url_base: str da URL base do sítio principal.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        str da URL de onde a versão txt foi obtida ou None caso não
+        seja encontrada.
+    """
+    url_resolvida = mapa_urls.obtém(índice)
+    candidatos = ([url_resolvida] if url_resolvida is not None else [])
+    candidatos.extend(url
+                      for url in candidatos_sítio(índice, url_base)
+                      if url != url_resolvida)
+
+    # Obtém o arquivo contendo a versão txt do livro solicitado,
+    # escrevendo-o em disco à medida que é recebido.
+    for url_texto in candidatos:
+        metadados = baixa_arquivo(sessão, url_texto,
+                                  caminho_arquivo_livro, saída)
+        aguarda_intervalo(url_texto, saída)
+        if metadados is not None:
+            mapa_urls.registra(índice, url_texto)
+            return url_texto
+
+    # Nenhum caminho conhecido existe: recorre à página do livro.
+    url_texto = extrai_url_página(nome_livro, índice, sessão, url_base,
+                                  saída)
+    if url_texto is None:
+        mapa_urls.registra(índice, None)
         return None
 
-    return nome_autor_índice[0]
+    metadados = baixa_arquivo(sessão, url_texto, caminho_arquivo_livro,
+                              saída)
+    assert metadados is not None
+    aguarda_intervalo(url_texto, saída)
+    mapa_urls.registra(índice, url_texto)
+
+    return url_texto
 
 
-def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
+def revalida_arquivo(sessão, url, caminho_arquivo, saída):
+    """Revalida um arquivo armazenado por meio de um GET condicional
+       (If-None-Match / If-Modified-Since): caso o servidor responda
+       304, somente os metadados são atualizados; caso contrário, o
+       arquivo é substituído pelo novo conteúdo.
+
+    Args:
+        sessão: instância de requests.Session.
+        url: yarl.URL do arquivo.
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+    """
+    cabeçalhos = cabeçalhos_condicionais(lê_metadados(caminho_arquivo))
+    with sessão.get(str(url), headers=cabeçalhos,
+                    stream=True) as resposta:
+        # Status 304 é Not Modified
+        # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
+        if resposta.status_code == 304:
+            atualiza_metadados(caminho_arquivo,
+                               **metadados_não_modificado(
+                                   resposta.headers))
+            saída.write(f"Conteúdo de '{url}' não modificado desde a "
+                        f"última obtenção.\n")
+            saída.flush()
+            return
+        assert resposta.status_code == 200
+        grava_resposta(resposta, caminho_arquivo)
+    saída.write(f"Obtido e armazenado o conteúdo de '{url}' em "
+                f"'{caminho_arquivo}'.\n")
+    saída.flush()
+
+
+def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr,
+           sessão=None, idade_máxima_índice=None, url_base=URL_BASE_SÍTIO,
+           diretório=DIRETÓRIO_RAIZ, manifesto=None):
     """Efetua a coleta dos textos dos livros de um autor disponíveis no
        Project Gutenberg: caso estejam armazenados localmente, fará
        a leitura dos arquivo; caso contrário, coletará do próprio
@@ -84,6 +303,25 @@ def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                  buscados.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        sessão: instância de requests.Session utilizada em todas as
+                requisições, podendo ser reutilizada entre chamadas.
+                Caso None, uma sessão é criada e fechada ao final da
+                coleta.
+        idade_máxima_índice: idade máxima, em segundos, do arquivo de
+                             índices armazenado localmente antes de ser
+                             revalidado por um GET condicional. Caso
+                             None, o arquivo armazenado é sempre
+                             utilizado.
+        url_base: str da URL base do sítio de onde o índice e os livros
+                  são obtidos; permite direcionar a coleta a outro
+                  servidor com a mesma estrutura, como
+                  servidor_gutenberg_local.py.
+        diretório: pathlib.Path do diretório onde os arquivos obtidos
+                   são armazenados.
+        manifesto: instância de ManifestoIncremental, no modo
+                   incremental, ou None. Caso fornecido, os livros já
+                   analisados cujo arquivo não mudou não são lidos e
+                   somente os livros novos ou alterados são devolvidos.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
@@ -92,6 +330,12 @@ def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
         versão txt dos livros.
     """
 
+    if sessão is None:
+        with requests.Session() as sessão_coleta:
+            return coleta(autores, saída, sessão_coleta,
+                          idade_máxima_índice, url_base, diretório,
+                          manifesto)
+
     # Variável que irá armazenar o resultado final.
     textos_livros = {}
 
@@ -114,60 +358,59 @@ def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
     # http://www.gutenberg.org/MIRRORS.ALL
 
     # Lista de todos os livros:
-    URL_ÍNDICE = yarl.URL('http://www.gutenberg.org/dirs/GUTINDEX.ALL')
+    URL_ÍNDICE = yarl.URL(url_sítio(CAMINHO_ÍNDICE, url_base))
     nome_arquivo_índice = URL_ÍNDICE.path.split('/')[-1]
 
     # Obtém as linhas do arquivo de índices.
     texto_índice = ''
-    caminho_arquivo_índice = pathlib.Path(DIRETÓRIO_RAIZ,
-                                          nome_arquivo_índice)
-    if caminho_arquivo_índice.is_file():
-        # Abre arquivo prévio e lê seu conteúdo.
-        with caminho_arquivo_índice.open('rt',
-                                         encoding='utf-8') as arquivo_índice:
-            texto_índice = arquivo_índice.read()
-        saída.write(f"Lido conteúdo de '{nome_arquivo_índice}' a partir de "
+    caminho_arquivo_índice = pathlib.Path(diretório, nome_arquivo_índice)
+
+    # Caso o arquivo de índices armazenado seja mais antigo que o
+    # permitido, revalida-o antes de utilizá-lo.
+    if (caminho_arquivo_índice.is_file() and
+            precisa_revalidar(caminho_arquivo_índice, idade_máxima_índice)):
+        revalida_arquivo(sessão, URL_ÍNDICE, caminho_arquivo_índice, saída)
+
+    # Caso exista um índice auxiliar válido para o arquivo de índices
+    # armazenado localmente, consulta diretamente os livros dos autores
+    # solicitados, sem ler nem varrer o arquivo de índices.
+    tuplas_livros_autor = busca_livros_autores(caminho_arquivo_índice,
+                                               autores_set)
+    if tuplas_livros_autor is not None:
+        saída.write(f"Consultado o índice de autores de "
                     f"'{caminho_arquivo_índice}'.\n")
         saída.flush()
     else:
-        # Obtém o arquivo de índices de Project Gutenberg.
-        with requests.get(str(URL_ÍNDICE)) as resposta:
-            # Status 200 é OK
-            # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-            assert resposta.status_code == 200
-            texto_índice = resposta.text
-        saída.write(f"Obtido conteúdo de '{URL_ÍNDICE}'.\n")
-        saída.flush()
-        # Armazena o arquivo de índices de Project Gutenberg.
-        with caminho_arquivo_índice.open('wt',
-                                         encoding='utf-8') as arquivo_índice:
-            arquivo_índice.write(texto_índice)
-        saída.write(f"Armazenado o conteúdo de '{URL_ÍNDICE}' em "
+        if not caminho_arquivo_índice.is_file():
+            # Obtém o arquivo de índices de Project Gutenberg,
+            # armazenando-o à medida que é recebido.
+            metadados_índice = baixa_arquivo(
+                sessão, URL_ÍNDICE, caminho_arquivo_índice, saída)
+            assert metadados_índice is not None
+
+        # Abre arquivo armazenado e lê seu conteúdo.
+        texto_índice = lê_arquivo(caminho_arquivo_índice, saída)
+        saída.write(f"Lido conteúdo de '{nome_arquivo_índice}' a partir de "
                     f"'{caminho_arquivo_índice}'.\n")
         saída.flush()
 
-    # Divide o conteúdo em linhas.
-    linhas_índice = texto_índice.split('\n')
-
-    # Instancia um list para armazenar o resultado de cada linha.
-    resultado_linhas = []
-
-    # Obtém as tuplas de nome, autor, índice.
-    saída.write(f"Processando as linhas de '{caminho_arquivo_índice}'.\n")
-    saída.flush()
-    for linha in linhas_índice:
-        resultado = extrai_nome_autor_índice(linha)
-        if not resultado:
-            continue
-        resultado_linhas.append(resultado)
-    saída.write(f"Processadas as linhas de '{caminho_arquivo_índice}'.\n")
-    saída.flush()
-
-    # Filtra as tuplas de acordo com o autor estando em autores_set.
-    tuplas_livros_autor = (
-        [tupla
-         for tupla in resultado_linhas
-         if tupla and tupla[1] in autores_set])
+    if tuplas_livros_autor is None:
+        # Obtém as tuplas de nome, autor, índice numa única passada pelo
+        # texto do índice, armazenando-as no índice auxiliar para que as
+        # próximas execuções não precisem varrer o arquivo novamente.
+        # Em seguida, filtra as tuplas de acordo com o autor estando em
+        # autores_set.
+        saída.write(f"Processando as linhas de "
+                    f"'{caminho_arquivo_índice}'.\n")
+        saída.flush()
+        grava_índice_autores(caminho_arquivo_índice, texto_índice)
+        tuplas_livros_autor = busca_livros_autores(
+            caminho_arquivo_índice, autores_set)
+        if tuplas_livros_autor is None:
+            tuplas_livros_autor = filtra_autores(texto_índice, autores_set)
+        saída.write(f"Processadas as linhas de "
+                    f"'{caminho_arquivo_índice}'.\n")
+        saída.flush()
 
     # Lista os livros obtidos por autor solicitado.
     autores_livros = {autor: set()
@@ -195,10 +438,6 @@ def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                         f"{', '.join(sorted(autores_livros[nome_autor]))}.\n")
         saída.flush()
 
-    # Para este exemplo, iremos usar o sítio principal para coletar
-    # a versão txt dos livros, com a URL base do Project Gutenberg.
-    URL_BASE_LIVRO = "http://www.gutenberg.org/ebooks/{id}"
-
     # Sobre uso de robôs:
     # http://www.gutenberg.org/wiki/Gutenberg:Information_About_Robot_Access_to_our_Pages
     # Algumas regras sobre a coleta automatizada:
@@ -220,86 +459,54 @@ def coleta(autores=frozenset({'Machado de Assis'}), saída=sys.stderr):
                     f"Project Gutenberg!\n\n")
         saída.flush()
 
+    # No modo incremental, os livros já analisados cujo arquivo não
+    # mudou não são lidos.
+    if manifesto is not None:
+        quantidade_listados = len(tuplas_livros_autor)
+        tuplas_livros_autor = manifesto.filtra_inalterados(
+            tuplas_livros_autor)
+        saída.write(f"Modo incremental: "
+                    f"{quantidade_listados - len(tuplas_livros_autor)} de "
+                    f"{quantidade_listados} livros já analisados.\n")
+        saída.flush()
+
+    # URLs da versão txt já resolvidas em execuções anteriores.
+    mapa_urls = MapaURLs(diretório)
+
     for tupla in tuplas_livros_autor:
         nome_livro, nome_autor, índice = tupla
 
         nome_arquivo_livro = f"{índice}.txt"
-        texto_livro = ''
-        caminho_arquivo_livro = pathlib.Path(DIRETÓRIO_RAIZ,
-                                             nome_arquivo_livro)
-
-        if caminho_arquivo_livro.is_file():
-            # Abre arquivo prévio e lê seu conteúdo.
-            with caminho_arquivo_livro.open('rt',
-                                            encoding='utf-8') as arquivo_livro:
-                texto_livro = arquivo_livro.read()
-            saída.write(f"Lido conteúdo de '{nome_livro}' a partir de "
-                        f"'{caminho_arquivo_livro}'.\n")
-            saída.flush()
-        else:
-            # Obtém o arquivo contendo as versões do livro solicitado.
-            url_versões = yarl.URL(URL_BASE_LIVRO.format(id=índice))
-            with requests.get(str(url_versões)) as resposta:
-                # Status 200 é OK
-                # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-                assert resposta.status_code == 200
-                texto_versões = resposta.text
-                saída.write(f"Obtido conteúdo de '{url_versões}'.\n")
-                saída.flush()
-
-            # Analisa o HTML para extrair a URL da versão txt.
-            url_texto_sem_scheme = ''
-            soup = BeautifulSoup(texto_versões, 'html.parser')
-            for a_href in soup.find_all('a', href=True):
-                if ('.txt' in a_href.attrs['href'] and
-                        '-readme' not in a_href.attrs['href']):
-                    url_texto_sem_scheme = a_href.attrs['href']
-                    saída.write(f"Encontrado path da URL da versão "
-                                f"txt de '{nome_livro}'.\n")
-                    saída.flush()
-                    break
+        caminho_arquivo_livro = pathlib.Path(diretório, nome_arquivo_livro)
+
+        if not caminho_arquivo_livro.is_file():
+            url_texto = baixa_livro_sítio_principal(
+                nome_livro, índice, caminho_arquivo_livro, sessão,
+                mapa_urls, url_base, saída)
 
             # Caso não encontre uma url válida, continua para
             # o próximo livro.
-            if not url_texto_sem_scheme:
-                saída.write(f"Não encontrado nenhum path para URL de "
-                            f"versão txt de '{nome_livro}'.\n")
-                saída.flush()
+            if url_texto is None:
                 continue
 
-            # Obtém o arquivo contendo a versão txt do livro solicitado.
-            url_texto = yarl.URL(f"{url_versões.scheme}:"
-                                 f"{url_texto_sem_scheme}")
-            with requests.get(str(url_texto)) as resposta:
-                # Status 200 é OK
-                # https://www.w3.org/Protocols/rfc2616/rfc2616-sec10.html
-                assert resposta.status_code == 200
-                texto_livro = resposta.text
-                saída.write(f"Obtido conteúdo de '{url_texto}'.\n")
-                saída.flush()
-
-            # Armazena o arquivo contendo a versão txt do livro solicitado.
-            with caminho_arquivo_livro.open('wt',
-                                            encoding='utf-8') as arquivo_livro:
-                arquivo_livro.write(texto_livro)
-                saída.write(f"Armazenado o conteúdo de '{url_texto}' em "
-                            f"'{caminho_arquivo_livro}'.\n")
-                saída.flush()
-
-            # Respeitando a regra de coleta automatizada,
-            # esperaremos 2 segundos
-            saída.write(f"Esperando 2 segundos após o download de "
-                        f"'{url_texto}'.\n")
-            saída.flush()
-            time.sleep(2.)
-            saída.write(f"Esperados 2 segundos após o download de "
-                        f"'{url_texto}'.\n")
-            saída.flush()
+        # Abre o arquivo armazenado e lê seu conteúdo.
+        texto_livro = lê_arquivo(caminho_arquivo_livro, saída)
+        saída.write(f"Lido conteúdo de '{nome_livro}' a partir de "
+                    f"'{caminho_arquivo_livro}'.\n")
+        saída.flush()
+
+        # Caso o texto não tenha mudado desde a análise registrada no
+        # manifesto, o livro não é devolvido.
+        if manifesto is not None and not manifesto.pendente(tupla,
+                                                            texto_livro):
+            continue
 
         # Armazena num dict usando o nome do livro como chave e
         # o texto como valor.
         textos_livros[(nome_livro, nome_autor)] = texto_livro
 
+    mapa_urls.grava()
+
     saída.write('Terminada a coleta dos arquivos.\n\n')
     saída.flush()
     return textos_livros
@@ -317,8 +524,8 @@ def processa_livro(tupla_livro, texto_bruto, saída):
                andamento do método.
 
     Returns:
-        Entrega a list contendo todas as linhas a serem analisadas do
-        livro.
+        Entrega a instância de CorpoLivro contendo todas as linhas a
+        serem analisadas do livro.
     """
     nome_livro, nome_autor = tupla_livro
     saída.write(f"Processando o corte do conteúdo bruto de "
@@ -344,176 +551,42 @@ def processa_livro(tupla_livro, texto_bruto, saída):
     # Também é possível que existam outros comentários antes do
     # título do livro.
 
-    # Como o corte possui regras de linhas sequenciais, aparentemente
-    # não há vantagem em fazer o processamento concorrentemente entre
-    # as linhas.
-
-    # Divide o texto bruto do Project Gutenberg por linhas.
-    linhas = texto_bruto.split('\n')
-    range_linhas = range(len(linhas))
-
-    # Busca a primeira linha que começa com
-    # *** START OF
-    índice_start_of = None
-    for índice in range_linhas:
-        if re.findall(START_OF, linhas[índice]):
-            índice_start_of = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_start_of:
-        return list()
-
-    # Busca a primeira linha que começa com
-    # Produced by
-    # após a linha que começa com
-    # *** START OF
-    índice_produced_by = None
-    for índice in range_linhas[índice_start_of+1:]:
-        if re.findall(PRODUCED_BY, linhas[índice]):
-            índice_produced_by = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_produced_by:
-        return list()
-
-    # Busca a primeira linha com todos os caracteres de letras em
-    # maiúsculo após a linha que começa com
-    # Produced by
-    índice_primeiro_upper = None
-    for índice in range_linhas[índice_produced_by+1:]:
-        if linhas[índice].isupper():
-            índice_primeiro_upper = índice
-            break
-
-    # Se não foi encontrado nenhum casamento, não é
-    # um formato esperado.
-    if not índice_primeiro_upper:
-        return list()
-
-    # Busca a última linha que começa com
-    # *** END OF
-    # Note que a sequência é feita da último linha para a primeira.
-    índice_end_of = None
-    for índice in range_linhas[::-1]:
-        if re.findall(END_OF, linhas[índice]):
-            índice_end_of = índice
-            break
-
-    # Busca a última linha que começa com
-    # End of
-    # antes da linha que começa com
-    # *** END OF
-    índice_end_of_normal = None
-    for índice in range_linhas[índice_end_of-1::-1]:
-        if re.findall(END_OF_NORMAL, linhas[índice]):
-            índice_end_of_normal = índice
-            break
-
-    # Busca a última linha com caracteres visíveis antes da linha que
-    # começa com
-    # End of
-    índice_último_visível = None
-    for índice in range_linhas[índice_end_of_normal-1::-1]:
-        if not re.findall(VAZIO, linhas[índice]):
-            índice_último_visível = índice
-            break
+    # As fronteiras do conteúdo são encontradas por buscas ancoradas
+    # sobre o texto bruto, que devolvem posições de caracteres: somente
+    # o trecho mantido é dividido em linhas.
+    linhas_a_analisar = corta_livro(texto_bruto)
 
     saída.write(f"Processado o corte do conteúdo bruto de "
                 f"'{nome_livro}' de '{nome_autor}'.\n")
     saída.flush()
 
     # Uma vez determinada a primeira linha do título e a última linha
-    # com caracteres visíveis, devolve um list contendo todas as linhas
-    # nesse intervalo, inclusive as duas.
-    return (
-        linhas[índice_primeiro_upper:índice_último_visível+1])
+    # com caracteres visíveis, devolve um CorpoLivro contendo todas as
+    # linhas nesse intervalo, inclusive as duas.
+    return linhas_a_analisar
 
 
-def analisa_linha_livro(linha):
+def analisa_linha_livro(linha, com_caracteres=True):
     """Extrai dados de uma linha a ser analisada de um livro.
 
     Args:
         linha: str a ser analisada.
+        com_caracteres: bool indicando se as estatísticas de
+                        caracteres são calculadas na linha.
 
     Returns:
-        Entrega um dict cujas chaves são estatísticas calculadas na linha.
+        Entrega uma instância de Estatísticas da linha ou None caso
+        linha não seja str.
     """
 
-    # Variável que irá armazenar o resultado final.
-    estatísticas_linha = {}
+    # Os quatro histogramas são obtidos em uma passada linear sobre a
+    # linha, compartilhada com a versão assíncrona.
+    return calcula_estatísticas_linha(linha, com_caracteres)
 
-    # Caso não possua linha a ser analisada,
-    # devolve sem informações úteis.
-    if not isinstance(linha, str):
-        return estatísticas_linha
-
-    # Verifica se a linha é composta somente de caracteres invisíveis.
-    vazio = bool(re.findall(VAZIO, linha))
-    estatísticas_linha[VAZIO] = vazio
-
-    if vazio:
-        estatísticas_linha['linha_visível'] = 0
-        estatísticas_linha[CARACTERE_VISÍVEL] = 0
-        estatísticas_linha[VISÍVEL_CONTÍGUO] = 0
-        estatísticas_linha['caracteres visíveis'] = {}
-        estatísticas_linha['visíveis contíguos'] = {}
-        estatísticas_linha['caracteres visíveis insensíveis'] = {}
-        estatísticas_linha['visíveis contíguos insensíveis'] = {}
-    else:
-        # Encontra caracteres visíveis e sequências contíguas de
-        # caracteres visíveis.
-        caracteres_visíveis = re.findall(CARACTERE_VISÍVEL, linha)
-        visíveis_contíguos = re.findall(VISÍVEL_CONTÍGUO, linha)
-
-        # Gera conjuntos para facilitar o histograma.
-        caracteres_visíveis_set = frozenset(caracteres_visíveis)
-        visíveis_contíguos_set = frozenset(visíveis_contíguos)
-
-        # Considera a versão minúscula como versão insensível ao caso.
-        caracteres_visíveis_insensíveis = [cv_.lower()
-                                           for cv_ in caracteres_visíveis]
-        visíveis_contíguos_insensíveis = [vc_.lower()
-                                          for vc_ in visíveis_contíguos]
-
-        # Gera conjuntos para facilitar o histograma.
-        caracteres_visíveis_insensíveis_set = (
-            frozenset(caracteres_visíveis_insensíveis))
-        visíveis_contíguos_insensíveis_set = (
-            frozenset(visíveis_contíguos_insensíveis))
-
-        # Utiliza o método count de lista para gerar os histogramas.
-        caracteres_visíveis_dict = {cv_: caracteres_visíveis.count(cv_)
-                                    for cv_ in caracteres_visíveis_set}
-        visíveis_contíguos_dict = {vc_: visíveis_contíguos.count(vc_)
-                                   for vc_ in visíveis_contíguos_set}
-        caracteres_visíveis_insensíveis_dict = {
-            cvi: caracteres_visíveis_insensíveis.count(cvi)
-            for cvi in caracteres_visíveis_insensíveis_set}
-        visíveis_contíguos_insensíveis_dict = {
-            vci: visíveis_contíguos_insensíveis.count(vci)
-            for vci in visíveis_contíguos_insensíveis_set}
-
-        # Atribui os valores obtidos.
-        estatísticas_linha['linha_visível'] = 1
-        estatísticas_linha[CARACTERE_VISÍVEL] = len(caracteres_visíveis)
-        estatísticas_linha[VISÍVEL_CONTÍGUO] = len(visíveis_contíguos)
-        estatísticas_linha['caracteres visíveis'] = (
-            caracteres_visíveis_dict)
-        estatísticas_linha['visíveis contíguos'] = (
-            visíveis_contíguos_dict)
-        estatísticas_linha['caracteres visíveis insensíveis'] = (
-            caracteres_visíveis_insensíveis_dict)
-        estatísticas_linha['visíveis contíguos insensíveis'] = (
-            visíveis_contíguos_insensíveis_dict)
-
-    return estatísticas_linha
-
-
-def analisa_livro(tupla_livro, linhas_a_analisar, saída):
+
+def analisa_livro(tupla_livro, linhas_a_analisar, saída,
+                  backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+                  modelo_tokens=None):
     """Efetua a análise dos texto de um livro de Machado de Assis
        disponível no Project Gutenberg: efetua uma análise
        estatística arbitrária para fins de exemplo no texto de
@@ -521,18 +594,23 @@ def analisa_livro(tupla_livro, linhas_a_analisar, saída):
 
     Args:
         tupla_livro: tupla (nome do livro, nome do autor).
-        linhas_a_analisar: list das linhas a serem analisadas de
-                           cada livro.
+        linhas_a_analisar: CorpoLivro (ou outra sequência de str) das
+                           linhas a serem analisadas de cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
 
     Returns:
-        Entrega o dict contendo todas as estatísticas analisadas do
-        livro.
+        Entrega a instância de Estatísticas contendo todas as
+        estatísticas analisadas do livro.
     """
 
     # Variável que irá armazenar o resultado final.
-    estatísticas = {}
+    estatísticas = cria_estatísticas(modelo_tokens)
 
     nome_livro, nome_autor = tupla_livro
 
@@ -551,67 +629,137 @@ def analisa_livro(tupla_livro, linhas_a_analisar, saída):
                 f"'{nome_autor}'.\n")
     saída.flush()
 
-    # Obtém as estatísticas de cada linha.
-    for linha in linhas_a_analisar:
-        resultado = analisa_linha_livro(linha)
+    # Obtém as estatísticas de cada linha distinta, uma única vez:
+    # linhas repetidas (linhas em branco, separadores como "* * *")
+    # têm suas estatísticas multiplicadas pelo número de ocorrências.
+    # Caso as estatísticas de caracteres sejam calculadas sobre o
+    # livro inteiro, não são calculadas por linha.
+    caracteres_por_livro = por_livro(backend_caracteres)
+    multiplicidades = collections.Counter(linhas_a_analisar)
+    for linha, multiplicidade in multiplicidades.items():
+        resultado = analisa_linha_livro(linha, not caracteres_por_livro)
         if not resultado:
             continue
-        resultado_linhas.append(resultado)
+        resultado_linhas.append((resultado, multiplicidade))
 
     saída.write(f"Analisadas as linhas de '{nome_livro}' de "
                 f"'{nome_autor}'.\n")
     saída.flush()
 
     # Filtra os resultados válidos.
-    estatísticas_a_considerar = [resultado
-                                 for resultado in resultado_linhas
+    estatísticas_a_considerar = [(resultado, multiplicidade)
+                                 for resultado, multiplicidade
+                                 in resultado_linhas
                                  if resultado]
 
-    # Inicializa as entradas a serem utilizadas.
-    estatísticas[VAZIO] = 0
-    estatísticas['linha_visível'] = 0
-    estatísticas[CARACTERE_VISÍVEL] = 0
-    estatísticas[VISÍVEL_CONTÍGUO] = 0
-    estatísticas['caracteres visíveis'] = {}
-    estatísticas['visíveis contíguos'] = {}
-    estatísticas['caracteres visíveis insensíveis'] = {}
-    estatísticas['visíveis contíguos insensíveis'] = {}
-
-    # Atualiza os valores de acordo com os resultados encontrados.
-    for resultado_linha in estatísticas_a_considerar:
-        for chave_int in (VAZIO, 'linha_visível', CARACTERE_VISÍVEL,
-                          VISÍVEL_CONTÍGUO):
-            estatísticas[chave_int] += resultado_linha[chave_int]
-        for chave_dict in ('caracteres visíveis', 'visíveis contíguos',
-                           'caracteres visíveis insensíveis',
-                           'visíveis contíguos insensíveis'):
-            for chave_chave in resultado_linha[chave_dict]:
-                estatísticas[chave_dict].setdefault(chave_chave, 0)
-                estatísticas[chave_dict][chave_chave] += (
-                    resultado_linha[chave_dict][chave_chave])
-
-    # Altera as chaves para facilitar o entendimento.
-    for tupla in ((VAZIO, 'linhas somente caracteres invisíveis'),
-                  ('linha_visível', 'linhas caracteres visíveis'),
-                  (CARACTERE_VISÍVEL, 'quantidade caracteres visíveis'),
-                  (VISÍVEL_CONTÍGUO,
-                   'sequências visíveis contíguas')):
-        chave_anterior, chave_nova = tupla
-        estatísticas[chave_nova] = estatísticas[chave_anterior]
-        del estatísticas[chave_anterior]
-
-    # Uma vez calculadas as estatísticas do texto, devolve um dict
-    # contendo todos os dados levantados.
+    # Combina os resultados encontrados, ponderados pela
+    # multiplicidade de cada linha. Os tokens são internados no
+    # vocabulário e somados aos vetores de contagens do livro.
+    for resultado_linha, multiplicidade in estatísticas_a_considerar:
+        estatísticas.acumula(resultado_linha, multiplicidade)
+
+    # Calcula as estatísticas de caracteres sobre o livro inteiro, de
+    # uma só vez.
+    if caracteres_por_livro:
+        (estatísticas.quantidade_caracteres,
+         estatísticas.caracteres,
+         estatísticas.caracteres_insensíveis) = (
+             conta_caracteres(linhas_a_analisar))
+
+    # Uma vez calculadas as estatísticas do texto, devolve uma
+    # instância de Estatísticas contendo todos os dados levantados.
     return estatísticas
 
 
+def agrega(estatísticas_por_livro, saída=sys.stderr, executor=None,
+           manifesto=None, cache=None):
+    """Agrega as estatísticas dos livros em totais por autor e de todos
+       os livros por redução em árvore (ver _agregação): os totais de
+       todos os livros são reduzidos a partir dos totais dos autores.
+
+    Args:
+        estatísticas_por_livro: dict cujas chaves são tuplas
+                                (nome do livro, nome do autor) e
+                                cujos respectivos valores são
+                                instâncias de Estatísticas obtidas de
+                                cada livro.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+        executor: instância de concurrent.futures.ProcessPoolExecutor
+                  em cujos processos os pares de cada nível são
+                  combinados ou None para combiná-los no próprio
+                  processo.
+        manifesto: instância de ManifestoIncremental passada a coleta,
+                   no modo incremental, ou None. Caso fornecido, as
+                   estatísticas dos livros são somadas aos totais
+                   armazenados dos autores (ver _incremental), sempre
+                   no próprio processo.
+        cache: instância de CacheResultados de onde o manifesto obtém
+               as estatísticas dos demais livros de um autor cujo
+               total precise ser reconstruído, ou None.
+
+    Returns:
+        Tupla (dict cujas chaves são os nomes dos autores e cujos
+        respectivos valores são Estatísticas do total de cada autor,
+        Estatísticas do total de todos os livros) ou None caso não haja
+        estatísticas.
+    """
+    if manifesto is not None:
+        plural = len(estatísticas_por_livro) != 1
+        saída.write(f"Atualizando os totais armazenados com as "
+                    f"estatísticas de {len(estatísticas_por_livro)} "
+                    f"livro{'s' if plural else ''} "
+                    f"novo{'s' if plural else ''}.\n")
+        saída.flush()
+        totais = manifesto.atualiza_totais(estatísticas_por_livro, saída,
+                                           cache)
+        saída.write('Atualizados os totais armazenados.\n\n')
+        saída.flush()
+        return totais
+
+    if not estatísticas_por_livro:
+        return None
+
+    livros_por_autor = agrupa_por_autor(estatísticas_por_livro)
+    saída.write(f"Agregando as estatísticas de "
+                f"{len(estatísticas_por_livro)} livro"
+                f"{'s' if len(estatísticas_por_livro) > 1 else ''} por "
+                f"autor.\n")
+    saída.flush()
+    totais_autores = reduz_em_árvore(livros_por_autor, executor)
+    total = reduz_em_árvore({None: list(totais_autores.values())},
+                            executor)[None]
+    saída.write(f"Agregadas as estatísticas de "
+                f"{len(estatísticas_por_livro)} livro"
+                f"{'s' if len(estatísticas_por_livro) > 1 else ''} por "
+                f"autor.\n\n")
+    saída.flush()
+
+    return totais_autores, total
+
+
 def exibe_livro(tupla_livro, estatísticas, saída):
     """Exibe os principais valores de estatísticas obtidas para
        o livro.
 
     Args:
         tupla_livro: tupla (nome do livro, nome do autor).
-        estatísticas: dict contendo as estatísticas obtidas do livro.
+        estatísticas: instância de Estatísticas obtidas do livro.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+    """
+    nome_livro, nome_autor = tupla_livro
+    exibe_estatísticas(f"Estatísticas de '{nome_livro}' de "
+                       f"'{nome_autor}'", estatísticas, saída)
+
+
+def exibe_estatísticas(título, estatísticas, saída):
+    """Exibe os principais valores de estatísticas obtidas de um livro
+       ou de um conjunto de livros.
+
+    Args:
+        título: str do título da seção.
+        estatísticas: instância de Estatísticas.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
     """
@@ -621,37 +769,20 @@ def exibe_livro(tupla_livro, estatísticas, saída):
     if not estatísticas:
         return
 
-    nome_livro, nome_autor = tupla_livro
+    linhas_invisíveis = estatísticas.linhas_invisíveis
+    linhas_visíveis = estatísticas.linhas_visíveis
+    total_linhas = estatísticas.total_linhas
 
-    linhas_invisíveis = estatísticas['linhas somente caracteres invisíveis']
-    linhas_visíveis = estatísticas['linhas caracteres visíveis']
-    total_linhas = linhas_invisíveis + linhas_visíveis
-
-    quantidade_caractere_mais_utilizado = 0
-    caracteres_mais_utilizados = set()
-    for cv_ in estatísticas['caracteres visíveis']:
-        if (estatísticas['caracteres visíveis'][cv_]
-                > quantidade_caractere_mais_utilizado):
-            quantidade_caractere_mais_utilizado = (
-                estatísticas['caracteres visíveis'][cv_])
-            caracteres_mais_utilizados = set({cv_})
-        elif (estatísticas['caracteres visíveis'][cv_]
-              == quantidade_caractere_mais_utilizado):
-            caracteres_mais_utilizados.add(cv_)
-
-    quantidade_caractere_insensível_mais_utilizado = 0
-    caracteres_insensíveis_mais_utilizados = set()
-    for cvi in estatísticas['caracteres visíveis insensíveis']:
-        if (estatísticas['caracteres visíveis insensíveis'][cvi]
-                > quantidade_caractere_insensível_mais_utilizado):
-            quantidade_caractere_insensível_mais_utilizado = (
-                estatísticas['caracteres visíveis insensíveis'][cvi])
-            caracteres_insensíveis_mais_utilizados = set({cvi})
-        elif (estatísticas['caracteres visíveis insensíveis'][cvi]
-              == quantidade_caractere_insensível_mais_utilizado):
-            caracteres_insensíveis_mais_utilizados.add(cvi)
-
-    saída.write(f"[ Estatísticas de '{nome_livro}' de '{nome_autor}' ]\n")
+    # Os histogramas mantêm os caracteres mais utilizados a cada soma
+    # (ver HistogramaCaracteres), sem que sejam percorridos aqui.
+    (quantidade_caractere_mais_utilizado,
+     caracteres_mais_utilizados) = (
+         estatísticas.caracteres.mais_frequentes())
+    (quantidade_caractere_insensível_mais_utilizado,
+     caracteres_insensíveis_mais_utilizados) = (
+         estatísticas.caracteres_insensíveis.mais_frequentes())
+
+    saída.write(f"[ {título} ]\n")
     saída.write('\n')
     saída.write(f"    Número de linhas sem nenhum caractere visível: "
                 f"{linhas_invisíveis}\n")
@@ -660,10 +791,10 @@ def exibe_livro(tupla_livro, estatísticas, saída):
     saída.write(f"    Total de linhas: {total_linhas}\n")
     saída.write('\n')
     saída.write(f"    Número de caracteres visíveis: "
-                f"{estatísticas['quantidade caracteres visíveis']}\n")
+                f"{estatísticas.quantidade_caracteres}\n")
     saída.write(f"    Número de sequências contíguas de caracteres "
                 f"visíveis: "
-                f"{estatísticas['sequências visíveis contíguas']}\n")
+                f"{estatísticas.quantidade_sequências}\n")
     saída.write('\n')
 
     vezes = quantidade_caractere_mais_utilizado > 1
@@ -705,45 +836,51 @@ def exibe_livro(tupla_livro, estatísticas, saída):
                     f").\n")
     saída.write('\n')
 
-    quantidade_sequência_mais_utilizada = 0
-    sequências_mais_utilizadas = set()
-    comprimento_maior_sequência = 0
-    maiores_sequências = set()
-    for vc_ in estatísticas['visíveis contíguos']:
-        if len(vc_) > comprimento_maior_sequência:
-            comprimento_maior_sequência = len(vc_)
-            maiores_sequências = set({vc_})
-        elif len(vc_) == comprimento_maior_sequência:
-            maiores_sequências.add(vc_)
-
-        if (estatísticas['visíveis contíguos'][vc_]
-                > quantidade_sequência_mais_utilizada):
-            quantidade_sequência_mais_utilizada = (
-                estatísticas['visíveis contíguos'][vc_])
-            sequências_mais_utilizadas = set({vc_})
-        elif (estatísticas['visíveis contíguos'][vc_]
-              == quantidade_sequência_mais_utilizada):
-            sequências_mais_utilizadas.add(vc_)
-
-    quantidade_sequência_insensível_mais_utilizada = 0
-    sequências_insensíveis_mais_utilizadas = set()
-    comprimento_maior_sequência_insensível = 0
-    maiores_sequências_insensíveis = set()
-    for vci in estatísticas['visíveis contíguos insensíveis']:
-        if len(vci) > comprimento_maior_sequência_insensível:
-            comprimento_maior_sequência_insensível = len(vci)
-            maiores_sequências_insensíveis = set({vci})
-        elif len(vci) == comprimento_maior_sequência_insensível:
-            maiores_sequências_insensíveis.add(vci)
-
-        if (estatísticas['visíveis contíguos insensíveis'][vci]
-                > quantidade_sequência_insensível_mais_utilizada):
-            quantidade_sequência_insensível_mais_utilizada = (
-                estatísticas['visíveis contíguos insensíveis'][vci])
-            sequências_insensíveis_mais_utilizadas = set({vci})
-        elif (estatísticas['visíveis contíguos insensíveis'][vci]
-              == quantidade_sequência_insensível_mais_utilizada):
-            sequências_insensíveis_mais_utilizadas.add(vci)
+    # Os histogramas de tokens, exatos, resumidos (ver _resumo_tokens)
+    # ou aproximados (ver _esboços), fornecem os tokens mais frequentes
+    # e os mais longos, mantidos a cada soma ou limitados à capacidade.
+    (quantidade_sequência_mais_utilizada,
+     sequências_mais_utilizadas) = (
+         estatísticas.sequências.mais_frequentes())
+    (comprimento_maior_sequência,
+     maiores_sequências) = estatísticas.sequências.mais_longos()
+    (quantidade_sequência_insensível_mais_utilizada,
+     sequências_insensíveis_mais_utilizadas) = (
+         estatísticas.sequências_insensíveis.mais_frequentes())
+    (comprimento_maior_sequência_insensível,
+     maiores_sequências_insensíveis) = (
+         estatísticas.sequências_insensíveis.mais_longos())
+
+    # No modo resumido, as contagens das sequências podem ser
+    # estimativas que excedem as contagens reais em no máximo erro
+    # vezes.
+    erro = 0
+    if isinstance(estatísticas.sequências, ResumoTokens):
+        erro = max(estatísticas.sequências.erro_máximo(),
+                   estatísticas.sequências_insensíveis.erro_máximo())
+    # No modo aproximado, o erro das contagens é garantido com uma
+    # probabilidade e o número de sequências distintas é estimado.
+    confiança = ''
+    if isinstance(estatísticas.sequências, EsboçoTokens):
+        probabilidade = estatísticas.sequências.contagem_mínima.confiança
+        confiança = f" com probabilidade de {probabilidade * 100:g}%"
+    if erro:
+        saída.write(f"    Contagens de sequências estimadas, com erro "
+                    f"de até {erro} vez{'es' if erro > 1 else ''}"
+                    f"{confiança}.\n")
+    if isinstance(estatísticas.sequências, EsboçoTokens):
+        distintos = estatísticas.sequências.distintos
+        distintos_insensíveis = (
+            estatísticas.sequências_insensíveis.distintos)
+        saída.write(f"    Número estimado de sequências distintas "
+                    f"sensíveis a maiúsculas e minúsculas: "
+                    f"{distintos.estima()} "
+                    f"(erro padrão de {distintos.erro_padrão():.1%}).\n")
+        saída.write(f"    Número estimado de sequências distintas "
+                    f"insensíveis a maiúsculas e minúsculas: "
+                    f"{distintos_insensíveis.estima()} "
+                    f"(erro padrão de "
+                    f"{distintos_insensíveis.erro_padrão():.1%}).\n")
 
     vezes = quantidade_sequência_mais_utilizada > 1
     mais_utilizadas_ordenadas = (
@@ -817,23 +954,31 @@ def exibe_livro(tupla_livro, estatísticas, saída):
     saída.flush()
 
 
-def exibe(estatísticas_por_livro, saída=sys.stdout):
+def exibe(estatísticas_por_livro, saída=sys.stdout, totais=None,
+          livros_por_autor=None):
     """Exibe os principais valores de estatísticas obtidas de
-       cada livro.
+       cada livro e, caso fornecidos, os totais de cada autor com mais
+       de um livro e de todos os livros, caso haja mais de um autor.
 
     Args:
         estatísticas_por_livro: dict cujas chaves são tuplas
                                 (nome do livro, nome do autor) e
-                                cujos respectivos valores são dict
-                                contendo as estatísticas obtidas de
+                                cujos respectivos valores são
+                                instâncias de Estatísticas obtidas de
                                 cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        totais: tupla devolvida por agrega ou None.
+        livros_por_autor: dict do nome de cada autor para o número de
+                          livros incluídos nos totais, quando diferente
+                          do número de livros em estatísticas_por_livro
+                          (ver ManifestoIncremental.livros_por_autor),
+                          ou None.
     """
 
     # Caso não existam estatísticas a serem processadas,
     # devolve a função.
-    if not estatísticas_por_livro:
+    if not estatísticas_por_livro and totais is None:
         return
 
     # Distribui os livros pelos autores.
@@ -842,12 +987,29 @@ def exibe(estatísticas_por_livro, saída=sys.stdout):
         nome_livro, nome_autor = tupla_livro
         entrada_autor = autores_livros.setdefault(nome_autor, set())
         entrada_autor.add(nome_livro)
+    if livros_por_autor is None:
+        livros_por_autor = {nome_autor: len(autores_livros[nome_autor])
+                            for nome_autor in autores_livros}
 
     # Exibe as estatísticas de livro ordenado primeiramente por autor
     # seguido de nome de livro.
-    for nome_autor in sorted(autores_livros):
-        for nome_livro in sorted(autores_livros[nome_autor]):
+    for nome_autor in sorted(autores_livros.keys() |
+                             livros_por_autor.keys()):
+        for nome_livro in sorted(autores_livros.get(nome_autor, ())):
             tupla_livro = (nome_livro, nome_autor)
             exibe_livro(tupla_livro,
                         estatísticas_por_livro[tupla_livro],
                         saída)
+        quantidade_livros = livros_por_autor.get(nome_autor, 0)
+        if (totais is not None and quantidade_livros > 1 and
+                nome_autor in totais[0]):
+            exibe_estatísticas(
+                f"Estatísticas dos {quantidade_livros} livros de "
+                f"'{nome_autor}'", totais[0][nome_autor], saída)
+
+    # Os totais de todos os livros só diferem dos de um autor caso
+    # haja mais de um autor.
+    if totais is not None and len(livros_por_autor) > 1:
+        exibe_estatísticas(
+            f"Estatísticas dos {sum(livros_por_autor.values())} livros "
+            f"dos {len(livros_por_autor)} autores", totais[1], saída)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Cache persistente das estatísticas de cada livro: livros cujo texto não
+mudou desde a última execução não são cortados nem analisados
+novamente.
+
+Cada entrada é um arquivo do diretório NOME_DIRETÓRIO_RESULTADOS, um
+por livro e configuração da análise, com as estatísticas empacotadas
+por empacota_estatísticas, serializadas com pickle e comprimidas com
+zlib, precedidas da chave completa da entrada: livro, hash SHA-256 do
+texto bruto, VERSÃO_ANALISADOR e configuração dos histogramas de
+tokens. Uma entrada só é utilizada caso a chave inteira coincida; caso
+contrário, é substituída ao fim da nova análise.
+"""
+
+import hashlib
+import os
+import pickle
+import zlib
+
+from _esboços import EsboçoTokens
+from _resumo_tokens import ResumoTokens
+from _transporte import desempacota_estatísticas, empacota_estatísticas
+
+
+# VERSÃO_ANALISADOR identifica o resultado do corte e da análise de um
+# livro: deve ser incrementada sempre que uma mudança em corta_livro,
+# processa_livro, analisa_livro ou Estatísticas alterar as estatísticas
+# obtidas de um mesmo texto, invalidando as entradas existentes.
+VERSÃO_ANALISADOR = 1
+
+# NOME_DIRETÓRIO_RESULTADOS é o subdiretório, no diretório dos arquivos
+# obtidos do Project Gutenberg, onde as entradas são armazenadas.
+NOME_DIRETÓRIO_RESULTADOS = 'resultados'
+
+# SUFIXO_RESULTADO é o sufixo dos arquivos das entradas.
+SUFIXO_RESULTADO = '.resultado'
+
+# _NÍVEL_COMPRESSÃO é o nível de compressão zlib das entradas: as
+# entradas são gravadas uma vez e lidas a cada execução.
+_NÍVEL_COMPRESSÃO = 6
+
+
+def hash_texto(texto):
+    """Calcula o hash do texto bruto de um livro.
+
+    Args:
+        texto: str do texto do livro.
+
+    Returns:
+        str com o hash SHA-256 em hexadecimal.
+    """
+    return hashlib.sha256(
+        texto.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def lê_entrada(caminho):
+    """Lê um arquivo de entrada gravado por grava_entrada.
+
+    Args:
+        caminho: pathlib.Path do arquivo.
+
+    Returns:
+        Tupla (chave, estatísticas empacotadas) ou None caso o arquivo
+        não exista ou não possa ser lido.
+    """
+    try:
+        with caminho.open('rb') as arquivo:
+            chave, pacote = pickle.loads(zlib.decompress(arquivo.read()))
+    except FileNotFoundError:
+        return None
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError,
+            AttributeError, ImportError, TypeError, ValueError):
+        # Entradas corrompidas ou de formato anterior são descartadas e
+        # substituídas pela nova análise.
+        return None
+    return chave, pacote
+
+
+def grava_entrada(caminho, chave, pacote):
+    """Grava um arquivo de entrada, substituindo atomicamente o
+       anterior.
+
+    Args:
+        caminho: pathlib.Path do arquivo.
+        chave: tupla da chave completa da entrada.
+        pacote: estatísticas empacotadas por empacota_estatísticas.
+    """
+    caminho_temporário = caminho.with_name(
+        f"{caminho.name}.{os.getpid()}.tmp")
+    with caminho_temporário.open('wb') as arquivo:
+        arquivo.write(zlib.compress(
+            pickle.dumps((chave, pacote), pickle.HIGHEST_PROTOCOL),
+            _NÍVEL_COMPRESSÃO))
+    os.replace(str(caminho_temporário), str(caminho))
+
+
+def descreve_modelo_tokens(modelo_tokens):
+    """Descreve a configuração dos histogramas de tokens, parte da
+       chave das entradas: estatísticas exatas, resumidas e
+       aproximadas de um mesmo livro são armazenadas separadamente.
+
+    Args:
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens utilizado, ou None para
+                       histogramas exatos.
+
+    Returns:
+        str da configuração.
+    """
+    if modelo_tokens is None:
+        return 'exato'
+    if isinstance(modelo_tokens, EsboçoTokens):
+        return (f"aproximado-{modelo_tokens.capacidade}-"
+                f"{modelo_tokens.contagem_mínima.erro!r}-"
+                f"{modelo_tokens.contagem_mínima.confiança!r}-"
+                f"{modelo_tokens.distintos.precisão}")
+    if isinstance(modelo_tokens, ResumoTokens):
+        return f"resumido-{modelo_tokens.capacidade}"
+    raise TypeError(f"modelo de tokens desconhecido: {modelo_tokens!r}")
+
+
+class CacheResultados:
+    """Entradas das estatísticas dos livros armazenadas em disco para
+       uma configuração da análise.
+
+    Os hashes dos textos consultados são guardados, de forma que o
+    texto de um livro seja percorrido uma única vez, e as estatísticas
+    encontradas ficam disponíveis em encontradas para as etapas
+    seguintes à consulta.
+    """
+
+    def __init__(self, diretório, modelo_tokens=None):
+        """Inicializa o cache, criando o diretório das entradas caso
+           não exista.
+
+        Args:
+            diretório: pathlib.Path do diretório dos arquivos obtidos
+                       do Project Gutenberg.
+            modelo_tokens: instância vazia, de cria_modelo_tokens, do
+                           tipo de histograma de tokens utilizado, ou
+                           None para histogramas exatos.
+        """
+        self.diretório = diretório / NOME_DIRETÓRIO_RESULTADOS
+        self.diretório.mkdir(mode=0o755, parents=True, exist_ok=True)
+        self.configuração = descreve_modelo_tokens(modelo_tokens)
+        self.encontradas = {}
+        self._hashes = {}
+
+    def _caminho(self, tupla_livro):
+        """Obtém o caminho da entrada de um livro.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor).
+
+        Returns:
+            Instância de pathlib.Path da entrada.
+        """
+        identificador = hashlib.sha256(
+            repr((tupla_livro, self.configuração)).encode(
+                'utf-8', 'surrogatepass')).hexdigest()
+        return self.diretório / f"{identificador}{SUFIXO_RESULTADO}"
+
+    def _chave(self, tupla_livro):
+        """Obtém a chave completa da entrada de um livro consultado."""
+        return (tupla_livro, self._hashes[tupla_livro], VERSÃO_ANALISADOR,
+                self.configuração)
+
+    def consulta_empacotadas(self, tupla_livro, texto_bruto, saída):
+        """Consulta as estatísticas empacotadas de um livro.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor).
+            texto_bruto: str da versão txt do livro.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+
+        Returns:
+            As estatísticas empacotadas por empacota_estatísticas ou
+            None caso não haja entrada válida para o texto.
+        """
+        return self.consulta_por_hash(tupla_livro, hash_texto(texto_bruto),
+                                      saída)
+
+    def consulta_por_hash(self, tupla_livro, hash_texto_bruto, saída):
+        """Consulta as estatísticas empacotadas de um livro pelo hash
+           do texto, sem o texto, como calculado por hash_texto.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor).
+            hash_texto_bruto: str do hash do texto, de hash_texto.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+
+        Returns:
+            As estatísticas empacotadas por empacota_estatísticas ou
+            None caso não haja entrada válida para o texto.
+        """
+        self._hashes[tupla_livro] = hash_texto_bruto
+        entrada = lê_entrada(self._caminho(tupla_livro))
+        if entrada is None:
+            return None
+        chave, pacote = entrada
+        if chave != self._chave(tupla_livro) or pacote is None:
+            return None
+        nome_livro, nome_autor = tupla_livro
+        saída.write(f"Obtidas do cache as estatísticas de '{nome_livro}' "
+                    f"de '{nome_autor}'.\n")
+        saída.flush()
+        return pacote
+
+    def consulta(self, tupla_livro, texto_bruto, saída):
+        """Consulta as estatísticas de um livro, registrando-as em
+           encontradas caso existam.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor).
+            texto_bruto: str da versão txt do livro.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+
+        Returns:
+            Instância de Estatísticas do livro ou None caso não haja
+            entrada válida para o texto.
+        """
+        pacote = self.consulta_empacotadas(tupla_livro, texto_bruto, saída)
+        if pacote is None:
+            return None
+        estatísticas = desempacota_estatísticas(pacote)
+        self.encontradas[tupla_livro] = estatísticas
+        return estatísticas
+
+    def armazena_empacotadas(self, tupla_livro, pacote):
+        """Armazena as estatísticas empacotadas de um livro consultado,
+           substituindo atomicamente a entrada anterior.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor), cujo
+                         texto foi passado a consulta.
+            pacote: estatísticas empacotadas por empacota_estatísticas.
+        """
+        if pacote is None or tupla_livro not in self._hashes:
+            return
+        grava_entrada(self._caminho(tupla_livro), self._chave(tupla_livro),
+                      pacote)
+
+    def armazena(self, tupla_livro, estatísticas):
+        """Armazena as estatísticas de um livro consultado.
+
+        Args:
+            tupla_livro: tupla (nome do livro, nome do autor), cujo
+                         texto foi passado a consulta.
+            estatísticas: instância de Estatísticas do livro.
+        """
+        self.armazena_empacotadas(tupla_livro,
+                                  empacota_estatísticas(estatísticas))
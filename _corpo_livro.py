@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Corpo de um livro entre o corte e a análise: o texto é mantido uma
+única vez e as linhas são visões sobre ele, descritas somente pelas
+posições de início de cada linha.
+"""
+
+from array import array
+import itertools
+import re
+
+
+# QUEBRA_LINHA é uma regex para as quebras de linha do texto.
+QUEBRA_LINHA = re.compile('\n')
+
+
+class CorpoLivro:
+    """Sequência das linhas de um trecho de texto, sem cópias: guarda
+       uma referência ao texto e um array('I') com a posição de início
+       de cada linha (4 bytes por linha). As linhas só são criadas como
+       str quando acessadas.
+
+    Equivale a texto[início:fim].split('\\n') para iteração, len,
+    acesso por índice e fatiamento contíguo.
+    """
+
+    __slots__ = ('texto', 'início', 'fim', '_inícios')
+
+    def __init__(self, texto, início=0, fim=None, inícios=None):
+        """Inicializa o corpo.
+
+        Args:
+            texto: str do texto bruto, mantido por referência.
+            início: int da posição inicial do trecho em texto.
+            fim: int da posição final (exclusiva) do trecho em texto
+                 ou None para o fim do texto.
+            inícios: array('I') das posições de início de cada linha
+                     do trecho, caso já conhecidas.
+        """
+        if fim is None:
+            fim = len(texto)
+        if inícios is None:
+            inícios = array('I', itertools.chain(
+                (início, ),
+                (quebra.end()
+                 for quebra in QUEBRA_LINHA.finditer(texto, início, fim))))
+        self.texto = texto
+        self.início = início
+        self.fim = fim
+        self._inícios = inícios
+
+    @classmethod
+    def vazio(cls):
+        """Obtém um corpo sem nenhuma linha.
+
+        Returns:
+            Instância de CorpoLivro de comprimento 0.
+        """
+        return cls('', 0, 0, array('I'))
+
+    @property
+    def conteúdo(self):
+        """str do trecho inteiro, criada a cada acesso."""
+        return self.texto[self.início:self.fim]
+
+    def _fim_linha(self, índice):
+        if índice + 1 < len(self._inícios):
+            return self._inícios[índice + 1] - 1
+        return self.fim
+
+    def __len__(self):
+        return len(self._inícios)
+
+    def __iter__(self):
+        texto = self.texto
+        inícios = self._inícios
+        for índice in range(len(inícios) - 1):
+            yield texto[inícios[índice]:inícios[índice + 1] - 1]
+        if inícios:
+            yield texto[inícios[-1]:self.fim]
+
+    def __getitem__(self, chave):
+        if isinstance(chave, slice):
+            primeiro, último, passo = chave.indices(len(self))
+            if passo != 1:
+                return [self[índice]
+                        for índice in range(primeiro, último, passo)]
+            if primeiro >= último:
+                return CorpoLivro.vazio()
+            return CorpoLivro(self.texto, self._inícios[primeiro],
+                              self._fim_linha(último - 1),
+                              self._inícios[primeiro:último])
+        if chave < 0:
+            chave += len(self)
+        if not 0 <= chave < len(self):
+            raise IndexError('índice de linha fora do corpo do livro')
+        return self.texto[self._inícios[chave]:self._fim_linha(chave)]
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({len(self)} linhas, "
+                f"{self.fim - self.início} caracteres)")
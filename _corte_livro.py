@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Corte do cabeçalho e do rodapé inseridos pelo Project Gutenberg na
+versão txt dos livros, feito por buscas ancoradas sobre o texto bruto
+que devolvem posições de caracteres, de forma que somente o trecho
+mantido precise ser dividido em linhas.
+"""
+
+import re
+
+from _corpo_livro import CorpoLivro
+
+
+# START_OF, PRODUCED_BY, END_OF e END_OF_NORMAL são regex, aplicadas ao
+# texto inteiro em modo multilinha, para processamento de corte do
+# arquivo obtido do Project Gutenberg para obter o conteúdo de fato dos
+# livros. O espaço em branco é restrito a [^\S\n] para que um casamento
+# nunca ultrapasse o fim da linha, como acontecia quando as regex eram
+# aplicadas linha a linha.
+START_OF = re.compile(r'^[^\S\n]*{0}[^\S\n]+START[^\S\n]+OF'.format(
+    re.escape('***')), re.MULTILINE)
+PRODUCED_BY = re.compile(r'^[^\S\n]*Produced[^\S\n]+by[^\S\n]+',
+                         re.MULTILINE)
+END_OF = re.compile(r'^[^\S\n]*{0}[^\S\n]+END[^\S\n]+OF'.format(
+    re.escape('***')), re.MULTILINE)
+END_OF_NORMAL = re.compile(r'^[^\S\n]*End[^\S\n]+of', re.MULTILINE)
+
+
+def _próxima_linha(texto, posição):
+    """Obtém o início da linha seguinte à linha que contém posição.
+
+    Args:
+        texto: str do texto bruto.
+        posição: int de uma posição em texto.
+
+    Returns:
+        int do início da linha seguinte ou None caso seja a última.
+    """
+    fim = texto.find('\n', posição)
+    return None if fim == -1 else fim + 1
+
+
+def _último_casamento(padrão, texto, fim):
+    """Obtém o casamento de padrão na última linha, terminada em fim,
+       que o contenha, percorrendo as linhas de trás para frente: como
+       o rodapé fica no fim do texto, somente ele é percorrido.
+
+    Args:
+        padrão: regex compilada, ancorada no início da linha.
+        texto: str do texto bruto.
+        fim: int da posição final (exclusiva) da última linha a ser
+             considerada.
+
+    Returns:
+        Instância de re.Match ou None caso não haja casamento.
+    """
+    while True:
+        início_linha = texto.rfind('\n', 0, fim) + 1
+        casamento = padrão.match(texto, início_linha, fim)
+        if casamento is not None:
+            return casamento
+        if início_linha == 0:
+            return None
+        fim = início_linha - 1
+
+
+def delimita_conteúdo(texto):
+    """Obtém o intervalo do conteúdo de fato de um livro: da primeira
+       linha toda em maiúsculas após 'Produced by' (que segue
+       '*** START OF') até a última linha com caracteres visíveis antes
+       da última linha 'End of' que antecede o último '*** END OF'.
+
+    Args:
+        texto: str da versão txt do livro.
+
+    Returns:
+        Tupla (início, fim) das posições do conteúdo em texto, com fim
+        exclusivo, ou None caso o texto não esteja no formato esperado.
+    """
+
+    # Busca a primeira linha que começa com
+    # *** START OF
+    # Um casamento na primeira linha do texto também não é um formato
+    # esperado.
+    start_of = START_OF.search(texto)
+    if start_of is None or start_of.start() == 0:
+        return None
+
+    # Busca a primeira linha que começa com
+    # Produced by
+    # após a linha que começa com
+    # *** START OF
+    posição = _próxima_linha(texto, start_of.start())
+    if posição is None:
+        return None
+    produced_by = PRODUCED_BY.search(texto, posição)
+    if produced_by is None:
+        return None
+
+    # Busca a primeira linha com todos os caracteres de letras em
+    # maiúsculo após a linha que começa com
+    # Produced by
+    # Somente as linhas do início do texto são percorridas.
+    início = _próxima_linha(texto, produced_by.start())
+    while início is not None:
+        fim_linha = texto.find('\n', início)
+        if fim_linha == -1:
+            fim_linha = len(texto)
+        if texto[início:fim_linha].isupper():
+            break
+        início = _próxima_linha(texto, início)
+    if início is None:
+        return None
+
+    # Busca a última linha que começa com
+    # *** END OF
+    end_of = _último_casamento(END_OF, texto, len(texto))
+    if end_of is None:
+        return None
+
+    # Busca a última linha que começa com
+    # End of
+    # antes da linha que começa com
+    # *** END OF
+    if end_of.start() == 0:
+        return None
+    end_of_normal = _último_casamento(END_OF_NORMAL, texto,
+                                      end_of.start() - 1)
+    if end_of_normal is None:
+        return None
+
+    # Busca a última linha com caracteres visíveis antes da linha que
+    # começa com
+    # End of
+    # percorrendo de trás para frente somente os espaços em branco.
+    posição = end_of_normal.start() - 1
+    while posição >= 0 and texto[posição].isspace():
+        posição -= 1
+    if posição < 0:
+        return None
+    fim = texto.find('\n', posição, end_of_normal.start())
+    if fim == -1:
+        fim = end_of_normal.start()
+
+    return início, fim
+
+
+def corta_livro(texto):
+    """Obtém as linhas do conteúdo de fato de um livro como visões
+       sobre o texto bruto, no intervalo obtido por delimita_conteúdo.
+
+    Args:
+        texto: str da versão txt do livro.
+
+    Returns:
+        Instância de CorpoLivro com as linhas do conteúdo, vazia caso o
+        texto não esteja no formato esperado.
+    """
+    intervalo = delimita_conteúdo(texto)
+    if intervalo is None:
+        return CorpoLivro.vazio()
+    início, fim = intervalo
+    if fim < início:
+        return CorpoLivro.vazio()
+    return CorpoLivro(texto, início, fim)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Decodificação dos arquivos obtidos do Project Gutenberg: muitos livros
+são servidos em Latin-1 ou outras codificações legadas sem charset no
+cabeçalho Content-Type, então a codificação é detectada uma única vez
+sobre um prefixo do arquivo e registrada nos metadados armazenados,
+somente caso decodifique o arquivo inteiro sem erros.
+"""
+
+import codecs
+import email.message
+import time
+
+try:
+    import cchardet
+except ImportError:
+    cchardet = None
+
+from _metadados_cache import atualiza_metadados, lê_metadados
+
+
+# TAMANHO_AMOSTRA é o tamanho, em bytes, do prefixo do arquivo usado
+# para detectar sua codificação.
+TAMANHO_AMOSTRA = 64 * 2**10
+
+# CODIFICAÇÕES_UTF_8 são as codificações detectadas que, por serem
+# subconjuntos de UTF-8 no prefixo analisado, são tratadas como UTF-8
+# para o arquivo inteiro.
+CODIFICAÇÕES_UTF_8 = frozenset({'ascii', 'utf-8'})
+
+
+def charset_declarado(cabeçalhos):
+    """Extrai o charset declarado no cabeçalho Content-Type.
+
+    Args:
+        cabeçalhos: mapeamento dos cabeçalhos da resposta.
+
+    Returns:
+        str do charset declarado ou None caso não exista.
+    """
+    tipo_conteúdo = cabeçalhos.get('Content-Type')
+    if not tipo_conteúdo:
+        return None
+    mensagem = email.message.Message()
+    mensagem['Content-Type'] = tipo_conteúdo
+    return mensagem.get_param('charset') or None
+
+
+def _normaliza(codificação):
+    """Obtém o nome canônico de uma codificação.
+
+    Args:
+        codificação: str do nome de uma codificação.
+
+    Returns:
+        str do nome canônico ou None caso a codificação seja
+        desconhecida.
+    """
+    try:
+        nome = codecs.lookup(codificação).name
+    except (LookupError, TypeError):
+        return None
+    return 'utf-8' if nome in CODIFICAÇÕES_UTF_8 else nome
+
+
+def detecta_codificação(amostra):
+    """Detecta a codificação de um prefixo de arquivo: com cchardet,
+       caso disponível; caso contrário, ou caso cchardet não reconheça
+       a amostra, UTF-8 se a amostra for UTF-8 válido e Latin-1 em
+       último caso.
+
+    Args:
+        amostra: bytes do prefixo do arquivo.
+
+    Returns:
+        str do nome canônico da codificação.
+    """
+    if cchardet is not None:
+        codificação = _normaliza(cchardet.detect(amostra)['encoding'])
+        if codificação is not None:
+            return codificação
+
+    # A amostra pode terminar no meio de um caractere multibyte, então
+    # é decodificada de forma incremental sem finalizar.
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+    except UnicodeDecodeError:
+        return codecs.lookup('latin-1').name
+    return 'utf-8'
+
+
+def decodifica_detectada(dados):
+    """Decodifica o conteúdo de um arquivo sem codificação registrada:
+       a codificação é detectada sobre os primeiros TAMANHO_AMOSTRA
+       bytes e, caso não decodifique o arquivo inteiro, como em livros
+       cujo primeiro caractere não ASCII está além da amostra, detectada
+       novamente sobre o arquivo inteiro, com Latin-1 em último caso.
+
+    Args:
+        dados: bytes do conteúdo do arquivo.
+
+    Returns:
+        Tupla (str do conteúdo decodificado, str do nome canônico da
+        codificação que o decodificou sem erros).
+    """
+    codificação = detecta_codificação(dados[:TAMANHO_AMOSTRA])
+    try:
+        return dados.decode(codificação), codificação
+    except UnicodeDecodeError:
+        pass
+    codificação = detecta_codificação(dados)
+    try:
+        return dados.decode(codificação), codificação
+    except UnicodeDecodeError:
+        codificação = codecs.lookup('latin-1').name
+        return dados.decode(codificação), codificação
+
+
+def decodifica_arquivo(caminho_arquivo, dados, saída):
+    """Decodifica o conteúdo de um arquivo armazenado uma única vez:
+       com a codificação registrada nos metadados, caso exista; caso
+       contrário, com a codificação detectada por decodifica_detectada,
+       que passa a ser registrada para que as próximas leituras não
+       precisem detectá-la.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        dados: bytes do conteúdo do arquivo.
+        saída: instância com métodos write e flush para exibição do
+               andamento do método.
+
+    Returns:
+        str do conteúdo decodificado.
+    """
+    início = time.perf_counter()
+    codificação = _normaliza(
+        lê_metadados(caminho_arquivo).get('codificação'))
+    detectada = codificação is None
+    if detectada:
+        texto, codificação = decodifica_detectada(dados)
+    else:
+        # A codificação registrada foi declarada pelo servidor: bytes
+        # inválidos nela são substituídos.
+        texto = dados.decode(codificação, errors='replace')
+    duração = time.perf_counter() - início
+
+    if detectada:
+        atualiza_metadados(caminho_arquivo, codificação=codificação)
+    saída.write(f"Decodificado '{caminho_arquivo.name}' como "
+                f"{codificação}{' (detectada)' if detectada else ''} "
+                f"em {duração * 1e3:.1f} ms.\n")
+    saída.flush()
+    return texto
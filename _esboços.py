@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Esboços probabilísticos de tamanho fixo das sequências visíveis
+contíguas (tokens) de um livro ou de um autor, para o modo aproximado:
+
+- Count-Min Sketch (Cormode e Muthukrishnan, 2005) das contagens de
+  tokens: com largura e / erro e profundidade ln(1 / (1 - confiança)),
+  a estimativa de um token nunca é menor que a sua contagem real e,
+  com probabilidade confiança, a excede em no máximo erro * N, sendo N
+  o total de ocorrências de tokens;
+- HyperLogLog (Flajolet et al., 2007) do número de tokens distintos,
+  com 2 ** precisão registradores e erro padrão relativo de
+  1,04 / sqrt(2 ** precisão).
+
+Os índices de ambos são obtidos de um hash BLAKE2b de cada token,
+idêntico em todos os processos, de forma que esboços de livros
+analisados em processos diferentes possam ser combinados: a combinação
+de dois Count-Min Sketch é a soma das tabelas e a de dois HyperLogLog,
+o máximo dos registradores.
+"""
+
+from array import array
+import hashlib
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from _resumo_tokens import ResumoTokens
+
+
+# ERRO_PADRÃO e CONFIANÇA_PADRÃO são os parâmetros padrão do Count-Min
+# Sketch e PRECISÃO_PADRÃO, o do HyperLogLog (erro padrão de 1,6%).
+ERRO_PADRÃO = 0.001
+CONFIANÇA_PADRÃO = 0.99
+PRECISÃO_PADRÃO = 12
+
+_MÁSCARA_64 = (1 << 64) - 1
+
+
+def hash_token(token):
+    """Obtém o hash de 128 bits de um token, estável entre processos.
+
+    Args:
+        token: str do token.
+
+    Returns:
+        int do hash.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(token.encode('utf-8', 'surrogatepass'),
+                        digest_size=16).digest(), 'little')
+
+
+class EsboçoContagemMínima:
+    """Count-Min Sketch de contagens de tokens."""
+
+    __slots__ = ('erro', 'confiança', 'largura', 'profundidade', 'total',
+                 'tabela')
+
+    def __init__(self, erro=ERRO_PADRÃO, confiança=CONFIANÇA_PADRÃO):
+        """Inicializa um esboço vazio.
+
+        Args:
+            erro: float do erro máximo relativo ao total das
+                  estimativas, entre 0 e 1.
+            confiança: float da probabilidade, entre 0 e 1, de cada
+                       estimativa respeitar o erro máximo.
+        """
+        if not 0 < erro < 1 or not 0 < confiança < 1:
+            raise ValueError('erro e confiança devem estar entre 0 e 1')
+        self.erro = erro
+        self.confiança = confiança
+        self.largura = math.ceil(math.e / erro)
+        self.profundidade = math.ceil(math.log(1 / (1 - confiança)))
+        self.total = 0
+        self.tabela = array('Q', bytes(8 * self.largura * self.profundidade))
+
+    def _índices(self, valor_hash):
+        """Obtém o índice na tabela de cada linha para um hash, por hash
+           duplo sobre as duas metades de 64 bits.
+        """
+        primeiro = valor_hash & _MÁSCARA_64
+        segundo = (valor_hash >> 64) | 1
+        largura = self.largura
+        return [linha * largura + (primeiro + linha * segundo) % largura
+                for linha in range(self.profundidade)]
+
+    def adiciona(self, valor_hash, quantidade):
+        """Soma a contagem de um token ao esboço.
+
+        Args:
+            valor_hash: int do hash do token, de hash_token.
+            quantidade: int da contagem.
+        """
+        self.total += quantidade
+        tabela = self.tabela
+        for índice in self._índices(valor_hash):
+            tabela[índice] += quantidade
+
+    def estima(self, valor_hash):
+        """Estima a contagem de um token.
+
+        Args:
+            valor_hash: int do hash do token, de hash_token.
+
+        Returns:
+            int da estimativa.
+        """
+        tabela = self.tabela
+        return min(tabela[índice] for índice in self._índices(valor_hash))
+
+    def erro_máximo(self):
+        """int do quanto uma estimativa excede a contagem real, no
+           máximo, com probabilidade confiança.
+        """
+        return math.floor(self.erro * self.total)
+
+    def __iadd__(self, outro):
+        if not isinstance(outro, EsboçoContagemMínima):
+            return NotImplemented
+        if (outro.largura, outro.profundidade) != (self.largura,
+                                                   self.profundidade):
+            raise ValueError('esboços de dimensões diferentes')
+        self.total += outro.total
+        if numpy is not None:
+            tabela = numpy.frombuffer(self.tabela, dtype=numpy.uint64)
+            tabela += numpy.frombuffer(outro.tabela, dtype=numpy.uint64)
+        else:
+            tabela = self.tabela
+            for índice, quantidade in enumerate(outro.tabela):
+                if quantidade:
+                    tabela[índice] += quantidade
+        return self
+
+    def __eq__(self, outro):
+        if not isinstance(outro, EsboçoContagemMínima):
+            return NotImplemented
+        return (self.erro == outro.erro and
+                self.confiança == outro.confiança and
+                self.total == outro.total and
+                self.tabela == outro.tabela)
+
+    __hash__ = None
+
+
+class HyperLogLog:
+    """HyperLogLog do número de tokens distintos."""
+
+    __slots__ = ('precisão', 'registradores')
+
+    def __init__(self, precisão=PRECISÃO_PADRÃO):
+        """Inicializa um esboço vazio.
+
+        Args:
+            precisão: int do logaritmo na base 2 do número de
+                      registradores, entre 4 e 18.
+        """
+        if not 4 <= precisão <= 18:
+            raise ValueError('precisão deve estar entre 4 e 18')
+        self.precisão = precisão
+        self.registradores = bytearray(1 << precisão)
+
+    def adiciona(self, valor_hash):
+        """Registra um token.
+
+        Args:
+            valor_hash: int do hash do token, de hash_token.
+        """
+        valor_hash &= _MÁSCARA_64
+        bits_restantes = 64 - self.precisão
+        índice = valor_hash >> bits_restantes
+        restante = valor_hash & ((1 << bits_restantes) - 1)
+        posição = bits_restantes - restante.bit_length() + 1
+        if posição > self.registradores[índice]:
+            self.registradores[índice] = posição
+
+    def estima(self):
+        """Estima o número de tokens distintos registrados.
+
+        Returns:
+            int da estimativa.
+        """
+        quantidade = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / quantidade)
+        estimativa = alfa * quantidade ** 2 / sum(
+            2.0 ** -registrador for registrador in self.registradores)
+        vazios = self.registradores.count(0)
+        # Para poucos tokens, a contagem linear dos registradores vazios
+        # é mais precisa.
+        if estimativa <= 2.5 * quantidade and vazios:
+            estimativa = quantidade * math.log(quantidade / vazios)
+        return round(estimativa)
+
+    def erro_padrão(self):
+        """float do erro padrão relativo das estimativas."""
+        return 1.04 / math.sqrt(len(self.registradores))
+
+    def __iadd__(self, outro):
+        if not isinstance(outro, HyperLogLog):
+            return NotImplemented
+        if outro.precisão != self.precisão:
+            raise ValueError('esboços de precisões diferentes')
+        self.registradores = bytearray(map(max, self.registradores,
+                                           outro.registradores))
+        return self
+
+    def __eq__(self, outro):
+        if not isinstance(outro, HyperLogLog):
+            return NotImplemented
+        return self.registradores == outro.registradores
+
+    __hash__ = None
+
+
+class EsboçoTokens(ResumoTokens):
+    """Resumo dos tokens para o modo aproximado: ao resumo Space-Saving
+       dos tokens mais frequentes e aos tokens mais longos (ver
+       ResumoTokens) somam-se um Count-Min Sketch, que limita o erro
+       das contagens dos tokens mais frequentes a erro * N, e um
+       HyperLogLog do número de tokens distintos.
+
+    Como ambas as estimativas de contagem nunca são menores que a
+    contagem real, a menor delas é utilizada.
+    """
+
+    __slots__ = ('contagem_mínima', 'distintos')
+
+    def __init__(self, capacidade, erro=ERRO_PADRÃO,
+                 confiança=CONFIANÇA_PADRÃO, precisão=PRECISÃO_PADRÃO):
+        """Inicializa um esboço vazio.
+
+        Args:
+            capacidade: int do número máximo de tokens mais frequentes
+                        mantidos.
+            erro: float do erro máximo relativo ao total das contagens
+                  estimadas, entre 0 e 1.
+            confiança: float da probabilidade, entre 0 e 1, de cada
+                       contagem estimada respeitar o erro máximo.
+            precisão: int do logaritmo na base 2 do número de
+                      registradores do HyperLogLog.
+        """
+        super().__init__(capacidade)
+        self.contagem_mínima = EsboçoContagemMínima(erro, confiança)
+        self.distintos = HyperLogLog(precisão)
+
+    def vazio(self):
+        """Obtém um esboço vazio com os mesmos parâmetros."""
+        return EsboçoTokens(self.capacidade, self.contagem_mínima.erro,
+                            self.contagem_mínima.confiança,
+                            self.distintos.precisão)
+
+    def adiciona(self, contagens, multiplicidade=1):
+        """Resume contagens de tokens.
+
+        Args:
+            contagens: mapeamento de str para int das contagens.
+            multiplicidade: int pelo qual as contagens são
+                            multiplicadas.
+        """
+        super().adiciona(contagens, multiplicidade)
+        for token, quantidade in contagens.items():
+            if not quantidade:
+                continue
+            valor_hash = hash_token(token)
+            self.contagem_mínima.adiciona(valor_hash,
+                                          quantidade * multiplicidade)
+            self.distintos.adiciona(valor_hash)
+
+    def __iadd__(self, outro):
+        if not isinstance(outro, EsboçoTokens):
+            return NotImplemented
+        super().__iadd__(outro)
+        self.contagem_mínima += outro.contagem_mínima
+        self.distintos += outro.distintos
+        return self
+
+    def estima(self, token):
+        """Estima a contagem de um token.
+
+        Args:
+            token: str do token.
+
+        Returns:
+            int da estimativa, nunca menor que a contagem real.
+        """
+        estimativa = self.contagem_mínima.estima(hash_token(token))
+        if token in self.contagens:
+            return min(estimativa, self.contagens[token])
+        return estimativa
+
+    def erro_máximo(self):
+        """Obtém o maior erro das contagens estimadas.
+
+        Returns:
+            int do quanto uma contagem estimada excede a real, no
+            máximo, com probabilidade de ao menos confiança.
+        """
+        return min(super().erro_máximo(),
+                   self.contagem_mínima.erro_máximo())
+
+    def mais_frequentes(self):
+        """Obtém os tokens de maior contagem estimada.
+
+        Returns:
+            Tupla (int da contagem estimada, set dos tokens), (0, set())
+            caso o esboço esteja vazio.
+        """
+        estimativas = {token: self.estima(token) for token in self.contagens}
+        maior = max(estimativas.values(), default=0)
+        return maior, {token for token, quantidade in estimativas.items()
+                       if maior and quantidade == maior}
+
+    def __eq__(self, outro):
+        if not isinstance(outro, EsboçoTokens):
+            return NotImplemented
+        return (super().__eq__(outro) and
+                self.contagem_mínima == outro.contagem_mínima and
+                self.distintos == outro.distintos)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({len(self)} de {self.capacidade} "
+                f"tokens, ~{self.distintos.estima()} distintos, erro "
+                f"máximo {self.erro_máximo()})")
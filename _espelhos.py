@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Conjunto de mirrors do Project Gutenberg para distribuir a coleta dos
+livros, com limite de requisições, latência e taxa de erros mantidos
+independentemente por mirror.
+"""
+
+import asyncio
+import re
+import time
+
+import aiohttp
+
+from _limitador import INTERVALO_REQUISIÇÕES, BaldeFichas
+
+
+# URL_ESPELHO é uma regex para obter as URLs HTTP(S) da tabela de
+# MIRRORS.ALL, cujas linhas são do tipo:
+# '| Europe | Portugal | Lisboa | ... | http://mirror.example/gutenberg/ |'
+URL_ESPELHO = re.compile(r'https?://[^\s|]+')
+
+# FALHAS_CONSECUTIVAS_MÁXIMAS é o número de falhas consecutivas a
+# partir do qual um mirror deixa de receber novas requisições.
+FALHAS_CONSECUTIVAS_MÁXIMAS = 3
+
+# _PESO_LATÊNCIA é o peso da última medição na média móvel
+# exponencial da latência de cada mirror.
+_PESO_LATÊNCIA = .3
+
+
+def extrai_espelhos(texto_espelhos):
+    """Extrai as URLs base HTTP(S) dos mirrors listados em MIRRORS.ALL.
+
+    Args:
+        texto_espelhos: str do conteúdo de MIRRORS.ALL.
+
+    Returns:
+        Instância de list das URLs base, sem repetições e terminadas
+        em '/'.
+    """
+    return list(dict.fromkeys(url if url.endswith('/') else f"{url}/"
+                              for url in URL_ESPELHO.findall(texto_espelhos)))
+
+
+def caminho_espelho(índice):
+    """Obtém o diretório de um livro na estrutura de diretórios dos
+       mirrors, onde cada dígito do índice (exceto o último) é um
+       nível: o livro 12345 fica em '1/2/3/4/12345/' e o livro 5 fica
+       em '0/5/'.
+
+    Args:
+        índice: str ou int do índice do livro.
+
+    Returns:
+        str do caminho relativo do diretório do livro.
+    """
+    índice = str(índice)
+    níveis = '/'.join(índice[:-1]) if len(índice) > 1 else '0'
+    return f"{níveis}/{índice}/"
+
+
+def candidatos_espelho(url_base, índice):
+    """Obtém as URLs candidatas da versão txt de um livro num mirror,
+       em ordem de preferência (UTF-8, ASCII e Latin-1).
+
+    Args:
+        url_base: str da URL base do mirror, terminada em '/'.
+        índice: str ou int do índice do livro.
+
+    Returns:
+        Instância de list de str das URLs candidatas.
+    """
+    diretório = f"{url_base}{caminho_espelho(índice)}"
+    return [f"{diretório}{índice}{sufixo}.txt"
+            for sufixo in ('-0', '', '-8')]
+
+
+class Espelho:
+    """Um mirror com seu próprio limite de requisições e estatísticas
+       de latência e de erros.
+    """
+
+    def __init__(self, url_base, intervalo=INTERVALO_REQUISIÇÕES):
+        """Inicializa o mirror sem histórico de requisições.
+
+        Args:
+            url_base: str da URL base do mirror, terminada em '/'.
+            intervalo: tempo, em segundos, entre requisições ao mirror.
+        """
+        self.url_base = url_base
+        self.balde = BaldeFichas(intervalo)
+        self.latência = None
+        self.requisições = 0
+        self.falhas = 0
+        self.falhas_consecutivas = 0
+        self.pendentes = 0
+
+    @property
+    def saudável(self):
+        """Indica se o mirror pode receber novas requisições."""
+        return self.falhas_consecutivas < FALHAS_CONSECUTIVAS_MÁXIMAS
+
+    def custo_estimado(self):
+        """Estima o tempo, em segundos, até uma nova requisição a este
+           mirror ser concluída, considerando as requisições já
+           enfileiradas e a latência observada.
+
+        Returns:
+            float com o tempo estimado.
+        """
+        return (self.balde.espera_estimada()
+                + self.pendentes * self.balde.intervalo
+                + (self.latência or 0.))
+
+    def registra_sucesso(self, latência):
+        """Registra uma requisição bem-sucedida.
+
+        Args:
+            latência: tempo, em segundos, da requisição.
+        """
+        self.requisições += 1
+        self.falhas_consecutivas = 0
+        if self.latência is None:
+            self.latência = latência
+        else:
+            self.latência += _PESO_LATÊNCIA * (latência - self.latência)
+
+    def registra_falha(self):
+        """Registra uma requisição que falhou."""
+        self.requisições += 1
+        self.falhas += 1
+        self.falhas_consecutivas += 1
+
+
+class ConjuntoEspelhos:
+    """Distribui as requisições de livros entre mirrors, direcionando
+       cada livro ao mirror saudável com menor custo estimado.
+    """
+
+    def __init__(self, urls_base, intervalo=INTERVALO_REQUISIÇÕES):
+        """Inicializa o conjunto.
+
+        Args:
+            urls_base: iterável das URLs base dos mirrors.
+            intervalo: tempo, em segundos, entre requisições a um mesmo
+                       mirror.
+        """
+        self.espelhos = [Espelho(url if url.endswith('/') else f"{url}/",
+                                 intervalo)
+                         for url in dict.fromkeys(urls_base)]
+
+    def __len__(self):
+        return len(self.espelhos)
+
+    def escolhe(self, excluídos=()):
+        """Escolhe o mirror saudável com menor custo estimado.
+
+        Args:
+            excluídos: conjunto de Espelho a desconsiderar.
+
+        Returns:
+            Instância de Espelho ou None caso não exista mirror
+            saudável disponível.
+        """
+        disponíveis = [espelho
+                       for espelho in self.espelhos
+                       if espelho.saudável and espelho not in excluídos]
+        if not disponíveis:
+            return None
+        return min(disponíveis, key=Espelho.custo_estimado)
+
+    async def _requisita(self, espelho, url, baixa):
+        """Requisita url a um mirror, respeitando seu limite.
+
+        Args:
+            espelho: instância de Espelho.
+            url: str da URL requisitada.
+            baixa: corrotina baixa(url) que grava o conteúdo de url em
+                   disco e devolve seus metadados ou None caso o
+                   arquivo não exista.
+
+        Returns:
+            True caso o conteúdo tenha sido gravado ou False caso o
+            arquivo não exista no mirror.
+
+        Raises:
+            Exceções de rede ou de status HTTP inesperado.
+        """
+        await espelho.balde.adquire()
+        início = time.perf_counter()
+        metadados = await baixa(url)
+        espelho.registra_sucesso(time.perf_counter() - início)
+        return metadados is not None
+
+    async def baixa_livro(self, índice, baixa, saída):
+        """Grava a versão txt de um livro obtida de algum mirror,
+           tentando os demais mirrors em caso de falha.
+
+        Args:
+            índice: str do índice do livro.
+            baixa: corrotina baixa(url) que grava o conteúdo de url em
+                   disco e devolve seus metadados ou None caso o
+                   arquivo não exista.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+
+        Returns:
+            str da URL de onde o livro foi obtido ou None caso nenhum
+            mirror saudável possua o livro.
+        """
+        tentados = set()
+        while True:
+            espelho = self.escolhe(tentados)
+            if espelho is None:
+                return None
+            tentados.add(espelho)
+
+            espelho.pendentes += 1
+            try:
+                for url in candidatos_espelho(espelho.url_base, índice):
+                    if await self._requisita(espelho, url, baixa):
+                        return url
+            except (aiohttp.ClientError, asyncio.TimeoutError) as erro:
+                espelho.registra_falha()
+                saída.write(f"Falha ao obter o livro {índice} de "
+                            f"'{espelho.url_base}': {erro!r}.\n")
+                saída.flush()
+            finally:
+                espelho.pendentes -= 1
+
+    def exibe_resumo(self, saída):
+        """Exibe latência média e taxa de erros de cada mirror
+           utilizado.
+
+        Args:
+            saída: instância com métodos write e flush para exibição do
+                   resumo.
+        """
+        for espelho in self.espelhos:
+            if not espelho.requisições:
+                continue
+            latência = (f"{espelho.latência * 1e3:.1f} ms"
+                        if espelho.latência is not None else '-')
+            saída.write(f"Mirror '{espelho.url_base}': "
+                        f"{espelho.requisições} requisições, "
+                        f"{espelho.falhas} falhas, "
+                        f"latência média {latência}.\n")
+        saída.flush()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de texto combináveis: a mesma classe representa as
+estatísticas de uma linha, de um lote, de um livro ou de um autor, e
+a combinação de duas instâncias é associativa e comutativa, com a
+instância vazia como elemento neutro, de forma que os resultados
+possam ser combinados em qualquer ordem e entre processos.
+"""
+
+from _esboços import CONFIANÇA_PADRÃO, ERRO_PADRÃO, EsboçoTokens
+from _resumo_tokens import ResumoTokens
+from _vocabulário import HistogramaTokens
+
+
+# CAMPOS_CONTAGEM e CAMPOS_HISTOGRAMA são os atributos de Estatísticas
+# cujos valores são, respectivamente, int e mapeamentos de str para
+# int.
+CAMPOS_CONTAGEM = ('linhas_invisíveis',
+                   'linhas_visíveis',
+                   'quantidade_caracteres',
+                   'quantidade_sequências')
+CAMPOS_HISTOGRAMA = ('caracteres',
+                     'sequências',
+                     'caracteres_insensíveis',
+                     'sequências_insensíveis')
+
+# CAPACIDADE_APROXIMADO é o número padrão de tokens mais frequentes
+# mantidos no modo aproximado.
+CAPACIDADE_APROXIMADO = 256
+
+
+class HistogramaCaracteres(dict):
+    """Histograma de caracteres, um dict de cada caractere para sua
+       quantidade que guarda os caracteres de maior quantidade, de
+       forma que não seja percorrido a cada exibição.
+
+    A soma de contagens avulsas, como as de cada linha, somente
+    invalida os caracteres de maior quantidade, calculados novamente
+    quando solicitados; a soma de outro HistogramaCaracteres os
+    atualiza. As contagens devem ser alteradas somente por adiciona.
+    """
+
+    __slots__ = ('_máximos', )
+
+    def __init__(self, contagens=None):
+        """Inicializa o histograma.
+
+        Args:
+            contagens: mapeamento de str para int das contagens
+                       iniciais ou None.
+        """
+        super().__init__()
+        # Tupla (maior contagem, set dos caracteres de maior contagem)
+        # ou None caso deva ser calculada.
+        self._máximos = (0, set())
+        if contagens:
+            self.adiciona(contagens)
+
+    def adiciona(self, contagens, multiplicidade=1):
+        """Soma contagens de caracteres ao histograma.
+
+        Args:
+            contagens: mapeamento de str para int a ser somado.
+            multiplicidade: int pelo qual as contagens são
+                            multiplicadas.
+        """
+        obtém = self.get
+        for chave, quantidade in contagens.items():
+            self[chave] = obtém(chave, 0) + quantidade * multiplicidade
+        if not isinstance(contagens, HistogramaCaracteres):
+            self._máximos = None
+            return
+        if self._máximos is None or not contagens:
+            return
+
+        # As contagens só aumentam: o maior valor muda somente quando
+        # uma das contagens somadas o alcança.
+        maior, mais_frequentes = self._máximos
+        maior_somado = max(map(self.__getitem__, contagens))
+        if maior_somado and maior_somado >= maior:
+            maiores = {chave for chave in contagens
+                       if self[chave] == maior_somado}
+            if maior_somado > maior:
+                self._máximos = maior_somado, maiores
+            else:
+                mais_frequentes |= maiores
+
+    def mais_frequentes(self):
+        """Obtém os caracteres de maior contagem.
+
+        Returns:
+            Tupla (int da contagem, set dos caracteres), (0, set()) caso
+            o histograma esteja vazio.
+        """
+        if self._máximos is None:
+            maior = max(self.values(), default=0)
+            self._máximos = maior, {chave for chave, quantidade
+                                    in self.items()
+                                    if maior and quantidade == maior}
+        maior, mais_frequentes = self._máximos
+        return maior, set(mais_frequentes)
+
+    def __reduce__(self):
+        return HistogramaCaracteres, (dict(self), )
+
+
+def _soma_tokens(destino, origem, multiplicidade):
+    """Soma as contagens de um histograma de tokens a outro: entre
+       histogramas do mesmo tipo sem multiplicidade, pela sua própria
+       soma (entre instâncias de HistogramaTokens, uma soma de
+       vetores).
+
+    Args:
+        destino: HistogramaTokens ou ResumoTokens a ser atualizado.
+        origem: mapeamento de str para int ou histograma do mesmo tipo
+                de destino a ser somado.
+        multiplicidade: int pelo qual as contagens são multiplicadas.
+    """
+    if isinstance(origem, type(destino)) and multiplicidade == 1:
+        destino += origem
+    else:
+        destino.adiciona(origem, multiplicidade)
+
+
+def _vazio_como(histograma):
+    """Obtém um histograma de tokens vazio do mesmo tipo de histograma.
+
+    Args:
+        histograma: histograma de tokens de Estatísticas.
+
+    Returns:
+        Instância vazia do mesmo tipo de histograma ou, caso seja um
+        mapeamento simples (estatísticas de uma linha), de
+        HistogramaTokens.
+    """
+    vazio = getattr(histograma, 'vazio', None)
+    return HistogramaTokens() if vazio is None else vazio()
+
+
+class Estatísticas:
+    """Estatísticas de um trecho de texto.
+
+    Attributes:
+        linhas_invisíveis: int de linhas somente com caracteres
+                           invisíveis.
+        linhas_visíveis: int de linhas com caracteres visíveis.
+        quantidade_caracteres: int de caracteres visíveis.
+        quantidade_sequências: int de sequências visíveis contíguas.
+        caracteres: HistogramaCaracteres (ou, nas estatísticas de uma
+                    linha, outro mapeamento) de cada caractere visível
+                    para sua quantidade.
+        sequências: HistogramaTokens (ou, nas estatísticas de uma
+                    linha, outro mapeamento) de cada sequência visível
+                    contígua para sua quantidade ou, no modo resumido,
+                    ResumoTokens das sequências mais frequentes e mais
+                    longas (ver _resumo_tokens) ou, no modo aproximado,
+                    EsboçoTokens, que também estima as contagens e o
+                    número de sequências distintas (ver _esboços).
+        caracteres_insensíveis: como caracteres, em minúsculas.
+        sequências_insensíveis: como sequências, em minúsculas.
+    """
+
+    __slots__ = CAMPOS_CONTAGEM + CAMPOS_HISTOGRAMA
+
+    def __init__(self, linhas_invisíveis=0, linhas_visíveis=0,
+                 quantidade_caracteres=0, quantidade_sequências=0,
+                 caracteres=None, sequências=None,
+                 caracteres_insensíveis=None, sequências_insensíveis=None):
+        """Inicializa as estatísticas; sem argumentos, vazias."""
+        self.linhas_invisíveis = linhas_invisíveis
+        self.linhas_visíveis = linhas_visíveis
+        self.quantidade_caracteres = quantidade_caracteres
+        self.quantidade_sequências = quantidade_sequências
+        self.caracteres = (HistogramaCaracteres() if caracteres is None
+                           else caracteres)
+        self.sequências = (HistogramaTokens() if sequências is None
+                           else sequências)
+        self.caracteres_insensíveis = (HistogramaCaracteres()
+                                       if caracteres_insensíveis is None
+                                       else caracteres_insensíveis)
+        self.sequências_insensíveis = (HistogramaTokens()
+                                       if sequências_insensíveis is None
+                                       else sequências_insensíveis)
+
+    @property
+    def total_linhas(self):
+        """int do total de linhas."""
+        return self.linhas_invisíveis + self.linhas_visíveis
+
+    def __bool__(self):
+        return self.total_linhas > 0
+
+    def acumula(self, outra, multiplicidade=1):
+        """Combina, no lugar, outras estatísticas a estas.
+
+        Args:
+            outra: instância de Estatísticas a ser combinada.
+            multiplicidade: int de vezes que outra é combinada, por
+                            exemplo, o número de ocorrências de uma
+                            linha.
+
+        Returns:
+            A própria instância.
+        """
+        self.linhas_invisíveis += outra.linhas_invisíveis * multiplicidade
+        self.linhas_visíveis += outra.linhas_visíveis * multiplicidade
+        self.quantidade_caracteres += (outra.quantidade_caracteres *
+                                       multiplicidade)
+        self.quantidade_sequências += (outra.quantidade_sequências *
+                                       multiplicidade)
+        self.caracteres.adiciona(outra.caracteres, multiplicidade)
+        self.caracteres_insensíveis.adiciona(outra.caracteres_insensíveis,
+                                             multiplicidade)
+        _soma_tokens(self.sequências, outra.sequências, multiplicidade)
+        _soma_tokens(self.sequências_insensíveis,
+                     outra.sequências_insensíveis, multiplicidade)
+        return self
+
+    def __iadd__(self, outra):
+        if not isinstance(outra, Estatísticas):
+            return NotImplemented
+        return self.acumula(outra)
+
+    def __add__(self, outra):
+        if not isinstance(outra, Estatísticas):
+            return NotImplemented
+        soma = Estatísticas(
+            sequências=_vazio_como(self.sequências),
+            sequências_insensíveis=_vazio_como(self.sequências_insensíveis))
+        return soma.acumula(self).acumula(outra)
+
+    def __eq__(self, outra):
+        if not isinstance(outra, Estatísticas):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outra, campo)
+                   for campo in CAMPOS_CONTAGEM + CAMPOS_HISTOGRAMA)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({self.total_linhas} linhas, "
+                f"{self.quantidade_caracteres} caracteres visíveis, "
+                f"{self.quantidade_sequências} sequências)")
+
+
+def cria_modelo_tokens(capacidade_resumo=None, aproximado=False,
+                       erro=ERRO_PADRÃO, confiança=CONFIANÇA_PADRÃO):
+    """Cria o modelo dos histogramas de tokens das estatísticas de cada
+       livro, a ser passado a cria_estatísticas.
+
+    Args:
+        capacidade_resumo: int do número máximo de tokens mantidos por
+                           histograma de tokens, para o modo resumido
+                           (ver _resumo_tokens), ou None.
+        aproximado: bool indicando o modo aproximado (ver _esboços),
+                    que mantém os CAPACIDADE_APROXIMADO tokens mais
+                    frequentes caso capacidade_resumo seja None.
+        erro: float do erro máximo relativo das contagens estimadas
+              no modo aproximado.
+        confiança: float da probabilidade de cada contagem estimada
+                   respeitar o erro máximo no modo aproximado.
+
+    Returns:
+        Instância vazia de EsboçoTokens ou ResumoTokens ou None para
+        histogramas exatos.
+    """
+    if aproximado:
+        return EsboçoTokens(capacidade_resumo or CAPACIDADE_APROXIMADO,
+                            erro, confiança)
+    if capacidade_resumo is not None:
+        return ResumoTokens(capacidade_resumo)
+    return None
+
+
+def cria_estatísticas(modelo_tokens=None):
+    """Cria as estatísticas vazias de um livro.
+
+    Args:
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+
+    Returns:
+        Instância de Estatísticas vazia.
+    """
+    if modelo_tokens is None:
+        return Estatísticas()
+    return Estatísticas(sequências=modelo_tokens.vazio(),
+                        sequências_insensíveis=modelo_tokens.vazio())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cálculo das estatísticas de caracteres visíveis (total e histogramas
+sensível e insensível ao caso) sobre o livro inteiro, em vez de linha
+a linha: com NumPy, o texto é convertido uma única vez para um array
+de code points contado com numpy.bincount (ou numpy.unique); sem
+NumPy, com uma única contagem collections.Counter sobre o texto.
+"""
+
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from _corpo_livro import CorpoLivro
+from _estatísticas import HistogramaCaracteres
+from _estatísticas_linha import insensível_ao_caso
+
+
+# BACKENDS_CARACTERES são as formas de cálculo das estatísticas de
+# caracteres: 'python', linha a linha junto às demais estatísticas de
+# linha, e 'numpy', sobre o livro inteiro.
+BACKENDS_CARACTERES = ('python', 'numpy')
+BACKEND_CARACTERES_PADRÃO = 'python'
+
+# LIMITE_BINCOUNT é o limite (exclusivo) de code point abaixo do qual
+# numpy.bincount é utilizado; acima dele, o array de contagens seria
+# grande demais e numpy.unique é utilizado.
+LIMITE_BINCOUNT = 0x10000
+
+
+def por_livro(backend_caracteres):
+    """Indica se as estatísticas de caracteres devem ser calculadas
+       sobre o livro inteiro por conta_caracteres.
+
+    Args:
+        backend_caracteres: str de BACKENDS_CARACTERES.
+
+    Returns:
+        bool.
+    """
+    return backend_caracteres == 'numpy'
+
+
+def _histograma_python(texto):
+    """Obtém o histograma de caracteres visíveis com Counter.
+
+    Args:
+        texto: str a ser contada.
+
+    Returns:
+        Instância de collections.Counter.
+    """
+    return collections.Counter(''.join(texto.split()))
+
+
+def _histograma_numpy(texto):
+    """Obtém o histograma de caracteres visíveis com NumPy: os caracteres
+       são contados por code point e os espaços em branco, descartados
+       somente entre os code points distintos.
+
+    Args:
+        texto: str a ser contada.
+
+    Returns:
+        Instância de dict cujas chaves são os caracteres visíveis e
+        cujos valores são suas quantidades.
+    """
+    códigos = numpy.frombuffer(texto.encode('utf-32-le', 'surrogatepass'),
+                               dtype='<u4')
+    if not códigos.size:
+        return {}
+    if int(códigos.max()) < LIMITE_BINCOUNT:
+        contagens = numpy.bincount(códigos)
+        presentes = numpy.flatnonzero(contagens)
+        quantidades = contagens[presentes]
+    else:
+        presentes, quantidades = numpy.unique(códigos, return_counts=True)
+    return {caractere: quantidade
+            for código, quantidade in zip(presentes.tolist(),
+                                          quantidades.tolist())
+            for caractere in (chr(código), )
+            if not caractere.isspace()}
+
+
+def conta_caracteres(linhas):
+    """Calcula as estatísticas de caracteres visíveis de um conjunto de
+       linhas de uma só vez, com NumPy caso disponível. O resultado é
+       idêntico à soma das estatísticas de cada linha calculadas por
+       calcula_estatísticas_linha.
+
+    Args:
+        linhas: CorpoLivro ou outro iterável de str das linhas.
+
+    Returns:
+        Tupla (quantidade de caracteres visíveis, HistogramaCaracteres
+        dos caracteres visíveis, HistogramaCaracteres dos caracteres
+        visíveis insensível ao caso).
+    """
+    # As linhas de um CorpoLivro já estão unidas por '\n' no texto.
+    if isinstance(linhas, CorpoLivro):
+        texto = linhas.conteúdo
+    else:
+        texto = '\n'.join(linha for linha in linhas
+                          if isinstance(linha, str))
+
+    if numpy is not None:
+        histograma = _histograma_numpy(texto)
+    else:
+        histograma = _histograma_python(texto)
+    return (sum(histograma.values()), HistogramaCaracteres(histograma),
+            HistogramaCaracteres(insensível_ao_caso(histograma)))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Cálculo das estatísticas de uma linha de livro, compartilhado pelas
+versões síncrona e assíncrona: os quatro histogramas (caracteres
+visíveis, sequências visíveis contíguas e suas versões insensíveis ao
+caso) são obtidos em uma passada linear sobre a linha.
+"""
+
+import collections
+
+from _estatísticas import Estatísticas
+
+
+# CONVERSÃO_CONTEXTUAL é o caractere cuja conversão para minúsculas
+# depende dos caracteres vizinhos (sigma final). Além dele, somente
+# caracteres cuja versão minúscula tem mais de um caractere (como
+# U+0130) fazem a conversão de cada caractere isolado diferir da
+# conversão da str inteira, o que é detectado pelo comprimento.
+CONVERSÃO_CONTEXTUAL = '\u03a3'
+
+
+def insensível_ao_caso(histograma):
+    """Obtém a versão insensível ao caso de um histograma, convertendo
+       cada chave distinta para minúsculas uma única vez.
+
+    Args:
+        histograma: collections.Counter a ser convertido.
+
+    Returns:
+        Instância de collections.Counter cujas chaves são as chaves de
+        histograma em minúsculas.
+    """
+    insensível = collections.Counter()
+    for chave, quantidade in histograma.items():
+        insensível[chave.lower()] += quantidade
+    return insensível
+
+
+def calcula_estatísticas_linha(linha, com_caracteres=True):
+    """Extrai dados de uma linha a ser analisada de um livro.
+
+    As sequências visíveis contíguas são obtidas por str.split e os
+    caracteres visíveis são exatamente os caracteres dessas sequências,
+    contados de uma só vez com collections.Counter. A linha é
+    convertida para minúsculas uma única vez para as sequências
+    insensíveis ao caso (str.lower nunca cria nem remove espaços em
+    branco). O mesmo vale para os caracteres insensíveis, exceto
+    quando a conversão de um caractere isolado difere da conversão
+    dentro da linha (ver CONVERSÃO_CONTEXTUAL).
+
+    Args:
+        linha: str a ser analisada.
+        com_caracteres: bool indicando se as estatísticas de
+                        caracteres são calculadas; caso contrário, são
+                        entregues zeradas, para quando forem calculadas
+                        sobre o livro inteiro (ver
+                        _estatísticas_caracteres).
+
+    Returns:
+        Entrega uma instância de Estatísticas da linha, cujos
+        histogramas são instâncias de collections.Counter, ou None caso
+        linha não seja str.
+    """
+
+    # Caso não possua linha a ser analisada,
+    # devolve sem informações úteis.
+    if not isinstance(linha, str):
+        return None
+
+    visíveis_contíguos = linha.split()
+
+    # Uma linha sem sequências visíveis é composta somente de
+    # caracteres invisíveis.
+    if not visíveis_contíguos:
+        return Estatísticas(linhas_invisíveis=1,
+                            caracteres={},
+                            sequências={},
+                            caracteres_insensíveis={},
+                            sequências_insensíveis={})
+
+    if not com_caracteres:
+        return Estatísticas(
+            linhas_visíveis=1,
+            quantidade_sequências=len(visíveis_contíguos),
+            caracteres={},
+            sequências=collections.Counter(visíveis_contíguos),
+            caracteres_insensíveis={},
+            sequências_insensíveis=collections.Counter(
+                linha.lower().split()))
+
+    caracteres = ''.join(visíveis_contíguos)
+    caracteres_visíveis = collections.Counter(caracteres)
+    caracteres_minúsculos = caracteres.lower()
+    if (len(caracteres_minúsculos) == len(caracteres) and
+            CONVERSÃO_CONTEXTUAL not in caracteres):
+        caracteres_visíveis_insensíveis = collections.Counter(
+            caracteres_minúsculos)
+    else:
+        caracteres_visíveis_insensíveis = insensível_ao_caso(
+            caracteres_visíveis)
+
+    return Estatísticas(
+        linhas_visíveis=1,
+        quantidade_caracteres=len(caracteres),
+        quantidade_sequências=len(visíveis_contíguos),
+        caracteres=caracteres_visíveis,
+        sequências=collections.Counter(visíveis_contíguos),
+        caracteres_insensíveis=caracteres_visíveis_insensíveis,
+        sequências_insensíveis=collections.Counter(linha.lower().split()))
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Modo incremental: um manifesto, por configuração da análise, registra
+os livros (índices do Project Gutenberg) já analisados com
+VERSÃO_ANALISADOR, e o total de cada autor é armazenado ao lado das
+entradas de _cache_resultados. A cada execução, somente os livros
+novos no índice ou cujo texto mudou são lidos e analisados, e suas
+estatísticas são somadas aos totais armazenados: o custo da execução
+cresce com o número de livros novos, não com o catálogo dos autores.
+
+Livros cujo arquivo mantém o tamanho e o instante de modificação
+registrados não são lidos; caso contrário, o hash do texto decide se
+o livro mudou (ver _índice_autores). Como os totais não admitem
+subtração (os resumos dos modos resumido e aproximado não a
+permitem), o total de um autor com um livro alterado é reconstruído a
+partir das entradas de _cache_resultados dos demais livros; livros
+sem entrada são retirados do manifesto, para que sejam analisados
+novamente na próxima execução.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+
+from _agregação import reduz_em_árvore
+from _cache_resultados import (
+    NOME_DIRETÓRIO_RESULTADOS,
+    VERSÃO_ANALISADOR,
+    descreve_modelo_tokens,
+    grava_entrada,
+    hash_texto,
+    lê_entrada,
+)
+from _transporte import desempacota_estatísticas, empacota_estatísticas
+
+
+# PREFIXO_MANIFESTO e SUFIXO_TOTAL identificam os arquivos do modo
+# incremental no diretório das entradas de _cache_resultados.
+PREFIXO_MANIFESTO = 'manifesto-'
+SUFIXO_TOTAL = '.total'
+
+
+def _identificador(*partes):
+    """Obtém um nome de arquivo estável para partes arbitrárias.
+
+    Returns:
+        str com o hash SHA-256 de partes em hexadecimal.
+    """
+    return hashlib.sha256(
+        repr(partes).encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class ManifestoIncremental:
+    """Livros analisados e totais dos autores armazenados em disco para
+       uma configuração da análise.
+
+    Os livros novos ou alterados encontrados na coleta ficam pendentes
+    até que atualiza_totais some as suas estatísticas aos totais e
+    os registre no manifesto.
+    """
+
+    def __init__(self, diretório, modelo_tokens=None):
+        """Carrega o manifesto da configuração armazenado em diretório,
+           caso exista e seja da versão atual do analisador.
+
+        Args:
+            diretório: pathlib.Path do diretório dos arquivos obtidos
+                       do Project Gutenberg.
+            modelo_tokens: instância vazia, de cria_modelo_tokens, do
+                           tipo de histograma de tokens utilizado, ou
+                           None para histogramas exatos.
+        """
+        self.diretório = diretório
+        self.diretório_resultados = diretório / NOME_DIRETÓRIO_RESULTADOS
+        self.diretório_resultados.mkdir(mode=0o755, parents=True,
+                                        exist_ok=True)
+        self.configuração = descreve_modelo_tokens(modelo_tokens)
+        self.caminho = self.diretório_resultados / (
+            f"{PREFIXO_MANIFESTO}"
+            f"{_identificador(self.configuração)[:16]}.json")
+        self.alterado = False
+        self.autores_listados = set()
+        # Registro de cada livro analisado, pelo índice em str: dict
+        # com nome do livro, nome do autor, hash do texto, tamanho e
+        # instante de modificação do arquivo e se a análise obteve
+        # estatísticas.
+        self._livros = {}
+        # Tupla (índice, registro) de cada livro novo ou alterado, pela
+        # tupla (nome do livro, nome do autor).
+        self._pendentes = {}
+        try:
+            with self.caminho.open('rt', encoding='utf-8') as arquivo:
+                dados = json.load(arquivo)
+            if (dados['versão_analisador'] == VERSÃO_ANALISADOR and
+                    dados['configuração'] == self.configuração):
+                self._livros = dict(dados['livros'])
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+
+    def caminho_livro(self, índice):
+        """Obtém o caminho do arquivo armazenado de um livro.
+
+        Args:
+            índice: str ou int do índice do livro.
+
+        Returns:
+            Instância de pathlib.Path do arquivo.
+        """
+        return pathlib.Path(self.diretório, f"{índice}.txt")
+
+    def filtra_inalterados(self, tuplas_livros_autor):
+        """Retira os livros já analisados cujo arquivo não mudou, que
+           não precisam ser lidos, registrando os autores listados.
+
+        Args:
+            tuplas_livros_autor: list de tuplas (nome do livro, nome do
+                                 autor, índice) dos livros listados no
+                                 índice.
+
+        Returns:
+            Instância de list das tuplas dos livros a serem lidos.
+        """
+        a_ler = []
+        for tupla in tuplas_livros_autor:
+            nome_livro, nome_autor, índice = tupla
+            self.autores_listados.add(nome_autor)
+            registro = self._livros.get(str(índice))
+            if (registro is not None and
+                    (registro['livro'], registro['autor']) ==
+                    (nome_livro, nome_autor)):
+                try:
+                    estado = self.caminho_livro(índice).stat()
+                except OSError:
+                    estado = None
+                if (estado is not None and
+                        estado.st_size == registro['tamanho'] and
+                        estado.st_mtime_ns == registro['mtime_ns']):
+                    continue
+            a_ler.append(tupla)
+        return a_ler
+
+    def pendente(self, tupla, texto_livro):
+        """Verifica se um livro lido é novo ou mudou desde a análise
+           registrada, deixando-o pendente caso sim.
+
+        Args:
+            tupla: tupla (nome do livro, nome do autor, índice).
+            texto_livro: str da versão txt do livro.
+
+        Returns:
+            True caso o livro deva ser analisado, False caso contrário.
+        """
+        nome_livro, nome_autor, índice = tupla
+        estado = self.caminho_livro(índice).stat()
+        registro = {'livro': nome_livro, 'autor': nome_autor,
+                    'sha256': hash_texto(texto_livro),
+                    'tamanho': estado.st_size,
+                    'mtime_ns': estado.st_mtime_ns}
+        anterior = self._livros.get(str(índice))
+        if anterior is not None and all(
+                anterior[campo] == registro[campo]
+                for campo in ('livro', 'autor', 'sha256')):
+            # Somente o arquivo foi regravado: o registro é atualizado
+            # para que não seja lido novamente.
+            registro['com_estatísticas'] = anterior['com_estatísticas']
+            self._livros[str(índice)] = registro
+            self.alterado = True
+            return False
+        self._pendentes[(nome_livro, nome_autor)] = (str(índice), registro)
+        return True
+
+    def _índices_autor(self, nome_autor):
+        """Obtém a tupla ordenada dos índices registrados de um autor."""
+        return tuple(sorted(
+            índice for índice, registro in self._livros.items()
+            if registro['autor'] == nome_autor))
+
+    def _caminho_total(self, nome_autor):
+        """Obtém o caminho do total armazenado de um autor."""
+        return self.diretório_resultados / (
+            f"{_identificador(nome_autor, self.configuração)}"
+            f"{SUFIXO_TOTAL}")
+
+    def _chave_total(self, nome_autor, índices):
+        """Obtém a chave completa do total de um autor."""
+        return nome_autor, índices, VERSÃO_ANALISADOR, self.configuração
+
+    def _lê_total(self, nome_autor, índices):
+        """Lê o total armazenado de um autor, caso corresponda
+           exatamente aos livros de índices.
+
+        Returns:
+            Instância de Estatísticas ou None.
+        """
+        entrada = lê_entrada(self._caminho_total(nome_autor))
+        if (entrada is None or
+                entrada[0] != self._chave_total(nome_autor, índices)):
+            return None
+        return desempacota_estatísticas(entrada[1])
+
+    def _reconstrói(self, nome_autor, analisadas, cache, saída):
+        """Obtém as estatísticas de cada livro registrado de um autor,
+           para a reconstrução do seu total: as dos livros analisados
+           nesta execução ou as das entradas de _cache_resultados. Os
+           livros sem estatísticas disponíveis são retirados do
+           manifesto.
+
+        Args:
+            nome_autor: str do nome do autor.
+            analisadas: dict de (nome do livro, nome do autor) para as
+                        Estatísticas dos livros analisados nesta
+                        execução.
+            cache: instância de CacheResultados ou None.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+
+        Returns:
+            Instância de list de Estatísticas.
+        """
+        estatísticas_livros = []
+        for índice in self._índices_autor(nome_autor):
+            registro = self._livros[índice]
+            tupla_livro = (registro['livro'], nome_autor)
+            if not registro['com_estatísticas']:
+                continue
+            if tupla_livro in analisadas:
+                estatísticas_livros.append(analisadas[tupla_livro])
+                continue
+            pacote = (None if cache is None else
+                      cache.consulta_por_hash(tupla_livro,
+                                              registro['sha256'], saída))
+            if pacote is None:
+                saída.write(f"Sem estatísticas armazenadas de "
+                            f"'{registro['livro']}' de '{nome_autor}': "
+                            f"será analisado na próxima execução.\n")
+                saída.flush()
+                del self._livros[índice]
+                continue
+            estatísticas_livros.append(desempacota_estatísticas(pacote))
+        return estatísticas_livros
+
+    def atualiza_totais(self, estatísticas_por_livro, saída, cache=None):
+        """Registra os livros pendentes, analisados nesta execução, e
+           soma as suas estatísticas aos totais armazenados dos autores
+           listados na coleta.
+
+        Args:
+            estatísticas_por_livro: dict cujas chaves são tuplas
+                                    (nome do livro, nome do autor) e
+                                    cujos respectivos valores são
+                                    instâncias de Estatísticas dos
+                                    livros pendentes.
+            saída: instância com métodos write e flush para exibição do
+                   andamento do método.
+            cache: instância de CacheResultados de onde as estatísticas
+                   dos demais livros de um autor são obtidas caso seu
+                   total precise ser reconstruído, ou None.
+
+        Returns:
+            Tupla (dict cujas chaves são os nomes dos autores e cujos
+            respectivos valores são Estatísticas do total de cada autor,
+            Estatísticas do total de todos os autores) ou None caso não
+            haja estatísticas.
+        """
+        autores = self.autores_listados | {
+            registro['autor'] for _, registro in self._pendentes.values()}
+        índices_anteriores = {nome_autor: self._índices_autor(nome_autor)
+                              for nome_autor in autores}
+
+        # Registra os livros pendentes. Os totais dos autores de livros
+        # alterados são reconstruídos.
+        novas_por_autor = {}
+        reconstruir = set()
+        for tupla_livro, (índice, registro) in self._pendentes.items():
+            anterior = self._livros.get(índice)
+            if anterior is not None:
+                reconstruir.update((anterior['autor'], registro['autor']))
+            registro['com_estatísticas'] = (
+                tupla_livro in estatísticas_por_livro)
+            self._livros[índice] = registro
+            self.alterado = True
+            if registro['com_estatísticas']:
+                novas_por_autor.setdefault(registro['autor'], []).append(
+                    estatísticas_por_livro[tupla_livro])
+        self._pendentes.clear()
+
+        grupos = {}
+        for nome_autor in sorted(autores):
+            total = None
+            if nome_autor not in reconstruir:
+                anteriores = índices_anteriores[nome_autor]
+                total = self._lê_total(nome_autor, anteriores)
+                if total is None and anteriores:
+                    reconstruir.add(nome_autor)
+            if nome_autor in reconstruir:
+                itens = self._reconstrói(nome_autor, estatísticas_por_livro,
+                                         cache, saída)
+            else:
+                itens = ([total] if total else []) + novas_por_autor.get(
+                    nome_autor, [])
+            if itens:
+                grupos[nome_autor] = itens
+
+        totais_autores = reduz_em_árvore(grupos)
+        for nome_autor, total in totais_autores.items():
+            if nome_autor in novas_por_autor or nome_autor in reconstruir:
+                grava_entrada(self._caminho_total(nome_autor),
+                              self._chave_total(
+                                  nome_autor, self._índices_autor(nome_autor)),
+                              empacota_estatísticas(total))
+        self.grava()
+
+        if not totais_autores:
+            return None
+        total = reduz_em_árvore({None: list(totais_autores.values())})[None]
+        return totais_autores, total
+
+    def livros_por_autor(self):
+        """Obtém o número de livros registrados de cada autor listado
+           na coleta, incluídos nos totais.
+
+        Returns:
+            Instância de dict de str do nome do autor para int.
+        """
+        quantidades = dict.fromkeys(self.autores_listados, 0)
+        for registro in self._livros.values():
+            if (registro['autor'] in quantidades and
+                    registro['com_estatísticas']):
+                quantidades[registro['autor']] += 1
+        return {nome_autor: quantidade
+                for nome_autor, quantidade in quantidades.items()
+                if quantidade}
+
+    def grava(self):
+        """Grava o manifesto em disco, substituindo atomicamente o
+           anterior, caso tenha sido alterado.
+        """
+        if not self.alterado:
+            return
+        caminho_temporário = self.caminho.with_name(
+            f"{self.caminho.name}.{os.getpid()}.tmp")
+        with caminho_temporário.open('wt', encoding='utf-8') as arquivo:
+            json.dump({'versão_analisador': VERSÃO_ANALISADOR,
+                       'configuração': self.configuração,
+                       'livros': self._livros},
+                      arquivo, ensure_ascii=False, indent=2,
+                      sort_keys=True)
+        os.replace(str(caminho_temporário), str(self.caminho))
+        self.alterado = False
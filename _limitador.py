@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Limitadores de taxa de requisições assíncronas para respeitar as
+regras de coleta automatizada do Project Gutenberg.
+"""
+
+import asyncio
+
+import yarl
+
+
+# INTERVALO_REQUISIÇÕES é o intervalo padrão, em segundos, entre
+# requisições a um mesmo host.
+# http://www.gutenberg.org/wiki/Gutenberg:Information_About_Robot_Access_to_our_Pages
+INTERVALO_REQUISIÇÕES = 2.
+
+
+class BaldeFichas:
+    """Balde de fichas (token bucket) assíncrono: libera uma ficha a
+       cada intervalo segundos, acumulando no máximo capacidade fichas.
+
+    Quem aguarda uma ficha somente suspende a própria corrotina, de
+    forma que outras tarefas (leituras de cache, análise de HTML,
+    escrita em disco) continuam sendo executadas durante a espera.
+    """
+
+    def __init__(self, intervalo=INTERVALO_REQUISIÇÕES, capacidade=1):
+        """Inicializa o balde cheio.
+
+        Args:
+            intervalo: tempo, em segundos, para a liberação de uma ficha.
+            capacidade: número máximo de fichas acumuladas.
+        """
+        self.intervalo = intervalo
+        self.capacidade = capacidade
+        self._fichas = float(capacidade)
+        self._instante = None
+        self._trava = None
+
+    def _reabastece(self, agora):
+        """Acrescenta as fichas liberadas desde a última atualização.
+
+        Args:
+            agora: instante atual do relógio do event loop.
+        """
+        if self._instante is not None and self.intervalo > 0:
+            self._fichas = min(
+                float(self.capacidade),
+                self._fichas + (agora - self._instante) / self.intervalo)
+        elif self.intervalo <= 0:
+            self._fichas = float(self.capacidade)
+        self._instante = agora
+
+    def espera_estimada(self):
+        """Estima quanto tempo falta para a próxima ficha ser liberada,
+           desconsiderando quem já aguarda na fila.
+
+        Returns:
+            float com o tempo, em segundos; 0. caso exista ficha
+            disponível.
+        """
+        if self._instante is None:
+            return 0.
+        self._reabastece(asyncio.get_event_loop().time())
+        return max(0., (1. - self._fichas) * self.intervalo)
+
+    async def adquire(self):
+        """Aguarda até que uma ficha esteja disponível e a consome."""
+        if self._trava is None:
+            self._trava = asyncio.Lock()
+        loop = asyncio.get_event_loop()
+        async with self._trava:
+            while True:
+                self._reabastece(loop.time())
+                if self._fichas >= 1.:
+                    self._fichas -= 1.
+                    return
+                await asyncio.sleep((1. - self._fichas) * self.intervalo)
+
+
+class LimitadorPorHost:
+    """Mantém um BaldeFichas independente para cada host requisitado."""
+
+    def __init__(self, intervalo=INTERVALO_REQUISIÇÕES, capacidade=1):
+        """Inicializa o limitador sem nenhum host conhecido.
+
+        Args:
+            intervalo: tempo, em segundos, entre requisições a um mesmo
+                       host.
+            capacidade: número máximo de requisições em rajada a um
+                        mesmo host.
+        """
+        self.intervalo = intervalo
+        self.capacidade = capacidade
+        self._baldes = {}
+
+    def balde(self, url):
+        """Obtém o BaldeFichas do host de url, criando-o se necessário.
+
+        Args:
+            url: str ou yarl.URL requisitada.
+
+        Returns:
+            Instância de BaldeFichas.
+        """
+        host = yarl.URL(str(url)).host
+        if host not in self._baldes:
+            self._baldes[host] = BaldeFichas(self.intervalo,
+                                             self.capacidade)
+        return self._baldes[host]
+
+    async def adquire(self, url):
+        """Aguarda a vez de requisitar url respeitando o intervalo do
+           host.
+
+        Args:
+            url: str ou yarl.URL a ser requisitada.
+        """
+        await self.balde(url).adquire()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Metadados dos arquivos obtidos do Project Gutenberg e armazenados
+localmente, para revalidação condicional (ETag / Last-Modified).
+"""
+
+import json
+import os
+import time
+
+
+# SUFIXO_METADADOS é o sufixo do arquivo de metadados armazenado ao
+# lado de cada arquivo obtido.
+SUFIXO_METADADOS = '.meta.json'
+
+
+def caminho_metadados(caminho_arquivo):
+    """Obtém o caminho do arquivo de metadados de um arquivo armazenado.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+
+    Returns:
+        Instância de pathlib.Path do arquivo de metadados.
+    """
+    return caminho_arquivo.with_name(caminho_arquivo.name + SUFIXO_METADADOS)
+
+
+def lê_metadados(caminho_arquivo):
+    """Lê os metadados de um arquivo armazenado.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+
+    Returns:
+        Instância de dict com os metadados; vazio caso não existam ou
+        não possam ser lidos.
+    """
+    try:
+        with caminho_metadados(caminho_arquivo).open(
+                'rt', encoding='utf-8') as arquivo_metadados:
+            metadados = json.load(arquivo_metadados)
+    except (OSError, ValueError):
+        return {}
+    return metadados if isinstance(metadados, dict) else {}
+
+
+def grava_metadados(caminho_arquivo, metadados):
+    """Grava os metadados de um arquivo armazenado, substituindo
+       atomicamente os anteriores.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        metadados: dict serializável em JSON.
+    """
+    caminho = caminho_metadados(caminho_arquivo)
+    caminho_temporário = caminho.with_name(
+        f"{caminho.name}.{os.getpid()}.tmp")
+    with caminho_temporário.open('wt', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+    os.replace(str(caminho_temporário), str(caminho))
+
+
+def atualiza_metadados(caminho_arquivo, **valores):
+    """Atualiza somente as chaves informadas dos metadados de um
+       arquivo armazenado.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        valores: chaves e valores a serem atualizados; valores None
+                 removem a chave.
+
+    Returns:
+        Instância de dict com os metadados atualizados.
+    """
+    metadados = lê_metadados(caminho_arquivo)
+    for chave, valor in valores.items():
+        if valor is None:
+            metadados.pop(chave, None)
+        else:
+            metadados[chave] = valor
+    grava_metadados(caminho_arquivo, metadados)
+    return metadados
+
+
+def metadados_resposta(cabeçalhos):
+    """Extrai dos cabeçalhos de uma resposta HTTP os metadados para
+       revalidação condicional.
+
+    Args:
+        cabeçalhos: mapeamento dos cabeçalhos da resposta.
+
+    Returns:
+        Instância de dict com as chaves 'etag', 'last_modified' e
+        'obtido_em' (instante da obtenção, em segundos desde a época).
+    """
+    return {'etag': cabeçalhos.get('ETag'),
+            'last_modified': cabeçalhos.get('Last-Modified'),
+            'obtido_em': time.time()}
+
+
+def metadados_não_modificado(cabeçalhos):
+    """Extrai dos cabeçalhos de uma resposta 304 os metadados a serem
+       atualizados: uma resposta 304 pode omitir ETag e Last-Modified,
+       então somente os validadores presentes substituem os
+       armazenados.
+
+    Args:
+        cabeçalhos: mapeamento dos cabeçalhos da resposta.
+
+    Returns:
+        Instância de dict com 'obtido_em' e as chaves de
+        metadados_resposta presentes na resposta.
+    """
+    return {chave: valor
+            for chave, valor in metadados_resposta(cabeçalhos).items()
+            if valor is not None}
+
+
+def cabeçalhos_condicionais(metadados):
+    """Monta os cabeçalhos de uma requisição GET condicional.
+
+    Args:
+        metadados: dict de metadados do arquivo armazenado.
+
+    Returns:
+        Instância de dict com If-None-Match e/ou If-Modified-Since,
+        conforme os metadados disponíveis.
+    """
+    cabeçalhos = {}
+    if metadados.get('etag'):
+        cabeçalhos['If-None-Match'] = metadados['etag']
+    if metadados.get('last_modified'):
+        cabeçalhos['If-Modified-Since'] = metadados['last_modified']
+    return cabeçalhos
+
+
+def precisa_revalidar(caminho_arquivo, idade_máxima):
+    """Verifica se um arquivo armazenado é mais antigo que a idade
+       máxima permitida.
+
+    Caso não existam metadados, é considerado o instante de
+    modificação do arquivo.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo armazenado.
+        idade_máxima: idade máxima, em segundos, ou None para confiar
+                      indefinidamente no arquivo armazenado.
+
+    Returns:
+        True caso o arquivo deva ser revalidado, False caso contrário.
+    """
+    if idade_máxima is None:
+        return False
+    obtido_em = lê_metadados(caminho_arquivo).get('obtido_em')
+    if obtido_em is None:
+        obtido_em = caminho_arquivo.stat().st_mtime
+    return time.time() - obtido_em > idade_máxima
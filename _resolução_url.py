@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Resolução da URL da versão txt de um livro do Project Gutenberg sem
+obter e analisar a página HTML do livro: primeiro são tentados os
+caminhos conhecidos da estrutura de arquivos do sítio; somente em
+último caso a página é lida em blocos até o primeiro link para a
+versão txt. As URLs resolvidas são armazenadas em disco.
+"""
+
+import codecs
+import html.parser
+import json
+import os
+import urllib.parse
+
+
+# URL_BASE_SÍTIO é a URL base do sítio principal do Project Gutenberg.
+URL_BASE_SÍTIO = 'http://www.gutenberg.org/'
+
+# CAMINHO_ÍNDICE, CAMINHO_ESPELHOS e CAMINHO_PÁGINA_LIVRO são os
+# caminhos, relativos à URL base do sítio, da lista de todos os livros,
+# da lista de mirrors e da página HTML com as versões de um livro.
+CAMINHO_ÍNDICE = 'dirs/GUTINDEX.ALL'
+CAMINHO_ESPELHOS = 'MIRRORS.ALL'
+CAMINHO_PÁGINA_LIVRO = 'ebooks/{id}'
+
+# NOME_ARQUIVO_MAPA_URLS é o nome do arquivo, no diretório dos arquivos
+# obtidos do Project Gutenberg, que associa o índice de cada livro à
+# URL da sua versão txt.
+NOME_ARQUIVO_MAPA_URLS = 'urls_livros.json'
+
+
+def url_sítio(caminho, url_base=URL_BASE_SÍTIO):
+    """Obtém a URL de um caminho do sítio, permitindo que a coleta seja
+       direcionada a outro servidor com a mesma estrutura (por exemplo,
+       servidor_gutenberg_local.py).
+
+    Args:
+        caminho: str do caminho relativo à URL base.
+        url_base: str da URL base do sítio.
+
+    Returns:
+        str da URL absoluta.
+    """
+    return f"{url_base.rstrip('/')}/{caminho}"
+
+
+def candidatos_sítio(índice, url_base=URL_BASE_SÍTIO):
+    """Obtém as URLs candidatas da versão txt de um livro na estrutura
+       de arquivos do sítio, em ordem de preferência: o txt gerado em
+       cache/epub, presente para praticamente todos os livros, e os
+       txt originais em files (UTF-8, ASCII e Latin-1).
+
+    Args:
+        índice: str ou int do índice do livro.
+        url_base: str da URL base do sítio.
+
+    Returns:
+        Instância de list de str das URLs candidatas.
+    """
+    return ([url_sítio(f"cache/epub/{índice}/pg{índice}.txt", url_base)] +
+            [url_sítio(f"files/{índice}/{índice}{sufixo}.txt", url_base)
+             for sufixo in ('-0', '', '-8')])
+
+
+class ExtratorLinkTexto(html.parser.HTMLParser):
+    """Extrai, à medida que os blocos da página de um livro chegam, o
+       primeiro link para a versão txt, sem montar a árvore do
+       documento.
+    """
+
+    def __init__(self, url_página, codificação=None):
+        """Inicializa o extrator.
+
+        Args:
+            url_página: str ou yarl.URL da página, para resolução de
+                        links relativos.
+            codificação: str do charset da página ou None para UTF-8.
+        """
+        super().__init__(convert_charrefs=True)
+        self.url_página = str(url_página)
+        self.url_texto = None
+        self._decodificador = codecs.getincrementaldecoder(
+            codificação or 'utf-8')(errors='replace')
+
+    def handle_starttag(self, tag, atributos):
+        if tag != 'a' or self.url_texto is not None:
+            return
+        href = dict(atributos).get('href')
+        if href and '.txt' in href and '-readme' not in href:
+            self.url_texto = urllib.parse.urljoin(self.url_página, href)
+
+    def alimenta(self, bloco):
+        """Processa um bloco da página.
+
+        Args:
+            bloco: bytes do bloco recebido.
+
+        Returns:
+            str da URL absoluta da versão txt, caso já encontrada, ou
+            None.
+        """
+        self.feed(self._decodificador.decode(bloco))
+        return self.url_texto
+
+
+class MapaURLs:
+    """Associação persistida em disco entre o índice de um livro e a
+       URL da sua versão txt.
+    """
+
+    def __init__(self, diretório):
+        """Carrega o mapa armazenado em diretório, se existir.
+
+        Args:
+            diretório: pathlib.Path do diretório dos arquivos obtidos
+                       do Project Gutenberg.
+        """
+        self.caminho = diretório / NOME_ARQUIVO_MAPA_URLS
+        self.alterado = False
+        try:
+            with self.caminho.open('rt', encoding='utf-8') as arquivo:
+                self._urls = dict(json.load(arquivo))
+        except (OSError, ValueError, TypeError):
+            self._urls = {}
+
+    def __len__(self):
+        return len(self._urls)
+
+    def obtém(self, índice):
+        """Obtém a URL resolvida de um livro.
+
+        Args:
+            índice: str ou int do índice do livro.
+
+        Returns:
+            str da URL ou None caso ainda não resolvida.
+        """
+        return self._urls.get(str(índice))
+
+    def registra(self, índice, url):
+        """Registra a URL resolvida de um livro.
+
+        Args:
+            índice: str ou int do índice do livro.
+            url: str ou yarl.URL da versão txt ou None para esquecer a
+                 URL registrada.
+        """
+        índice = str(índice)
+        if url is None:
+            if self._urls.pop(índice, None) is not None:
+                self.alterado = True
+        elif self._urls.get(índice) != str(url):
+            self._urls[índice] = str(url)
+            self.alterado = True
+
+    def grava(self):
+        """Grava o mapa em disco, substituindo atomicamente o anterior,
+           caso tenha sido alterado.
+        """
+        if not self.alterado:
+            return
+        caminho_temporário = self.caminho.with_name(
+            f"{self.caminho.name}.{os.getpid()}.tmp")
+        with caminho_temporário.open('wt', encoding='utf-8') as arquivo:
+            json.dump(self._urls, arquivo, indent=2, sort_keys=True)
+        os.replace(str(caminho_temporário), str(self.caminho))
+        self.alterado = False
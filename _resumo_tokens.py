@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Resumo de tamanho limitado das sequências visíveis contíguas (tokens)
+de um livro, alternativa ao histograma exato de _vocabulário para
+execuções sobre muitos livros: somente os tokens mais frequentes e os
+tokens mais longos, que são o que a exibição utiliza, são mantidos.
+
+Os tokens mais frequentes são estimados pelo algoritmo Space-Saving
+(Metwally, Agrawal e El Abbadi, 2005), com no máximo capacidade
+contadores. Sendo N o total de ocorrências de tokens resumidas:
+
+- a estimativa de cada token do resumo nunca é menor que a sua
+  contagem real e a excede em no máximo N / capacidade (o erro de cada
+  token é armazenado);
+- todo token com mais de N / capacidade ocorrências está no resumo.
+
+A combinação de dois resumos (Agarwal et al., 2012) mantém o limite de
+erro sobre a soma dos totais. O comprimento dos tokens mais longos é
+exato e, entre os tokens desse comprimento, são mantidos no máximo
+capacidade, os menores em ordem lexicográfica.
+"""
+
+import heapq
+
+
+class ResumoTokens:
+    """Resumo Space-Saving dos tokens mais frequentes acompanhado dos
+       tokens mais longos, com memória limitada por capacidade.
+    """
+
+    __slots__ = ('capacidade', 'total', 'contagens', 'erros', '_heap',
+                 'comprimento_máximo', 'mais_longos_tokens')
+
+    def __init__(self, capacidade):
+        """Inicializa um resumo vazio.
+
+        Args:
+            capacidade: int do número máximo de tokens mantidos.
+        """
+        if capacidade < 1:
+            raise ValueError('capacidade deve ser positiva')
+        self.capacidade = capacidade
+        self.total = 0
+        self.contagens = {}
+        self.erros = {}
+        # Heap de (contagem, token) para localizar o menor contador;
+        # entradas cuja contagem não é mais a atual são descartadas ao
+        # chegar ao topo.
+        self._heap = []
+        self.comprimento_máximo = 0
+        self.mais_longos_tokens = set()
+
+    def vazio(self):
+        """Obtém um resumo vazio de mesma capacidade."""
+        return ResumoTokens(self.capacidade)
+
+    def _empilha(self, contagem, token):
+        """Registra a contagem atual de um token no heap, reconstruindo-o
+           a partir dos contadores caso as entradas descartadas o tenham
+           feito crescer demais.
+        """
+        heapq.heappush(self._heap, (contagem, token))
+        if len(self._heap) > 4 * self.capacidade:
+            self._heap = [(quantidade, chave)
+                          for chave, quantidade in self.contagens.items()]
+            heapq.heapify(self._heap)
+
+    def _menor(self):
+        """Obtém a tupla (contagem, token) do menor contador."""
+        heap = self._heap
+        while True:
+            contagem, token = heap[0]
+            if self.contagens.get(token) == contagem:
+                return contagem, token
+            heapq.heappop(heap)
+
+    def _registra_comprimento(self, token):
+        """Atualiza os tokens mais longos com um token."""
+        comprimento = len(token)
+        if comprimento < self.comprimento_máximo:
+            return
+        if comprimento > self.comprimento_máximo:
+            self.comprimento_máximo = comprimento
+            self.mais_longos_tokens = {token}
+            return
+        self.mais_longos_tokens.add(token)
+        if len(self.mais_longos_tokens) > self.capacidade:
+            self.mais_longos_tokens.remove(max(self.mais_longos_tokens))
+
+    def adiciona(self, contagens, multiplicidade=1):
+        """Resume contagens de tokens.
+
+        Args:
+            contagens: mapeamento de str para int das contagens.
+            multiplicidade: int pelo qual as contagens são
+                            multiplicadas.
+        """
+        contadores = self.contagens
+        for token, quantidade in contagens.items():
+            peso = quantidade * multiplicidade
+            if not peso:
+                continue
+            self.total += peso
+            self._registra_comprimento(token)
+            if token in contadores:
+                contadores[token] += peso
+            elif len(contadores) < self.capacidade:
+                contadores[token] = peso
+                self.erros[token] = 0
+            else:
+                # O menor contador é cedido ao novo token, cuja
+                # contagem real é de no mínimo peso e de no máximo a
+                # do token substituído mais peso.
+                mínimo, substituído = self._menor()
+                del contadores[substituído]
+                del self.erros[substituído]
+                contadores[token] = mínimo + peso
+                self.erros[token] = mínimo
+            self._empilha(contadores[token], token)
+
+    def __iadd__(self, outro):
+        if not isinstance(outro, ResumoTokens):
+            return NotImplemented
+
+        # Um token ausente de um resumo cheio tem, nele, no máximo a
+        # contagem do menor contador.
+        piso = (self._menor()[0]
+                if len(self.contagens) >= self.capacidade else 0)
+        piso_outro = (outro._menor()[0]
+                      if len(outro.contagens) >= outro.capacidade else 0)
+        combinados = []
+        for token in self.contagens.keys() | outro.contagens.keys():
+            combinados.append((
+                self.contagens.get(token, piso) +
+                outro.contagens.get(token, piso_outro),
+                self.erros.get(token, piso) +
+                outro.erros.get(token, piso_outro),
+                token))
+        mantidos = heapq.nlargest(self.capacidade, combinados)
+        self.contagens = {token: contagem
+                          for contagem, _, token in mantidos}
+        self.erros = {token: erro for _, erro, token in mantidos}
+        self._heap = [(contagem, token) for contagem, _, token in mantidos]
+        heapq.heapify(self._heap)
+        self.total += outro.total
+
+        for token in outro.mais_longos_tokens:
+            self._registra_comprimento(token)
+        return self
+
+    def erro_máximo(self):
+        """Obtém o maior erro das estimativas do resumo.
+
+        Returns:
+            int do quanto uma estimativa pode exceder a contagem real,
+            no máximo total / capacidade.
+        """
+        return max(self.erros.values(), default=0)
+
+    def mais_frequentes(self):
+        """Obtém os tokens de maior contagem estimada.
+
+        Returns:
+            Tupla (int da contagem estimada, set dos tokens), (0, set())
+            caso o resumo esteja vazio.
+        """
+        maior = max(self.contagens.values(), default=0)
+        return maior, {token for token, quantidade in self.contagens.items()
+                       if maior and quantidade == maior}
+
+    def mais_longos(self):
+        """Obtém os tokens mais longos.
+
+        Returns:
+            Tupla (int do comprimento, set dos tokens), (0, set()) caso
+            o resumo esteja vazio.
+        """
+        return self.comprimento_máximo, set(self.mais_longos_tokens)
+
+    def __len__(self):
+        return len(self.contagens)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, ResumoTokens):
+            return NotImplemented
+        return (self.capacidade == outro.capacidade and
+                self.total == outro.total and
+                self.contagens == outro.contagens and
+                self.erros == outro.erros and
+                self.comprimento_máximo == outro.comprimento_máximo and
+                self.mais_longos_tokens == outro.mais_longos_tokens)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({len(self)} de {self.capacidade} "
+                f"tokens, erro máximo {self.erro_máximo()})")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Transporte dos livros para os processos que os processam e analisam:
+o texto é colocado uma única vez em um segmento de memória
+compartilhada, de forma que somente o nome do segmento seja serializado,
+e as estatísticas voltam empacotadas em arrays em vez de dicts.
+"""
+
+from array import array
+import os
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+from _estatísticas import (
+    CAMPOS_CONTAGEM,
+    CAMPOS_HISTOGRAMA,
+    Estatísticas,
+    HistogramaCaracteres,
+)
+from _resumo_tokens import ResumoTokens
+from _vocabulário import HistogramaTokens
+
+
+# CAMPOS_TOKENS são os campos de CAMPOS_HISTOGRAMA cujos histogramas
+# são instâncias de HistogramaTokens.
+CAMPOS_TOKENS = frozenset({'sequências', 'sequências_insensíveis'})
+
+# SEPARADOR une as chaves de um histograma em uma única str: como as
+# chaves são formadas somente por caracteres visíveis, nunca o contêm.
+SEPARADOR = '\n'
+
+
+def _abre_segmento(nome):
+    """Abre um segmento existente sem registrá-lo para remoção no
+       processo que apenas o lê, quando possível (Python 3.13): somente
+       o processo que o criou o remove. Nas versões anteriores, o
+       registro é feito no rastreador de recursos compartilhado com o
+       processo que o criou (ver TransporteLivros), sem efeito.
+
+    Args:
+        nome: str do nome do segmento.
+
+    Returns:
+        Instância de shared_memory.SharedMemory.
+    """
+    try:
+        return shared_memory.SharedMemory(name=nome, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=nome)
+
+
+class TextoCompartilhado:
+    """Referência, serializável com pickle, ao texto de um livro
+       armazenado em um segmento de memória compartilhada.
+    """
+
+    __slots__ = ('nome', 'tamanho', 'codificação')
+
+    def __init__(self, nome, tamanho, codificação):
+        """Inicializa a referência.
+
+        Args:
+            nome: str do nome do segmento.
+            tamanho: int do tamanho, em bytes, do texto no segmento.
+            codificação: str da codificação do texto no segmento.
+        """
+        self.nome = nome
+        self.tamanho = tamanho
+        self.codificação = codificação
+
+    def lê(self):
+        """Decodifica o texto diretamente do segmento.
+
+        Returns:
+            str do texto do livro.
+        """
+        segmento = _abre_segmento(self.nome)
+        try:
+            with segmento.buf[:self.tamanho] as visão:
+                return str(visão, self.codificação)
+        finally:
+            segmento.close()
+
+
+class TransporteLivros:
+    """Publica os textos dos livros a serem enviados aos processos e
+       libera os segmentos de memória compartilhada ao final. Caso a
+       memória compartilhada não esteja disponível (Python anterior ao
+       3.8) ou não seja solicitada, os textos são enviados como str.
+
+    Note que a instância deve ser criada antes dos processos que
+    receberão os textos.
+    """
+
+    def __init__(self, memória_compartilhada=True):
+        """Inicializa o transporte.
+
+        Args:
+            memória_compartilhada: bool indicando se os textos devem
+                                   ser colocados em memória
+                                   compartilhada.
+        """
+        self.memória_compartilhada = (memória_compartilhada and
+                                      shared_memory is not None)
+        self._segmentos = []
+
+        # Os processos criados a partir de agora compartilham o
+        # rastreador de recursos deste processo: caso cada um iniciasse
+        # o seu, os segmentos abertos seriam removidos ao seu término.
+        if self.memória_compartilhada and os.name == 'posix':
+            resource_tracker.ensure_running()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.libera()
+
+    def publica(self, texto):
+        """Obtém a referência a ser enviada a um processo no lugar do
+           texto de um livro.
+
+        Args:
+            texto: str do texto do livro.
+
+        Returns:
+            Instância de TextoCompartilhado ou o próprio texto, caso
+            a memória compartilhada não seja utilizada.
+        """
+        if not self.memória_compartilhada:
+            return texto
+        # Textos somente com caracteres até U+00FF, a maioria dos
+        # livros, são copiados byte a byte em Latin-1, mais rápido que
+        # a codificação em UTF-8 feita por pickle.
+        codificação = 'latin-1'
+        try:
+            dados = texto.encode(codificação)
+        except UnicodeEncodeError:
+            codificação = 'utf-8'
+            dados = texto.encode(codificação)
+        # Segmentos de tamanho 0 não são permitidos.
+        segmento = shared_memory.SharedMemory(create=True,
+                                              size=max(len(dados), 1))
+        self._segmentos.append(segmento)
+        segmento.buf[:len(dados)] = dados
+        return TextoCompartilhado(segmento.name, len(dados), codificação)
+
+    def libera(self):
+        """Fecha e remove todos os segmentos publicados."""
+        while self._segmentos:
+            segmento = self._segmentos.pop()
+            segmento.close()
+            segmento.unlink()
+
+
+def obtém_texto(referência):
+    """Obtém, no processo de destino, o texto de um livro publicado.
+
+    Args:
+        referência: valor devolvido por TransporteLivros.publica.
+
+    Returns:
+        str do texto do livro.
+    """
+    if isinstance(referência, TextoCompartilhado):
+        return referência.lê()
+    return referência
+
+
+def empacota_estatísticas(estatísticas):
+    """Empacota as estatísticas de um livro para o retorno ao processo
+       principal: as contagens em um array('Q') e cada histograma em
+       uma str com as chaves unidas por SEPARADOR e um array('Q') com
+       os valores na mesma ordem, evitando serializar um objeto por
+       chave e valor. Resumos de tokens (ver _resumo_tokens), de
+       tamanho limitado, são enviados como estão.
+
+    Args:
+        estatísticas: instância de Estatísticas de um livro, como
+                      devolvida por analisa_livro.
+
+    Returns:
+        Tupla (contagens, histogramas) ou None caso não haja
+        estatísticas.
+    """
+    if not estatísticas:
+        return None
+    contagens = array('Q', (getattr(estatísticas, campo)
+                            for campo in CAMPOS_CONTAGEM))
+    histogramas = tuple(
+        histograma if isinstance(histograma, ResumoTokens) else
+        (SEPARADOR.join(histograma), array('Q', histograma.values()))
+        for histograma in (getattr(estatísticas, campo)
+                           for campo in CAMPOS_HISTOGRAMA))
+    return contagens, histogramas
+
+
+def desempacota_estatísticas(pacote):
+    """Reconstrói as estatísticas de um livro empacotadas por
+       empacota_estatísticas.
+
+    Args:
+        pacote: valor devolvido por empacota_estatísticas.
+
+    Returns:
+        Instância de Estatísticas do livro, vazia caso não haja
+        estatísticas.
+    """
+    if pacote is None:
+        return Estatísticas()
+    contagens, histogramas = pacote
+    campos = dict(zip(CAMPOS_CONTAGEM, contagens))
+    for campo, empacotado in zip(CAMPOS_HISTOGRAMA, histogramas):
+        if isinstance(empacotado, ResumoTokens):
+            campos[campo] = empacotado
+            continue
+        chaves, valores = empacotado
+        chaves = chaves.split(SEPARADOR) if chaves else ()
+        if campo in CAMPOS_TOKENS:
+            campos[campo] = HistogramaTokens()
+            campos[campo].adiciona_pares(chaves, valores)
+        else:
+            campos[campo] = HistogramaCaracteres(dict(zip(chaves, valores)))
+    return Estatísticas(**campos)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Varredura em passada única do arquivo de índices GUTINDEX.ALL do
+Project Gutenberg.
+"""
+
+import re
+
+
+# NOME_AUTOR_ÍNDICE é uma expressão regular (regex) ingênua para
+# obter dados de linhas do tipo:
+# 'Nome do Livro, by Nome do Autor                                 42'
+# como ('Nome do Livro', 'Nome do Autor', '42')
+# Observação: essa regex é ingênua pois existem livros com nome de
+#             mais de uma linha; sem autor; múltiplos autores
+#             (geralmente não cabe na mesma linha nesse caso); etc.
+NOME_AUTOR_ÍNDICE = re.compile(r'^(\S+.*?),\s+by\s+(\S.*?)\s+([0-9]+)\s*$')
+
+# NOME_AUTOR_ÍNDICE_MULTILINHA é a versão multilinha da regex
+# NOME_AUTOR_ÍNDICE, para ser aplicada sobre o texto inteiro do índice
+# de uma só vez. Para manter a equivalência com a aplicação linha a
+# linha, os espaços são restritos a [^\S\n], ou seja, nenhum casamento
+# atravessa uma quebra de linha.
+NOME_AUTOR_ÍNDICE_MULTILINHA = re.compile(
+    r'^(\S+.*?),[^\S\n]+by[^\S\n]+(\S.*?)[^\S\n]+([0-9]+)[^\S\n]*$',
+    re.MULTILINE)
+
+
+def varre_índice(texto_índice):
+    """Percorre uma única vez o texto do índice do Project Gutenberg
+       extraindo nome do livro, autor do livro e índice de cada linha
+       que case com NOME_AUTOR_ÍNDICE_MULTILINHA.
+
+    Args:
+        texto_índice: str do conteúdo de GUTINDEX.ALL.
+
+    Yields:
+        Tuplas (nome do livro, nome do autor, índice), na ordem em que
+        aparecem no texto.
+    """
+    for casamento in NOME_AUTOR_ÍNDICE_MULTILINHA.finditer(texto_índice):
+        yield casamento.groups()
+
+
+def filtra_autores(texto_índice, autores):
+    """Obtém as tuplas do índice cujo autor esteja em autores.
+
+    Tuplas repetidas são consideradas somente uma vez, mantendo a
+    ordem da primeira ocorrência.
+
+    Args:
+        texto_índice: str do conteúdo de GUTINDEX.ALL.
+        autores: conjunto com os nomes dos autores buscados.
+
+    Returns:
+        Instância de list de tuplas (nome do livro, nome do autor,
+        índice).
+    """
+    return list(dict.fromkeys(tupla
+                              for tupla in varre_índice(texto_índice)
+                              if tupla[1] in autores))
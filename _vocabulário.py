@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Vocabulário de sequências visíveis contíguas (tokens): cada token é
+armazenado uma única vez por processo e associado a um id inteiro, e
+os histogramas de tokens são contagens indexadas por esses ids. A forma
+str de um token só é recuperada ao percorrer o histograma, por exemplo
+para exibição.
+
+O histograma de cada livro é esparso, com os ids presentes ordenados e
+suas contagens, de forma que ocupe memória proporcional aos seus
+próprios tokens distintos, e não ao vocabulário de todos os livros do
+processo; somente as somas de vários livros, como os totais de cada
+autor e de todos os livros, são vetores densos indexados pelos ids.
+"""
+
+from array import array
+import bisect
+import collections.abc
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# TIPO_CONTAGEM é o typecode do array de contagens de um histograma:
+# inteiros sem sinal de 4 bytes.
+TIPO_CONTAGEM = 'I'
+
+# _MÍNIMO_VETORIZADO é o número mínimo de tokens somados de uma vez
+# por NumPy, caso disponível: abaixo dele, como nas contagens de cada
+# linha, o custo de criar os arrays supera o ganho.
+_MÍNIMO_VETORIZADO = 256
+
+# _MÍNIMO_PENDENTES é o número mínimo de contagens avulsas, como as de
+# cada linha, acumuladas em um dict antes de serem mescladas aos arrays
+# de um histograma esparso; acima dele, as contagens são mescladas
+# quando excedem o número de ids do histograma, de forma que cada
+# mescla custe proporcionalmente às contagens acumuladas.
+_MÍNIMO_PENDENTES = 1024
+
+
+class Vocabulário:
+    """Associação entre tokens e ids inteiros sequenciais."""
+
+    __slots__ = ('_ids', '_tokens', '_comprimentos')
+
+    def __init__(self):
+        """Inicializa um vocabulário vazio."""
+        self._ids = {}
+        self._tokens = []
+        self._comprimentos = array(TIPO_CONTAGEM)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def interna(self, token):
+        """Obtém o id de um token, registrando-o caso ainda não exista.
+
+        Args:
+            token: str do token.
+
+        Returns:
+            int do id do token.
+        """
+        índice = self._ids.get(token)
+        if índice is None:
+            índice = len(self._tokens)
+            self._ids[token] = índice
+            self._tokens.append(token)
+            self._comprimentos.append(len(token))
+        return índice
+
+    def interna_todos(self, tokens):
+        """Obtém os ids de vários tokens, registrando os que ainda não
+           existam: os ids dos tokens já registrados, a maioria ao
+           reconstruir histogramas (ver _transporte), são obtidos sem
+           percorrer os tokens em Python.
+
+        Args:
+            tokens: coleção de str dos tokens, percorrida até duas
+                    vezes.
+
+        Returns:
+            Instância de list de int dos ids, na ordem de tokens.
+        """
+        ids = list(map(self._ids.get, tokens))
+        if None in ids:
+            interna = self.interna
+            ids = [interna(token) if índice is None else índice
+                   for token, índice in zip(tokens, ids)]
+        return ids
+
+    def id(self, token):
+        """Obtém o id de um token sem registrá-lo.
+
+        Args:
+            token: str do token.
+
+        Returns:
+            int do id do token ou None caso não registrado.
+        """
+        return self._ids.get(token)
+
+    def token(self, índice):
+        """Obtém o token de um id.
+
+        Args:
+            índice: int do id.
+
+        Returns:
+            str do token.
+        """
+        return self._tokens[índice]
+
+    def comprimentos(self):
+        """Obtém os comprimentos dos tokens.
+
+        Returns:
+            array de int do comprimento de cada token, indexado pelos
+            ids.
+        """
+        return self._comprimentos
+
+
+# VOCABULÁRIO é o vocabulário compartilhado pelos histogramas do
+# processo.
+VOCABULÁRIO = Vocabulário()
+
+
+def _combina_maiores(primeiro, segundo):
+    """Combina duas tuplas (maior valor, set dos ids de maior valor).
+
+    Args:
+        primeiro: tupla (int, set de int).
+        segundo: tupla (int, set de int).
+
+    Returns:
+        Tupla (int, set de int) do maior valor e dos ids com esse valor
+        em algum dos dois.
+    """
+    valor, ids = primeiro
+    valor_segundo, ids_segundo = segundo
+    if valor_segundo > valor:
+        return segundo
+    if valor_segundo == valor:
+        return valor, ids | ids_segundo
+    return primeiro
+
+
+class HistogramaTokens(collections.abc.Mapping):
+    """Histograma de tokens sobre os ids do vocabulário, com a interface
+       de um mapeamento somente leitura de str para int (tokens com
+       contagem zero não fazem parte do mapeamento).
+
+    Um histograma esparso, como o de cada livro, guarda um array
+    ordenado dos ids presentes e um array das contagens na mesma ordem;
+    as contagens avulsas, como as de cada linha, são acumuladas em um
+    dict e mescladas aos arrays em lotes. Um histograma denso, como a
+    soma de vários livros (ver __add__ e vazio), guarda um array de
+    contagens indexado pelos próprios ids.
+
+    Os ids dos tokens de maior contagem e dos tokens de maior
+    comprimento são guardados, de forma que o histograma não seja
+    percorrido a cada exibição: a soma de contagens avulsas, como as de
+    cada linha, e de outros histogramas a um histograma esparso somente
+    os invalida, e são calculados novamente quando solicitados; a soma
+    de outro HistogramaTokens a um histograma denso os atualiza.
+
+    Ao ser serializado com pickle, o histograma é convertido para os
+    pares (token, contagem), de forma que seja reconstruído, esparso,
+    sobre o vocabulário do processo de destino.
+    """
+
+    __slots__ = ('vocabulário', 'contagens', 'ids', '_pendentes',
+                 '_máximos')
+
+    def __init__(self, contagens=None, vocabulário=None, denso=False):
+        """Inicializa o histograma.
+
+        Args:
+            contagens: mapeamento de str para int das contagens
+                       iniciais ou None.
+            vocabulário: instância de Vocabulário ou None para
+                         VOCABULÁRIO.
+            denso: bool indicando um histograma denso, para somas de
+                   vários livros, em vez de esparso.
+        """
+        self.vocabulário = (VOCABULÁRIO if vocabulário is None
+                            else vocabulário)
+        self.contagens = array(TIPO_CONTAGEM)
+        # array ordenado dos ids presentes, no histograma esparso, ou
+        # None, no histograma denso.
+        self.ids = None if denso else array(TIPO_CONTAGEM)
+        # dict de id para as contagens ainda não mescladas aos arrays do
+        # histograma esparso.
+        self._pendentes = {}
+        # Tupla ((maior contagem, set dos ids de maior contagem),
+        # (maior comprimento, set dos ids de maior comprimento)) ou None
+        # caso deva ser calculada.
+        self._máximos = (0, set()), (0, set())
+        if contagens:
+            self.adiciona(contagens)
+
+    @property
+    def denso(self):
+        """bool indicando se o histograma é denso."""
+        return self.ids is None
+
+    def _estende(self, tamanho):
+        """Estende o array de contagens do histograma denso com zeros
+           até tamanho.
+        """
+        faltantes = tamanho - len(self.contagens)
+        if faltantes > 0:
+            self.contagens.frombytes(
+                bytes(faltantes * self.contagens.itemsize))
+
+    def _mescla(self, ids, quantidades):
+        """Mescla contagens aos arrays do histograma esparso.
+
+        Args:
+            ids: coleção de int de ids distintos.
+            quantidades: coleção de int das contagens, na ordem de ids.
+        """
+        if numpy is not None and len(ids) >= _MÍNIMO_VETORIZADO:
+            # Concatenados aos ids presentes, cada id aparece no máximo
+            # duas vezes: as contagens de cada id são somadas sobre os
+            # ids únicos, já ordenados.
+            todos_ids = numpy.concatenate((
+                numpy.frombuffer(self.ids, dtype=numpy.uintc),
+                numpy.fromiter(ids, dtype=numpy.uintc, count=len(ids))))
+            todas_quantidades = numpy.concatenate((
+                numpy.frombuffer(self.contagens, dtype=numpy.uintc),
+                numpy.fromiter(quantidades, dtype=numpy.uintc,
+                               count=len(ids))))
+            únicos, posições = numpy.unique(todos_ids, return_inverse=True)
+            somas = numpy.zeros(len(únicos), dtype=numpy.uintc)
+            numpy.add.at(somas, posições, todas_quantidades)
+            self.ids = array(TIPO_CONTAGEM, únicos.astype(
+                numpy.uintc).tobytes())
+            self.contagens = array(TIPO_CONTAGEM, somas.tobytes())
+            return
+
+        somas = dict(zip(self.ids, self.contagens))
+        for índice, quantidade in zip(ids, quantidades):
+            somas[índice] = somas.get(índice, 0) + quantidade
+        ordenados = sorted(somas)
+        self.ids = array(TIPO_CONTAGEM, ordenados)
+        self.contagens = array(TIPO_CONTAGEM, map(somas.__getitem__,
+                                                   ordenados))
+
+    def _consolida(self):
+        """Mescla as contagens pendentes aos arrays do histograma
+           esparso.
+        """
+        if self._pendentes:
+            pendentes = self._pendentes
+            self._pendentes = {}
+            self._mescla(list(pendentes), list(pendentes.values()))
+
+    def _pares(self):
+        """Obtém os ids e as contagens não nulas do histograma.
+
+        Returns:
+            Tupla (sequência de int dos ids em ordem crescente,
+            sequência de int das contagens na mesma ordem).
+        """
+        if not self.denso:
+            self._consolida()
+            if not self.contagens.count(0):
+                return self.ids, self.contagens
+            presentes = [posição for posição, quantidade
+                         in enumerate(self.contagens) if quantidade]
+            return ([self.ids[posição] for posição in presentes],
+                    [self.contagens[posição] for posição in presentes])
+        if numpy is not None:
+            vetor = numpy.frombuffer(self.contagens, dtype=numpy.uintc)
+            ids = numpy.flatnonzero(vetor)
+            return ids.tolist(), vetor[ids].tolist()
+        ids = [índice for índice, quantidade in enumerate(self.contagens)
+               if quantidade]
+        return ids, [self.contagens[índice] for índice in ids]
+
+    def adiciona(self, contagens, multiplicidade=1):
+        """Soma contagens de tokens ao histograma.
+
+        Args:
+            contagens: mapeamento de str para int das contagens.
+            multiplicidade: int pelo qual as contagens são
+                            multiplicadas.
+        """
+        self.adiciona_pares(contagens, contagens.values(), multiplicidade)
+
+    def adiciona_pares(self, tokens, quantidades, multiplicidade=1):
+        """Soma contagens de tokens ao histograma, dadas separadamente,
+           como ao reconstruir histogramas empacotados (ver
+           _transporte), sem montar um mapeamento intermediário.
+
+        Args:
+            tokens: coleção de str de tokens distintos.
+            quantidades: coleção de int das contagens, na ordem de
+                         tokens.
+            multiplicidade: int pelo qual as contagens são
+                            multiplicadas.
+        """
+        ids = self.vocabulário.interna_todos(tokens)
+        if not ids:
+            return
+        self._máximos = None
+        if not self.denso:
+            if len(ids) >= _MÍNIMO_VETORIZADO:
+                if multiplicidade != 1:
+                    quantidades = [quantidade * multiplicidade
+                                   for quantidade in quantidades]
+                self._consolida()
+                self._mescla(ids, quantidades)
+                return
+            pendentes = self._pendentes
+            for índice, quantidade in zip(ids, quantidades):
+                pendentes[índice] = (pendentes.get(índice, 0) +
+                                     quantidade * multiplicidade)
+            if len(pendentes) > max(_MÍNIMO_PENDENTES, len(self.ids)):
+                self._consolida()
+            return
+
+        self._estende(len(self.vocabulário))
+        if numpy is not None and len(ids) >= _MÍNIMO_VETORIZADO:
+            # Os ids de tokens distintos são distintos: a soma indexada
+            # equivale à soma posição a posição.
+            vetor = numpy.frombuffer(self.contagens, dtype=numpy.uintc)
+            vetor[ids] += numpy.fromiter(
+                quantidades, dtype=numpy.uintc,
+                count=len(ids)) * numpy.uintc(multiplicidade)
+        else:
+            vetor = self.contagens
+            for índice, quantidade in zip(ids, quantidades):
+                vetor[índice] += quantidade * multiplicidade
+
+    def _calcula_máximos(self):
+        """Calcula os ids dos tokens de maior contagem e de maior
+           comprimento, percorrendo as contagens.
+
+        Returns:
+            Tupla no formato de _máximos.
+        """
+        if self.denso:
+            ids, contagens = None, self.contagens
+        else:
+            self._consolida()
+            ids, contagens = self.ids, self.contagens
+        maior = max(contagens, default=0)
+        if not maior:
+            return (0, set()), (0, set())
+        comprimentos = self.vocabulário.comprimentos()
+        if numpy is not None:
+            vetor = numpy.frombuffer(contagens, dtype=numpy.uintc)
+            índices = (numpy.arange(len(vetor)) if ids is None else
+                       numpy.frombuffer(ids, dtype=numpy.uintc))
+            mais_frequentes = índices[vetor == maior]
+            presentes = vetor != 0
+            comprimentos = numpy.frombuffer(
+                comprimentos, dtype=numpy.uintc)[índices]
+            comprimento_máximo = int(comprimentos[presentes].max())
+            mais_longos = índices[
+                presentes & (comprimentos == comprimento_máximo)]
+            return ((maior, set(mais_frequentes.tolist())),
+                    (comprimento_máximo, set(mais_longos.tolist())))
+
+        if ids is None:
+            ids = range(len(contagens))
+        mais_frequentes = {índice
+                           for índice, quantidade in zip(ids, contagens)
+                           if quantidade == maior}
+        presentes = [índice for índice, quantidade in zip(ids, contagens)
+                     if quantidade]
+        comprimento_máximo = max(comprimentos[índice]
+                                 for índice in presentes)
+        mais_longos = {índice for índice in presentes
+                       if comprimentos[índice] == comprimento_máximo}
+        return (maior, mais_frequentes), (comprimento_máximo, mais_longos)
+
+    def _obtém_máximos(self):
+        """Obtém _máximos, calculando-os caso tenham sido invalidados."""
+        if self._máximos is None:
+            self._máximos = self._calcula_máximos()
+        return self._máximos
+
+    def __iadd__(self, outro):
+        if not isinstance(outro, HistogramaTokens):
+            return NotImplemented
+        if outro.vocabulário is not self.vocabulário:
+            self.adiciona(outro)
+            return self
+
+        if not self.denso:
+            # Sobre o mesmo vocabulário, a soma a um histograma esparso
+            # é uma mescla dos ids presentes.
+            ids, quantidades = outro._pares()
+            if len(ids):
+                self._consolida()
+                self._mescla(ids, quantidades)
+                self._máximos = None
+            return self
+
+        # Sobre o mesmo vocabulário, a soma a um histograma denso é uma
+        # soma de vetores, nas posições dos ids presentes em outro
+        # caso seja esparso.
+        if outro.denso:
+            self._estende(len(outro.contagens))
+            quantidade_somada = len(outro.contagens)
+            if numpy is not None and outro.contagens:
+                vetor = numpy.frombuffer(self.contagens, dtype=numpy.uintc)
+                somados = vetor[:quantidade_somada]
+                somados += numpy.frombuffer(outro.contagens,
+                                            dtype=numpy.uintc)
+            else:
+                vetor = self.contagens
+                for índice, quantidade in enumerate(outro.contagens):
+                    if quantidade:
+                        vetor[índice] += quantidade
+                somados = self.contagens[:quantidade_somada]
+            posições = None
+        else:
+            ids, quantidades = outro._pares()
+            if len(ids):
+                self._estende(ids[-1] + 1)
+            if numpy is not None and len(ids):
+                vetor = numpy.frombuffer(self.contagens, dtype=numpy.uintc)
+                posições = numpy.asarray(ids, dtype=numpy.intp)
+                vetor[posições] += numpy.asarray(quantidades,
+                                                 dtype=numpy.uintc)
+                somados = vetor[posições]
+            else:
+                vetor = self.contagens
+                for índice, quantidade in zip(ids, quantidades):
+                    vetor[índice] += quantidade
+                posições = ids
+                somados = [vetor[índice] for índice in ids]
+        if self._máximos is None:
+            return self
+
+        # Como as contagens só aumentam, a maior contagem da soma está
+        # entre a anterior e as das posições somadas, e os tokens mais
+        # longos, entre os de cada histograma.
+        mais_frequentes, mais_longos = self._máximos
+        if numpy is not None and len(somados):
+            somados = numpy.asarray(somados)
+            maior = int(somados.max())
+            maiores = numpy.flatnonzero(somados == maior)
+            if posições is not None:
+                maiores = numpy.asarray(posições)[maiores]
+            somados_maiores = (maior, set(maiores.tolist()))
+        else:
+            maior = max(somados, default=0)
+            if posições is None:
+                posições = range(len(somados))
+            somados_maiores = (maior, {
+                índice for índice, quantidade in zip(posições, somados)
+                if quantidade == maior})
+        if maior:
+            mais_frequentes = _combina_maiores(mais_frequentes,
+                                               somados_maiores)
+        _, mais_longos_outro = outro._obtém_máximos()
+        self._máximos = (mais_frequentes,
+                         _combina_maiores(mais_longos, mais_longos_outro))
+        return self
+
+    def __add__(self, outro):
+        if not isinstance(outro, HistogramaTokens):
+            return NotImplemented
+        soma = self.vazio()
+        if self.denso:
+            soma.contagens = array(TIPO_CONTAGEM, self.contagens)
+            soma._máximos = self._máximos
+        else:
+            soma += self
+        soma += outro
+        return soma
+
+    def vazio(self):
+        """Obtém um histograma denso vazio sobre o mesmo vocabulário,
+           para a soma de vários histogramas (ver
+           Estatísticas.__add__).
+        """
+        return HistogramaTokens(vocabulário=self.vocabulário, denso=True)
+
+    def mais_frequentes(self):
+        """Obtém os tokens de maior contagem.
+
+        Returns:
+            Tupla (int da contagem, set dos tokens), (0, set()) caso o
+            histograma esteja vazio.
+        """
+        (maior, ids), _ = self._obtém_máximos()
+        token = self.vocabulário.token
+        return maior, {token(índice) for índice in ids}
+
+    def mais_longos(self):
+        """Obtém os tokens de maior comprimento.
+
+        Returns:
+            Tupla (int do comprimento, set dos tokens), (0, set()) caso
+            o histograma esteja vazio.
+        """
+        _, (comprimento_máximo, ids) = self._obtém_máximos()
+        token = self.vocabulário.token
+        return comprimento_máximo, {token(índice) for índice in ids}
+
+    def __getitem__(self, token):
+        índice = self.vocabulário.id(token)
+        if índice is None:
+            raise KeyError(token)
+        if self.denso:
+            quantidade = (self.contagens[índice]
+                          if índice < len(self.contagens) else 0)
+        else:
+            self._consolida()
+            posição = bisect.bisect_left(self.ids, índice)
+            quantidade = (self.contagens[posição]
+                          if posição < len(self.ids) and
+                          self.ids[posição] == índice else 0)
+        if not quantidade:
+            raise KeyError(token)
+        return quantidade
+
+    def __iter__(self):
+        token = self.vocabulário.token
+        ids, _ = self._pares()
+        for índice in ids:
+            yield token(índice)
+
+    def __len__(self):
+        if not self.denso:
+            self._consolida()
+        return len(self.contagens) - self.contagens.count(0)
+
+    def __reduce__(self):
+        return HistogramaTokens, (dict(self.items()), )
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} tokens)"
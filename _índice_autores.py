@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Índice auxiliar persistente (autor → livros) do arquivo GUTINDEX.ALL
+do Project Gutenberg.
+"""
+
+import hashlib
+import os
+import sqlite3
+
+from _varredura_índice import varre_índice
+
+
+# SUFIXO_ÍNDICE_AUTORES é o sufixo do arquivo auxiliar armazenado ao
+# lado do arquivo de índices bruto.
+SUFIXO_ÍNDICE_AUTORES = '.autores.sqlite3'
+
+# _TAMANHO_BLOCO_HASH é o tamanho, em bytes, dos blocos lidos para
+# calcular o hash do arquivo de índices.
+_TAMANHO_BLOCO_HASH = 2**20
+
+
+def caminho_índice_autores(caminho_arquivo_índice):
+    """Obtém o caminho do índice auxiliar de um arquivo de índices.
+
+    Args:
+        caminho_arquivo_índice: pathlib.Path do arquivo GUTINDEX.ALL.
+
+    Returns:
+        Instância de pathlib.Path do índice auxiliar.
+    """
+    return caminho_arquivo_índice.with_name(
+        caminho_arquivo_índice.name + SUFIXO_ÍNDICE_AUTORES)
+
+
+def _calcula_sha256(caminho_arquivo):
+    """Calcula o hash SHA-256 do conteúdo de um arquivo.
+
+    Args:
+        caminho_arquivo: pathlib.Path do arquivo.
+
+    Returns:
+        str com o hash em hexadecimal.
+    """
+    sha256 = hashlib.sha256()
+    with caminho_arquivo.open('rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(_TAMANHO_BLOCO_HASH), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def _valida(conexão, caminho_arquivo_índice):
+    """Verifica se o índice auxiliar corresponde ao arquivo de índices.
+
+    Tamanho e instante de modificação iguais validam o índice auxiliar
+    diretamente. Caso somente o instante de modificação seja diferente,
+    o hash do conteúdo é comparado e, se igual, o instante registrado é
+    atualizado.
+
+    Args:
+        conexão: sqlite3.Connection do índice auxiliar.
+        caminho_arquivo_índice: pathlib.Path do arquivo GUTINDEX.ALL.
+
+    Returns:
+        True caso o índice auxiliar seja válido, False caso contrário.
+    """
+    registro = conexão.execute(
+        'SELECT tamanho, mtime_ns, sha256 FROM metadados').fetchone()
+    if not registro:
+        return False
+    tamanho, mtime_ns, sha256 = registro
+
+    estado = caminho_arquivo_índice.stat()
+    if estado.st_size != tamanho:
+        return False
+    if estado.st_mtime_ns == mtime_ns:
+        return True
+    if _calcula_sha256(caminho_arquivo_índice) != sha256:
+        return False
+
+    with conexão:
+        conexão.execute('UPDATE metadados SET mtime_ns = ?',
+                        (estado.st_mtime_ns, ))
+    return True
+
+
+def busca_livros_autores(caminho_arquivo_índice, autores):
+    """Consulta o índice auxiliar pelos livros dos autores solicitados.
+
+    Args:
+        caminho_arquivo_índice: pathlib.Path do arquivo GUTINDEX.ALL.
+        autores: conjunto com os nomes dos autores buscados.
+
+    Returns:
+        Instância de list de tuplas (nome do livro, nome do autor,
+        índice) na ordem do arquivo de índices ou None caso o índice
+        auxiliar não exista ou esteja desatualizado.
+    """
+    caminho_auxiliar = caminho_índice_autores(caminho_arquivo_índice)
+    if not (caminho_auxiliar.is_file() and caminho_arquivo_índice.is_file()):
+        return None
+
+    autores = list(autores)
+    try:
+        conexão = sqlite3.connect(str(caminho_auxiliar))
+    except sqlite3.Error:
+        return None
+    try:
+        if not _valida(conexão, caminho_arquivo_índice):
+            return None
+        marcadores = ', '.join('?' for _ in autores)
+        return [tuple(registro)
+                for registro in conexão.execute(
+                    f'SELECT titulo, autor, indice FROM livros '
+                    f'WHERE autor IN ({marcadores}) ORDER BY posicao',
+                    autores)]
+    except sqlite3.Error:
+        return None
+    finally:
+        conexão.close()
+
+
+def grava_índice_autores(caminho_arquivo_índice, texto_índice):
+    """Gera o índice auxiliar a partir do texto do arquivo de índices.
+
+    O índice auxiliar é gerado num arquivo temporário e renomeado ao
+    final, de forma que leitores concorrentes nunca vejam um arquivo
+    parcial.
+
+    Args:
+        caminho_arquivo_índice: pathlib.Path do arquivo GUTINDEX.ALL já
+                                armazenado.
+        texto_índice: str do conteúdo de GUTINDEX.ALL.
+    """
+    caminho_auxiliar = caminho_índice_autores(caminho_arquivo_índice)
+    caminho_temporário = caminho_auxiliar.with_name(
+        f"{caminho_auxiliar.name}.{os.getpid()}.tmp")
+
+    estado = caminho_arquivo_índice.stat()
+    sha256 = _calcula_sha256(caminho_arquivo_índice)
+
+    if caminho_temporário.exists():
+        caminho_temporário.unlink()
+    conexão = sqlite3.connect(str(caminho_temporário))
+    try:
+        with conexão:
+            conexão.execute('CREATE TABLE metadados '
+                            '(tamanho INTEGER, mtime_ns INTEGER, sha256 TEXT)')
+            conexão.execute('INSERT INTO metadados VALUES (?, ?, ?)',
+                            (estado.st_size, estado.st_mtime_ns, sha256))
+            conexão.execute('CREATE TABLE livros '
+                            '(posicao INTEGER PRIMARY KEY, autor TEXT, '
+                            'titulo TEXT, indice TEXT)')
+            conexão.executemany(
+                'INSERT INTO livros VALUES (?, ?, ?, ?)',
+                ((posição, nome_autor, nome_livro, índice)
+                 for posição, (nome_livro, nome_autor, índice)
+                 in enumerate(dict.fromkeys(varre_índice(texto_índice)))))
+            conexão.execute('CREATE INDEX livros_autor ON livros (autor)')
+    finally:
+        conexão.close()
+
+    os.replace(str(caminho_temporário), str(caminho_auxiliar))
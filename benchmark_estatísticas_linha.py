@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Comparação da vazão, por linha e por livro, entre o cálculo anterior
+das estatísticas de linha (re.findall e list.count por chave distinta)
+e o cálculo em passada linear de _estatísticas_linha, sobre os livros
+armazenados pelos scripts de estatísticas.
+"""
+
+import argparse
+import pathlib
+import random
+import re
+import sys
+import time
+
+from _corte_livro import corta_livro
+from _decodificação import detecta_codificação, TAMANHO_AMOSTRA
+from _estatísticas import Estatísticas
+from _estatísticas_linha import calcula_estatísticas_linha
+
+
+DESCRIÇÃO = ''.join("""\
+Comparação da vazão, por linha e por livro, entre o cálculo anterior
+das estatísticas de linha (re.findall e list.count por chave distinta)
+e o cálculo em passada linear de _estatísticas_linha, sobre os livros
+armazenados pelos scripts de estatísticas.
+""".replace('\n', ' ').replace('  ', ' '))
+
+# DIRETÓRIO_PADRÃO é o diretório onde os scripts de estatísticas
+# armazenam os livros obtidos, por padrão os de Machado de Assis.
+DIRETÓRIO_PADRÃO = pathlib.Path(
+    pathlib.Path(sys.argv[0]).resolve().parent, 'arquivos_project_gutenberg')
+
+# VAZIO, CARACTERE_VISÍVEL e VISÍVEL_CONTÍGUO são as regex do cálculo
+# anterior, que também serviam de chaves das estatísticas.
+VAZIO = re.compile(r'^\s*$')
+CARACTERE_VISÍVEL = re.compile(r'\S')
+VISÍVEL_CONTÍGUO = re.compile(r'\S+')
+
+
+def estatísticas_linha_anterior(linha):
+    """Reprodução do cálculo anterior das estatísticas de uma linha.
+
+    Args:
+        linha: str a ser analisada.
+
+    Returns:
+        Instância de dict com as estatísticas da linha.
+    """
+    estatísticas_linha = {}
+    if not isinstance(linha, str):
+        return estatísticas_linha
+
+    vazio = bool(re.findall(VAZIO, linha))
+    estatísticas_linha[VAZIO] = vazio
+
+    if vazio:
+        estatísticas_linha['linha_visível'] = 0
+        estatísticas_linha[CARACTERE_VISÍVEL] = 0
+        estatísticas_linha[VISÍVEL_CONTÍGUO] = 0
+        estatísticas_linha['caracteres visíveis'] = {}
+        estatísticas_linha['visíveis contíguos'] = {}
+        estatísticas_linha['caracteres visíveis insensíveis'] = {}
+        estatísticas_linha['visíveis contíguos insensíveis'] = {}
+        return estatísticas_linha
+
+    caracteres_visíveis = re.findall(CARACTERE_VISÍVEL, linha)
+    visíveis_contíguos = re.findall(VISÍVEL_CONTÍGUO, linha)
+    caracteres_visíveis_insensíveis = [cv_.lower()
+                                       for cv_ in caracteres_visíveis]
+    visíveis_contíguos_insensíveis = [vc_.lower()
+                                      for vc_ in visíveis_contíguos]
+
+    estatísticas_linha['linha_visível'] = 1
+    estatísticas_linha[CARACTERE_VISÍVEL] = len(caracteres_visíveis)
+    estatísticas_linha[VISÍVEL_CONTÍGUO] = len(visíveis_contíguos)
+    for chave, lista in (
+            ('caracteres visíveis', caracteres_visíveis),
+            ('visíveis contíguos', visíveis_contíguos),
+            ('caracteres visíveis insensíveis',
+             caracteres_visíveis_insensíveis),
+            ('visíveis contíguos insensíveis',
+             visíveis_contíguos_insensíveis)):
+        estatísticas_linha[chave] = {item: lista.count(item)
+                                     for item in frozenset(lista)}
+    return estatísticas_linha
+
+
+def converte_anterior(estatísticas_linha):
+    """Converte as estatísticas de uma linha do cálculo anterior para
+       uma instância de Estatísticas, para comparação.
+
+    Args:
+        estatísticas_linha: dict devolvido por
+                            estatísticas_linha_anterior.
+
+    Returns:
+        Instância de Estatísticas ou None caso o dict esteja vazio.
+    """
+    if not estatísticas_linha:
+        return None
+    return Estatísticas(
+        linhas_invisíveis=int(estatísticas_linha[VAZIO]),
+        linhas_visíveis=estatísticas_linha['linha_visível'],
+        quantidade_caracteres=estatísticas_linha[CARACTERE_VISÍVEL],
+        quantidade_sequências=estatísticas_linha[VISÍVEL_CONTÍGUO],
+        caracteres=estatísticas_linha['caracteres visíveis'],
+        sequências=estatísticas_linha['visíveis contíguos'],
+        caracteres_insensíveis=estatísticas_linha[
+            'caracteres visíveis insensíveis'],
+        sequências_insensíveis=estatísticas_linha[
+            'visíveis contíguos insensíveis'])
+
+
+def lê_livros(diretório):
+    """Lê e corta os livros armazenados em diretório.
+
+    Args:
+        diretório: pathlib.Path do diretório dos livros.
+
+    Returns:
+        Instância de list de tuplas (nome do arquivo, CorpoLivro).
+    """
+    livros = []
+    for caminho in sorted(diretório.glob('*.txt')):
+        if not caminho.stem.isdigit():
+            continue
+        dados = caminho.read_bytes()
+        texto = dados.decode(detecta_codificação(dados[:TAMANHO_AMOSTRA]),
+                             errors='replace')
+        corpo = corta_livro(texto)
+        if corpo:
+            livros.append((caminho.name, corpo))
+    return livros
+
+
+def gera_livros_sintéticos(quantidade, linhas, semente=0):
+    """Gera livros com palavras pseudoaleatórias para quando não houver
+       livros armazenados.
+
+    Args:
+        quantidade: int do número de livros.
+        linhas: int do número de linhas de cada livro.
+        semente: semente do gerador pseudoaleatório.
+
+    Returns:
+        Instância de list de tuplas (nome, list das linhas).
+    """
+    aleatório = random.Random(semente)
+    letras = 'abcdefghijklmnopqrstuvwxyzáéíóúâêôãõçABCDEÉÇ.,;:!?-'
+    palavras = [''.join(aleatório.choice(letras)
+                        for _ in range(aleatório.randint(1, 10)))
+                for _ in range(5000)]
+    return [(f"sintético {número}",
+             [' '.join(aleatório.choice(palavras)
+                       for _ in range(aleatório.choice((0, 5, 9, 12, 14))))
+              for _ in range(linhas)])
+            for número in range(quantidade)]
+
+
+def mede(rótulo, função, livros, saída):
+    """Aplica função a cada linha de cada livro, medindo a vazão.
+
+    Args:
+        rótulo: str identificando a medição.
+        função: chamável que calcula as estatísticas de uma linha.
+        livros: list de tuplas (nome, sequência de linhas).
+        saída: instância com métodos write e flush para exibição do
+               resultado.
+
+    Returns:
+        Instância de list, por livro, das list de estatísticas de
+        cada linha.
+    """
+    início = time.perf_counter()
+    resultados = [[função(linha) for linha in linhas]
+                  for _, linhas in livros]
+    duração = time.perf_counter() - início
+    quantidade_linhas = sum(len(linhas) for _, linhas in livros)
+    saída.write(f"{rótulo:>16}: {duração:8.3f} s, "
+                f"{quantidade_linhas / duração:12.0f} linhas/s, "
+                f"{len(livros) / duração:8.2f} livros/s\n")
+    saída.flush()
+    return resultados
+
+
+def main(argv):
+    """Função main para comparar os cálculos de estatísticas de linha.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_PADRÃO,
+                        help='diretório dos livros armazenados; caso não '
+                             'haja livros, são gerados livros sintéticos')
+    parser.add_argument('--livros', type=int, default=10,
+                        help='número de livros sintéticos')
+    parser.add_argument('--linhas', type=int, default=8000,
+                        help='número de linhas de cada livro sintético')
+    args = parser.parse_args(argv[1:])
+
+    saída = sys.stdout
+    livros = lê_livros(args.diretório) if args.diretório.is_dir() else []
+    if not livros:
+        saída.write(f"Nenhum livro em '{args.diretório}'; utilizando "
+                    f"livros sintéticos.\n")
+        livros = gera_livros_sintéticos(args.livros, args.linhas)
+    saída.write(f"{len(livros)} livros, "
+                f"{sum(len(linhas) for _, linhas in livros)} linhas.\n")
+
+    anterior = mede('anterior', estatísticas_linha_anterior, livros, saída)
+    linear = mede('passada linear', calcula_estatísticas_linha, livros,
+                  saída)
+
+    assert [[converte_anterior(estatísticas_linha)
+             for estatísticas_linha in livro]
+            for livro in anterior] == linear
+
+
+if __name__ == "__main__":
+    main(sys.argv)
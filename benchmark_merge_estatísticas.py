@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Comparação do custo de combinação das estatísticas: a combinação
+anterior, em laços aninhados sobre as chaves de dicts, contra
+Estatísticas.acumula e Estatísticas.__add__, ao combinar as linhas de
+cada livro e os livros de cada autor, e a combinação sequencial dos
+totais por autor e de todos os livros contra a redução em árvore (ver
+_agregação), no próprio processo e em um ProcessPoolExecutor.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import functools
+import operator
+import pathlib
+import sys
+import time
+
+from _agregação import agrupa_por_autor, reduz_em_árvore
+from _estatísticas import CAMPOS_CONTAGEM, CAMPOS_HISTOGRAMA, Estatísticas
+from _estatísticas_linha import calcula_estatísticas_linha
+from benchmark_estatísticas_linha import (
+    DIRETÓRIO_PADRÃO,
+    gera_livros_sintéticos,
+    lê_livros,
+)
+
+
+DESCRIÇÃO = ''.join("""\
+Comparação do custo de combinação das estatísticas: a combinação
+anterior, em laços aninhados sobre as chaves de dicts, contra
+Estatísticas.acumula e Estatísticas.__add__, ao combinar as linhas de
+cada livro e os livros de cada autor, e a combinação sequencial dos
+totais por autor e de todos os livros contra a redução em árvore, no
+próprio processo e em um ProcessPoolExecutor.
+""".replace('\n', ' ').replace('  ', ' '))
+
+# LIVROS_POR_AUTOR é o número de livros atribuídos a cada autor na
+# combinação por autor.
+LIVROS_POR_AUTOR = 4
+
+
+def para_dict(estatísticas):
+    """Converte uma instância de Estatísticas para o dict do formato
+       anterior, cujos histogramas são dicts.
+
+    Args:
+        estatísticas: instância de Estatísticas.
+
+    Returns:
+        Instância de dict com um item por campo.
+    """
+    resultado = {campo: getattr(estatísticas, campo)
+                 for campo in CAMPOS_CONTAGEM}
+    resultado.update((campo, dict(getattr(estatísticas, campo)))
+                     for campo in CAMPOS_HISTOGRAMA)
+    return resultado
+
+
+def mescla_anterior(resultados):
+    """Reprodução da combinação anterior das estatísticas.
+
+    Args:
+        resultados: iterável de tuplas (dict das estatísticas,
+                    multiplicidade).
+
+    Returns:
+        Instância de dict com as estatísticas combinadas.
+    """
+    estatísticas = {campo: 0 for campo in CAMPOS_CONTAGEM}
+    estatísticas.update((campo, {}) for campo in CAMPOS_HISTOGRAMA)
+    for resultado, multiplicidade in resultados:
+        for chave_int in CAMPOS_CONTAGEM:
+            estatísticas[chave_int] += (
+                resultado[chave_int] * multiplicidade)
+        for chave_dict in CAMPOS_HISTOGRAMA:
+            for chave_chave in resultado[chave_dict]:
+                estatísticas[chave_dict].setdefault(chave_chave, 0)
+                estatísticas[chave_dict][chave_chave] += (
+                    resultado[chave_dict][chave_chave] * multiplicidade)
+    return estatísticas
+
+
+def mescla_acumula(resultados):
+    """Combina as estatísticas no lugar com Estatísticas.acumula.
+
+    Args:
+        resultados: iterável de tuplas (Estatísticas, multiplicidade).
+
+    Returns:
+        Instância de Estatísticas combinada.
+    """
+    estatísticas = Estatísticas()
+    for resultado, multiplicidade in resultados:
+        estatísticas.acumula(resultado, multiplicidade)
+    return estatísticas
+
+
+def mescla_soma(resultados):
+    """Combina as estatísticas com o operador +, sem multiplicidade.
+
+    Args:
+        resultados: iterável de tuplas (Estatísticas, 1).
+
+    Returns:
+        Instância de Estatísticas combinada.
+    """
+    return functools.reduce(operator.add,
+                            (resultado for resultado, _ in resultados),
+                            Estatísticas())
+
+
+def totais_sequencial(livros):
+    """Combina sequencialmente os livros de cada autor e os totais dos
+       autores com o operador +.
+
+    Args:
+        livros: list de tuplas ((nome do livro, nome do autor),
+                Estatísticas).
+
+    Returns:
+        Tupla (dict de cada autor para o seu total, total de todos os
+        livros).
+    """
+    totais_autores = {}
+    for (_, nome_autor), estatísticas in livros:
+        totais_autores[nome_autor] = (
+            totais_autores[nome_autor] + estatísticas
+            if nome_autor in totais_autores
+            else estatísticas + Estatísticas())
+    return totais_autores, functools.reduce(
+        operator.add, totais_autores.values(), Estatísticas())
+
+
+def totais_árvore(livros, executor=None):
+    """Reduz em árvore os livros de cada autor e os totais dos autores,
+       como agrega.
+
+    Args:
+        livros: list de tuplas ((nome do livro, nome do autor),
+                Estatísticas).
+        executor: instância de concurrent.futures.ProcessPoolExecutor ou
+                  None para a redução no próprio processo.
+
+    Returns:
+        Tupla (dict de cada autor para o seu total, total de todos os
+        livros).
+    """
+    totais_autores = reduz_em_árvore(agrupa_por_autor(dict(livros)),
+                                     executor)
+    return totais_autores, reduz_em_árvore(
+        {None: list(totais_autores.values())}, executor)[None]
+
+
+def mede(rótulo, função, grupos, saída):
+    """Aplica função a cada grupo de resultados, medindo o tempo.
+
+    Args:
+        rótulo: str identificando a medição.
+        função: chamável que combina um grupo de resultados.
+        grupos: list dos grupos, cada um uma list de tuplas
+                (estatísticas, multiplicidade).
+        saída: instância com métodos write e flush para exibição do
+               resultado.
+
+    Returns:
+        Instância de list das estatísticas combinadas de cada grupo.
+    """
+    início = time.perf_counter()
+    combinadas = [função(grupo) for grupo in grupos]
+    duração = time.perf_counter() - início
+    quantidade = sum(len(grupo) for grupo in grupos)
+    saída.write(f"{rótulo:>28}: {duração:8.3f} s, "
+                f"{quantidade / duração:12.0f} combinações/s\n")
+    saída.flush()
+    return combinadas
+
+
+def main(argv):
+    """Função main para comparar as combinações de estatísticas.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_PADRÃO,
+                        help='diretório dos livros armazenados; caso não '
+                             'haja livros, são gerados livros sintéticos')
+    parser.add_argument('--livros', type=int, default=8,
+                        help='número de livros sintéticos')
+    parser.add_argument('--linhas', type=int, default=8000,
+                        help='número de linhas de cada livro sintético')
+    parser.add_argument('--workers', type=int, default=2, metavar='N',
+                        help='número de processos da redução em árvore '
+                             'em processos (0 para não medi-la)')
+    args = parser.parse_args(argv[1:])
+
+    saída = sys.stdout
+    livros = lê_livros(args.diretório) if args.diretório.is_dir() else []
+    if not livros:
+        saída.write(f"Nenhum livro em '{args.diretório}'; utilizando "
+                    f"livros sintéticos.\n")
+        livros = gera_livros_sintéticos(args.livros, args.linhas)
+    saída.write(f"{len(livros)} livros, "
+                f"{sum(len(linhas) for _, linhas in livros)} linhas.\n")
+
+    # As estatísticas de cada linha distinta são calculadas antes das
+    # medições, que incluem somente a combinação.
+    por_linha = []
+    for _, linhas in livros:
+        multiplicidades = collections.Counter(linhas)
+        por_linha.append([(calcula_estatísticas_linha(linha), quantidade)
+                          for linha, quantidade in multiplicidades.items()
+                          if isinstance(linha, str)])
+    por_linha_dict = [[(para_dict(resultado), quantidade)
+                       for resultado, quantidade in grupo]
+                      for grupo in por_linha]
+
+    saída.write('Linhas de cada livro:\n')
+    livros_anterior = mede('anterior', mescla_anterior, por_linha_dict,
+                           saída)
+    livros_acumula = mede('Estatísticas.acumula', mescla_acumula,
+                          por_linha, saída)
+    assert [Estatísticas(**estatísticas)
+            for estatísticas in livros_anterior] == livros_acumula
+
+    # Os livros são distribuídos entre autores fictícios.
+    por_autor = [[(estatísticas, 1) for estatísticas in
+                  livros_acumula[início:início + LIVROS_POR_AUTOR]]
+                 for início in range(0, len(livros_acumula),
+                                     LIVROS_POR_AUTOR)]
+    por_autor_dict = [[(para_dict(estatísticas), 1)
+                       for estatísticas, _ in grupo]
+                      for grupo in por_autor]
+
+    saída.write('Livros de cada autor:\n')
+    autores_anterior = mede('anterior', mescla_anterior, por_autor_dict,
+                            saída)
+    autores_acumula = mede('Estatísticas.acumula', mescla_acumula,
+                           por_autor, saída)
+    autores_soma = mede('Estatísticas.__add__', mescla_soma, por_autor,
+                        saída)
+    assert ([Estatísticas(**estatísticas)
+             for estatísticas in autores_anterior] ==
+            autores_acumula == autores_soma)
+
+    livros_autores = [[((f'livro {índice}',
+                         f'autor {índice // LIVROS_POR_AUTOR}'),
+                        estatísticas)
+                       for índice, estatísticas in enumerate(livros_acumula)]]
+
+    saída.write('Totais por autor e de todos os livros:\n')
+    [sequencial] = mede('sequencial', totais_sequencial, livros_autores,
+                        saída)
+    [árvore] = mede('árvore', totais_árvore, livros_autores, saída)
+    assert sequencial == árvore
+    if args.workers > 0:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.workers) as executor:
+            # Os processos são iniciados antes da medição, como no
+            # executor já utilizado na análise dos livros.
+            list(executor.map(int, range(args.workers)))
+            [processos] = mede(
+                f'árvore em {args.workers} processos',
+                functools.partial(totais_árvore, executor=executor),
+                livros_autores, saída)
+        assert sequencial == processos
+
+
+if __name__ == "__main__":
+    main(sys.argv)
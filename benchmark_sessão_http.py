@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Comparação da latência de requisições HTTP a um servidor local entre
+uma sessão aiohttp nova por requisição e uma sessão compartilhada com
+reuso de conexões.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _base_estatísticas_livro_assíncrono import cria_sessão
+
+
+DESCRIÇÃO = ''.join("""\
+Comparação da latência de requisições HTTP a um servidor local entre
+uma sessão aiohttp nova por requisição e uma sessão compartilhada com
+reuso de conexões.
+""".replace('\n', ' ').replace('  ', ' '))
+
+
+async def inicia_servidor(tamanho_corpo):
+    """Inicia um servidor HTTP local que responde qualquer caminho com
+       um corpo de tamanho fixo.
+
+    Args:
+        tamanho_corpo: int com o tamanho, em bytes, do corpo da resposta.
+
+    Returns:
+        Tupla (aiohttp.web.AppRunner, URL base do servidor).
+    """
+    corpo = b'x' * tamanho_corpo
+
+    async def responde(requisição):
+        return web.Response(body=corpo, content_type='text/plain')
+
+    aplicação = web.Application()
+    aplicação.router.add_get('/{caminho:.*}', responde)
+    executor = web.AppRunner(aplicação)
+    await executor.setup()
+    sítio = web.TCPSite(executor, '127.0.0.1', 0)
+    await sítio.start()
+    porta = executor.addresses[0][1]
+    return executor, f"http://127.0.0.1:{porta}"
+
+
+async def requisita(sessão, url):
+    """Efetua uma requisição GET e mede sua latência.
+
+    Args:
+        sessão: instância de aiohttp.ClientSession.
+        url: str da URL requisitada.
+
+    Returns:
+        float com a latência, em segundos.
+    """
+    início = time.perf_counter()
+    async with sessão.get(url) as resposta:
+        assert resposta.status == 200
+        await resposta.read()
+    return time.perf_counter() - início
+
+
+async def sem_reuso(url_base, quantidade):
+    """Efetua as requisições abrindo uma sessão nova para cada uma,
+       como a coleta fazia antes da sessão compartilhada.
+
+    Args:
+        url_base: str da URL base do servidor.
+        quantidade: int com o número de requisições.
+
+    Returns:
+        list das latências, em segundos.
+    """
+    latências = []
+    for índice in range(quantidade):
+        async with aiohttp.ClientSession() as sessão:
+            latências.append(
+                await requisita(sessão, f"{url_base}/ebooks/{índice}"))
+    return latências
+
+
+async def com_reuso(url_base, quantidade):
+    """Efetua as requisições por uma única sessão criada por
+       cria_sessão.
+
+    Args:
+        url_base: str da URL base do servidor.
+        quantidade: int com o número de requisições.
+
+    Returns:
+        list das latências, em segundos.
+    """
+    latências = []
+    async with cria_sessão() as sessão:
+        for índice in range(quantidade):
+            latências.append(
+                await requisita(sessão, f"{url_base}/ebooks/{índice}"))
+    return latências
+
+
+def exibe_latências(rótulo, latências, saída):
+    """Exibe média, mediana e percentil 95 das latências.
+
+    Args:
+        rótulo: str identificando a medição.
+        latências: list das latências, em segundos.
+        saída: instância com métodos write e flush para exibição do
+               resultado.
+    """
+    ordenadas = sorted(latências)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * .95))]
+    média = statistics.mean(latências)
+    mediana = statistics.median(latências)
+    saída.write(f"{rótulo:>12}: média {média*1e3:7.3f} ms, "
+                f"mediana {mediana*1e3:7.3f} ms, "
+                f"p95 {p95*1e3:7.3f} ms, "
+                f"total {sum(latências):7.3f} s\n")
+    saída.flush()
+
+
+async def main(argv):
+    """Função main para comparar requisições com e sem reuso de sessão.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('--requisições', type=int, default=500,
+                        help='número de requisições por medição')
+    parser.add_argument('--tamanho-corpo', type=int, default=16 * 2**10,
+                        help='tamanho, em bytes, do corpo das respostas')
+    args = parser.parse_args(argv[1:])
+
+    executor, url_base = await inicia_servidor(args.tamanho_corpo)
+    try:
+        exibe_latências('sem reuso',
+                        await sem_reuso(url_base, args.requisições),
+                        sys.stdout)
+        exibe_latências('com reuso',
+                        await com_reuso(url_base, args.requisições),
+                        sys.stdout)
+    finally:
+        await executor.cleanup()
+
+
+if __name__ == "__main__":
+    LOOP = asyncio.get_event_loop()
+    LOOP.run_until_complete(main(sys.argv))
+    LOOP.close()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Comparação do tempo de envio de livros a um processo de um
+ProcessPoolExecutor e de retorno das suas estatísticas: texto e dicts
+serializados com pickle contra texto em memória compartilhada e
+estatísticas empacotadas em arrays, para diferentes tamanhos de livro.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import functools
+import random
+import sys
+import time
+
+from _estatísticas import Estatísticas
+from _transporte import (
+    TransporteLivros,
+    desempacota_estatísticas,
+    empacota_estatísticas,
+    obtém_texto,
+    shared_memory,
+)
+
+
+DESCRIÇÃO = ''.join("""\
+Comparação do tempo de envio de livros a um processo de um
+ProcessPoolExecutor e de retorno das suas estatísticas: texto e dicts
+serializados com pickle contra texto em memória compartilhada e
+estatísticas empacotadas em arrays, para diferentes tamanhos de livro.
+""".replace('\n', ' ').replace('  ', ' '))
+
+# TAMANHOS_KIB são os tamanhos padrão, em KiB, dos livros sintéticos.
+TAMANHOS_KIB = (16, 256, 2048, 8192)
+
+
+def gera_livro_sintético(tamanho, semente=0):
+    """Gera um texto com palavras pseudoaleatórias, de forma que os
+       histogramas tenham muitas chaves, como nos livros reais.
+
+    Args:
+        tamanho: int do tamanho aproximado, em caracteres.
+        semente: semente do gerador pseudoaleatório.
+
+    Returns:
+        str com o texto gerado.
+    """
+    aleatório = random.Random(semente)
+    letras = 'abcdefghijklmnopqrstuvwxyzáéíóúãõçABCDEFGHIJ.,;!?'
+    palavras = [''.join(aleatório.choice(letras)
+                        for _ in range(aleatório.randint(1, 12)))
+                for _ in range(20000)]
+    linhas = []
+    total = 0
+    while total < tamanho:
+        linha = ' '.join(aleatório.choice(palavras)
+                         for _ in range(aleatório.randint(0, 14)))
+        linhas.append(linha)
+        total += len(linha) + 1
+    return '\n'.join(linhas)
+
+
+def estatísticas_sintéticas(texto):
+    """Calcula estatísticas do texto com o mesmo formato de
+       analisa_livro, de forma mais barata.
+
+    Args:
+        texto: str do texto do livro.
+
+    Returns:
+        Instância de Estatísticas de um livro, com histogramas dict.
+    """
+    visíveis_contíguos = texto.split()
+    caracteres_visíveis = collections.Counter(''.join(visíveis_contíguos))
+    linhas = texto.split('\n')
+    linhas_visíveis = sum(1 for linha in linhas if linha.strip())
+    return Estatísticas(
+        linhas_invisíveis=len(linhas) - linhas_visíveis,
+        linhas_visíveis=linhas_visíveis,
+        quantidade_caracteres=sum(caracteres_visíveis.values()),
+        quantidade_sequências=len(visíveis_contíguos),
+        caracteres=dict(caracteres_visíveis),
+        sequências=dict(collections.Counter(visíveis_contíguos)),
+        caracteres_insensíveis=dict(collections.Counter(
+            ''.join(visíveis_contíguos).lower())),
+        sequências_insensíveis=dict(collections.Counter(
+            palavra.lower() for palavra in visíveis_contíguos)))
+
+
+@functools.lru_cache(maxsize=None)
+def estatísticas_livro_sintético(tamanho):
+    """Obtém, uma única vez por processo, as estatísticas de um livro
+       sintético, de forma que a medição do retorno não inclua o seu
+       cálculo.
+
+    Args:
+        tamanho: int do tamanho aproximado, em caracteres.
+
+    Returns:
+        Instância de Estatísticas de um livro, com histogramas dict.
+    """
+    return estatísticas_sintéticas(gera_livro_sintético(tamanho))
+
+
+def tarefa_envio(referência_texto):
+    """Tarefa executada no processo do executor para medir o envio.
+
+    Args:
+        referência_texto: referência devolvida por
+                          TransporteLivros.publica.
+
+    Returns:
+        int do comprimento do texto recebido.
+    """
+    return len(obtém_texto(referência_texto))
+
+
+def tarefa_retorno(tamanho, empacota):
+    """Tarefa executada no processo do executor para medir o retorno.
+
+    Args:
+        tamanho: int do tamanho do livro sintético.
+        empacota: bool indicando se as estatísticas são devolvidas
+                  empacotadas.
+
+    Returns:
+        As estatísticas do livro sintético, empacotadas ou como
+        instância de Estatísticas.
+    """
+    estatísticas = estatísticas_livro_sintético(tamanho)
+    if empacota:
+        return empacota_estatísticas(estatísticas)
+    return estatísticas
+
+
+def menor_tempo(função, repetições):
+    """Mede o menor tempo de parede de repetições de função.
+
+    Args:
+        função: chamável sem argumentos a ser medido.
+        repetições: int do número de repetições.
+
+    Returns:
+        Tupla (menor tempo em segundos, valor devolvido por função).
+    """
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repetições):
+        início = time.perf_counter()
+        resultado = função()
+        melhor = min(melhor, time.perf_counter() - início)
+    return melhor, resultado
+
+
+def envia(executor, texto, memória_compartilhada):
+    """Envia um livro ao executor, liberando o segmento ao final.
+
+    Args:
+        executor: instância de concurrent.futures.ProcessPoolExecutor.
+        texto: str do texto do livro.
+        memória_compartilhada: bool indicando se o texto é enviado em
+                               memória compartilhada.
+
+    Returns:
+        int do comprimento do texto recebido pelo processo.
+    """
+    with TransporteLivros(memória_compartilhada) as transporte:
+        return executor.submit(tarefa_envio,
+                               transporte.publica(texto)).result()
+
+
+def recebe(executor, tamanho, empacota):
+    """Recebe do executor as estatísticas de um livro sintético.
+
+    Args:
+        executor: instância de concurrent.futures.ProcessPoolExecutor.
+        tamanho: int do tamanho do livro sintético.
+        empacota: bool indicando se as estatísticas voltam
+                  empacotadas.
+
+    Returns:
+        Instância de Estatísticas do livro.
+    """
+    resultado = executor.submit(tarefa_retorno, tamanho, empacota).result()
+    if empacota:
+        return desempacota_estatísticas(resultado)
+    return resultado
+
+
+def main(argv):
+    """Função main para comparar os transportes de livros.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('--tamanho', dest='tamanhos', type=int,
+                        action='append', metavar='KIB',
+                        help='tamanho, em KiB, de um livro sintético '
+                             '(pode ser repetido)')
+    parser.add_argument('--repetições', type=int, default=5,
+                        help='número de repetições de cada medição')
+    args = parser.parse_args(argv[1:])
+
+    if shared_memory is None:
+        sys.stderr.write('ERRO: multiprocessing.shared_memory não está '
+                         'disponível (requer Python 3.8). Abortando...\n')
+        return
+
+    saída = sys.stdout
+    saída.write(f"{'tamanho':>12} {'envio pickle':>14} "
+                f"{'envio memória':>14} {'retorno dict':>14} "
+                f"{'retorno array':>14}\n")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        # O processo do executor é criado somente na primeira tarefa,
+        # que precisa ser feita por um transporte em memória
+        # compartilhada.
+        envia(executor, '', True)
+
+        for tamanho_kib in args.tamanhos or TAMANHOS_KIB:
+            tamanho = tamanho_kib * 2**10
+            texto = gera_livro_sintético(tamanho)
+            estatísticas = estatísticas_livro_sintético(tamanho)
+
+            # Aquece o processo do executor, que também calcula as
+            # estatísticas a serem devolvidas, antes das medições.
+            executor.submit(tarefa_retorno, tamanho, False).result()
+
+            envio_pickle, recebido_pickle = menor_tempo(
+                lambda: envia(executor, texto, False), args.repetições)
+            envio_memória, recebido_memória = menor_tempo(
+                lambda: envia(executor, texto, True), args.repetições)
+            retorno_dict, por_dict = menor_tempo(
+                lambda: recebe(executor, tamanho, False), args.repetições)
+            retorno_array, por_array = menor_tempo(
+                lambda: recebe(executor, tamanho, True), args.repetições)
+            assert recebido_pickle == recebido_memória == len(texto)
+            assert por_dict == por_array == estatísticas
+
+            saída.write(f"{tamanho_kib:>8} KiB "
+                        f"{envio_pickle * 1e3:11.1f} ms "
+                        f"{envio_memória * 1e3:11.1f} ms "
+                        f"{retorno_dict * 1e3:11.1f} ms "
+                        f"{retorno_array * 1e3:11.1f} ms\n")
+            saída.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
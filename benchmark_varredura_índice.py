@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Comparação de tempo e pico de memória entre a varredura do arquivo de
+índices GUTINDEX.ALL linha a linha (com um asyncio.Future por linha)
+e a varredura em passada única.
+"""
+
+import argparse
+import asyncio
+import pathlib
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from _varredura_índice import NOME_AUTOR_ÍNDICE, filtra_autores
+
+
+DESCRIÇÃO = ''.join("""\
+Comparação de tempo e pico de memória entre a varredura do arquivo de
+índices GUTINDEX.ALL linha a linha (com um asyncio.Future por linha)
+e a varredura em passada única.
+""".replace('\n', ' ').replace('  ', ' '))
+
+
+async def extrai_nome_autor_índice_futuro(linha, futuro):
+    """Reprodução da extração linha a linha anterior à varredura em
+       passada única, entregando o resultado via futuro.
+
+    Args:
+        linha: str a ser analisada.
+        futuro: instância de asyncio.Future a armazenar o resultado.
+    """
+    nome_autor_índice = re.findall(NOME_AUTOR_ÍNDICE, linha)
+    futuro.set_result(nome_autor_índice[0] if nome_autor_índice else None)
+
+
+async def filtra_autores_futuros(texto_índice, autores):
+    """Reprodução do caminho assíncrono anterior: um asyncio.Future e
+       uma tarefa por linha do índice.
+
+    Args:
+        texto_índice: str do conteúdo de GUTINDEX.ALL.
+        autores: conjunto com os nomes dos autores buscados.
+
+    Returns:
+        Instância de list de tuplas (nome do livro, nome do autor,
+        índice).
+    """
+    futuros_linha = {linha: asyncio.Future()
+                     for linha in texto_índice.split('\n')}
+    await asyncio.wait(
+        [asyncio.ensure_future(
+            extrai_nome_autor_índice_futuro(linha, futuros_linha[linha]))
+         for linha in futuros_linha])
+    return [tupla
+            for linha in futuros_linha
+            for tupla in (futuros_linha[linha].result(), )
+            if tupla and tupla[1] in autores]
+
+
+def filtra_autores_linhas(texto_índice, autores):
+    """Reprodução do caminho síncrono anterior: re.findall linha a
+       linha.
+
+    Args:
+        texto_índice: str do conteúdo de GUTINDEX.ALL.
+        autores: conjunto com os nomes dos autores buscados.
+
+    Returns:
+        Instância de list de tuplas (nome do livro, nome do autor,
+        índice).
+    """
+    tuplas = []
+    for linha in texto_índice.split('\n'):
+        nome_autor_índice = re.findall(NOME_AUTOR_ÍNDICE, linha)
+        if nome_autor_índice and nome_autor_índice[0][1] in autores:
+            tuplas.append(nome_autor_índice[0])
+    return tuplas
+
+
+def gera_índice_sintético(quantidade_linhas, semente=0):
+    """Gera um texto no formato de GUTINDEX.ALL para quando não houver
+       uma cópia local do índice.
+
+    Args:
+        quantidade_linhas: int com o número aproximado de linhas.
+        semente: semente do gerador pseudoaleatório.
+
+    Returns:
+        str com o texto gerado.
+    """
+    aleatório = random.Random(semente)
+    autores = ['Machado de Assis', 'William Shakespeare', 'Jane Austen',
+               'José de Alencar', 'Lima Barreto', 'Aluísio Azevedo']
+    linhas = []
+    for índice in range(quantidade_linhas, 0, -3):
+        nome_livro = ' '.join(aleatório.choice(['Dom', 'Casmurro', 'Memórias',
+                                                'Póstumas', 'Brás', 'Cubas',
+                                                'Iaiá', 'Garcia'])
+                              for _ in range(aleatório.randint(1, 4)))
+        linhas.append(f"{nome_livro}, by {aleatório.choice(autores)}"
+                      f"{' ' * 20}{índice}")
+        linhas.append(f" [Subtitle: {nome_livro}]")
+        linhas.append('')
+    return '\r\n'.join(linhas)
+
+
+def mede(rótulo, função, saída):
+    """Executa função medindo tempo de parede e pico de memória.
+
+    Args:
+        rótulo: str identificando a medição.
+        função: chamável sem argumentos a ser medido.
+        saída: instância com métodos write e flush para exibição do
+               resultado.
+
+    Returns:
+        O valor devolvido por função.
+    """
+    tracemalloc.start()
+    início = time.perf_counter()
+    resultado = função()
+    duração = time.perf_counter() - início
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    saída.write(f"{rótulo:>24}: {duração:8.3f} s, "
+                f"pico de {pico / 2**20:8.1f} MiB, "
+                f"{len(resultado)} livros encontrados\n")
+    saída.flush()
+    return resultado
+
+
+def main(argv):
+    """Função main para comparar as varreduras do arquivo de índices.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('arquivo_índice', metavar='ARQUIVO_ÍNDICE',
+                        type=pathlib.Path, nargs='?',
+                        help='cópia local de GUTINDEX.ALL; caso omitido, '
+                             'é gerado um índice sintético')
+    parser.add_argument('--linhas', type=int, default=600000,
+                        help='número de linhas do índice sintético')
+    parser.add_argument('--autor', dest='autores', action='append',
+                        help='autor buscado (pode ser repetido)')
+    args = parser.parse_args(argv[1:])
+
+    if args.arquivo_índice:
+        texto_índice = args.arquivo_índice.read_text(encoding='utf-8')
+    else:
+        texto_índice = gera_índice_sintético(args.linhas)
+    autores = frozenset(args.autores or {'Machado de Assis'})
+
+    saída = sys.stdout
+    saída.write(f"Índice com {texto_índice.count(chr(10)) + 1} linhas.\n")
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        anterior_assíncrono = mede(
+            'futuros por linha',
+            lambda: loop.run_until_complete(
+                filtra_autores_futuros(texto_índice, autores)),
+            saída)
+    finally:
+        loop.close()
+    anterior_síncrono = mede(
+        'findall por linha',
+        lambda: filtra_autores_linhas(texto_índice, autores),
+        saída)
+    passada_única = mede(
+        'passada única',
+        lambda: filtra_autores(texto_índice, autores),
+        saída)
+
+    assert (list(dict.fromkeys(anterior_assíncrono))
+            == list(dict.fromkeys(anterior_síncrono))
+            == passada_única)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -6,16 +6,34 @@ etapas do processo.
 """
 
 import argparse
+import pathlib
 import asyncio
 import sys
 
 from _base_estatísticas_livro_assíncrono import (
     DIRETÓRIO_RAIZ,
+    LIMITE_CONEXÕES_POR_HOST,
+    TAMANHO_LOTE_LINHAS,
+    TTL_CACHE_DNS,
     coleta,
+    cria_sessão,
+    obtém_espelhos,
     processa_livro,
     analisa_livro,
+    agrega,
     exibe,
 )
+from _espelhos import ConjuntoEspelhos
+from _limitador import INTERVALO_REQUISIÇÕES, LimitadorPorHost
+from _cache_resultados import CacheResultados
+from _esboços import CONFIANÇA_PADRÃO, ERRO_PADRÃO
+from _estatísticas import cria_modelo_tokens
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    BACKENDS_CARACTERES,
+)
+from _incremental import ManifestoIncremental
+from _resolução_url import URL_BASE_SÍTIO
 
 
 DESCRIÇÃO = ''.join("""\
@@ -25,11 +43,12 @@ etapas do processo.
 """.replace('\n', ' ').replace('  ', ' '))
 
 
-async def processa(textos_livros, saída=sys.stderr):
+async def processa(textos_livros, saída=sys.stderr, cache=None):
     """Efetua o processamento dos textos dos livros solicitados
        disponíveis no Project Gutenberg: extrai o texto entre
        o cabeçalho e o rodapé inserido pelo Project Gutenberg em
-       cada livro.
+       cada livro. Livros cujas estatísticas estejam em cache não são
+       processados.
 
     Args:
         textos_livros: dict cujas chaves são tuplas
@@ -39,14 +58,27 @@ async def processa(textos_livros, saída=sys.stderr):
                        txt dos livros.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        cache: instância de CacheResultados das estatísticas de
+               livros já analisados ou None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
         nome do autor) de livros solicitados disponíveis no
-        Project Gutenberg e cujos respectivos valores são list das
-        linhas a serem analisadas de cada livro.
+        Project Gutenberg e cujos respectivos valores são CorpoLivro
+        das linhas a serem analisadas de cada livro.
     """
 
+    # Os livros cujo texto não mudou desde a última análise seguem
+    # diretamente para a exibição, com as estatísticas armazenadas.
+    if cache is not None:
+        textos_livros = {tupla_livro: textos_livros[tupla_livro]
+                         for tupla_livro in textos_livros
+                         if cache.consulta(tupla_livro,
+                                           textos_livros[tupla_livro],
+                                           saída) is None}
+    if not textos_livros:
+        return {}
+
     # Instancia um asyncio.Future para cada livro.
     futuros_texto = {tupla_livro: asyncio.Future()
                      for tupla_livro in textos_livros}
@@ -72,7 +104,8 @@ async def processa(textos_livros, saída=sys.stderr):
     # Uma vez determinada a primeira linha do título e a última linha
     # com caracteres visíveis, devolve um dict cuja chaves são tuplas
     # (nome do livro, nome do autor) e cujos respectivos valores são
-    # list contendo todas as linhas a serem analisadas do livro.
+    # CorpoLivro contendo todas as linhas a serem analisadas do livro,
+    # visões sobre o texto bruto sem cópias das linhas.
     linhas_a_analisar_por_livro = {tupla_livro: resultado
                                    for tupla_livro in futuros_texto
                                    for resultado in
@@ -82,19 +115,32 @@ async def processa(textos_livros, saída=sys.stderr):
     return linhas_a_analisar_por_livro
 
 
-async def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
+async def analisa(linhas_a_analisar_por_livro, saída=sys.stderr,
+                  backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+                  tamanho_lote=TAMANHO_LOTE_LINHAS,
+                  modelo_tokens=None, cache=None):
     """Efetua a análise dos textos de livros: efetua uma análise
        estatística arbitrária para fins de exemplo no texto de
-       cada livro.
+       cada livro. As estatísticas obtidas são armazenadas em cache e
+       somadas às encontradas em cache por processa.
 
     Args:
         linhas_a_analisar_por_livro: dict cujas chaves são tuplas
                                      (nome do livro, nome do autor) e
-                                     cujos respectivos valores são list
-                                     das linhas a serem analisadas de
-                                     cada livro.
+                                     cujos respectivos valores são
+                                     CorpoLivro das linhas a serem
+                                     analisadas de cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        tamanho_lote: int do número de linhas distintas analisadas
+                      por tarefa.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados passada a processa ou
+               None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
@@ -102,6 +148,12 @@ async def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
         a serem analisadas de cada livro.
     """
 
+    # Estatísticas dos livros encontrados em cache por processa.
+    encontradas = {} if cache is None else cache.encontradas
+
+    if not linhas_a_analisar_por_livro:
+        return dict(encontradas)
+
     # Instancia um asyncio.Future para cada livro.
     futuros_texto = {tupla_livro: asyncio.Future()
                      for tupla_livro in linhas_a_analisar_por_livro}
@@ -117,7 +169,9 @@ async def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
         [asyncio.ensure_future(
             analisa_livro(tupla_livro,
                           linhas_a_analisar_por_livro[tupla_livro],
-                          saída, futuros_texto[tupla_livro]))
+                          saída, futuros_texto[tupla_livro],
+                          backend_caracteres, tamanho_lote,
+                          modelo_tokens))
          for tupla_livro in futuros_texto])
     saída.write(f"Analisadas as linhas do"
                 f"{f's {len(linhas_a_analisar_por_livro)}' if plural else ''} "
@@ -127,13 +181,18 @@ async def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
 
     # Uma vez analisadas as linhas do texto do livro, devolve um dict
     # cujas chaves são tuplas (nome do livro, nome do autor) e cujos
-    # respectivos valores são dict contendo as estatísticas obtidas
-    # por cada livro.
+    # respectivos valores são instâncias de Estatísticas obtidas por
+    # cada livro.
+    if cache is not None:
+        for tupla_livro in futuros_texto:
+            cache.armazena(tupla_livro, futuros_texto[tupla_livro].result())
+
     estatísticas_por_livro = {tupla_livro: resultado
                               for tupla_livro in futuros_texto
                               for resultado in
                               (futuros_texto[tupla_livro].result(), )
                               if resultado}
+    estatísticas_por_livro.update(encontradas)
 
     return estatísticas_por_livro
 
@@ -150,30 +209,167 @@ async def main(argv):
     parser = argparse.ArgumentParser(description=DESCRIÇÃO)
     parser.add_argument('nome_autor', metavar='NOME_AUTOR', type=str,
                         nargs='*', help='autor cujos livros serão buscados')
+    parser.add_argument('--idade-máxima-índice', type=float, default=None,
+                        metavar='SEGUNDOS',
+                        help='idade máxima do GUTINDEX.ALL armazenado antes '
+                             'de ser revalidado por um GET condicional')
+    parser.add_argument('--url-base', default=URL_BASE_SÍTIO, metavar='URL',
+                        help='URL base do sítio de onde o índice e os livros '
+                             'são obtidos (por exemplo, a de '
+                             'servidor_gutenberg_local.py)')
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_RAIZ,
+                        help='diretório onde os arquivos obtidos são '
+                             'armazenados')
+    parser.add_argument('--limite-conexões-por-host', type=int,
+                        default=LIMITE_CONEXÕES_POR_HOST,
+                        help='número máximo de conexões simultâneas por host')
+    parser.add_argument('--ttl-dns', type=int, default=TTL_CACHE_DNS,
+                        help='tempo, em segundos, de cache das resoluções '
+                             'de DNS')
+    parser.add_argument('--intervalo-requisições', type=float,
+                        default=INTERVALO_REQUISIÇÕES,
+                        help='intervalo, em segundos, entre requisições a '
+                             'um mesmo host')
+    parser.add_argument('--espelhos', action='store_true',
+                        help='coleta os livros dos mirrors listados em '
+                             'MIRRORS.ALL')
+    parser.add_argument('--espelho', dest='urls_espelhos', metavar='URL',
+                        action='append', default=[],
+                        help='URL base de um mirror a ser utilizado '
+                             '(pode ser repetido)')
+    parser.add_argument('--backend-caracteres', choices=BACKENDS_CARACTERES,
+                        default=BACKEND_CARACTERES_PADRÃO,
+                        help='cálculo das estatísticas de caracteres: linha '
+                             'a linha (python) ou sobre o livro inteiro, com '
+                             'NumPy caso disponível (numpy)')
+    parser.add_argument('--tamanho-lote', type=int,
+                        default=TAMANHO_LOTE_LINHAS,
+                        help='número de linhas distintas analisadas por '
+                             'tarefa')
+    parser.add_argument('--resumo-tokens', type=int, default=None,
+                        metavar='K',
+                        help='mantém, de cada livro, somente os K tokens '
+                             'mais frequentes, com contagens estimadas que '
+                             'excedem as reais em no máximo N/K para N '
+                             'tokens no livro, e os tokens mais longos, em '
+                             'vez dos histogramas exatos')
+    parser.add_argument('--aproximado', action='store_true',
+                        help='modo aproximado: contagens de tokens por '
+                             'Count-Min Sketch, além do resumo dos tokens '
+                             'mais frequentes, e número de tokens '
+                             'distintos por HyperLogLog, com memória fixa '
+                             'por livro')
+    parser.add_argument('--erro-aproximação', type=float,
+                        default=ERRO_PADRÃO, metavar='ERRO',
+                        help='erro máximo das contagens do modo aproximado, '
+                             'relativo ao total de tokens do livro')
+    parser.add_argument('--confiança-aproximação', type=float,
+                        default=CONFIANÇA_PADRÃO, metavar='PROBABILIDADE',
+                        help='probabilidade de cada contagem do modo '
+                             'aproximado respeitar o erro máximo')
+    parser.add_argument('--sem-cache-resultados', action='store_true',
+                        help='processa e analisa todos os livros, sem '
+                             'consultar nem atualizar as estatísticas '
+                             'armazenadas dos livros cujo texto não mudou')
+    parser.add_argument('--incremental', action='store_true',
+                        help='modo incremental: lê e analisa somente os '
+                             'livros novos ou alterados desde a execução '
+                             'anterior e soma suas estatísticas aos totais '
+                             'armazenados dos autores')
     args = parser.parse_args(argv[1:])
+    if args.incremental and args.sem_cache_resultados:
+        # Os totais de um autor com um livro alterado são reconstruídos
+        # a partir das estatísticas armazenadas dos demais livros.
+        parser.error('--incremental requer as estatísticas armazenadas '
+                     'dos livros e não pode ser usado com '
+                     '--sem-cache-resultados')
+    if args.tamanho_lote < 1:
+        parser.error('--tamanho-lote deve ser positivo')
+    if args.resumo_tokens is not None and args.resumo_tokens < 1:
+        parser.error('--resumo-tokens deve ser positivo')
+    if not 0 < args.erro_aproximação < 1:
+        parser.error('--erro-aproximação deve estar entre 0 e 1')
+    if not 0 < args.confiança_aproximação < 1:
+        parser.error('--confiança-aproximação deve estar entre 0 e 1')
+
+    # Modelo dos histogramas de tokens: exatos, resumidos ou
+    # aproximados.
+    modelo_tokens = cria_modelo_tokens(
+        args.resumo_tokens, args.aproximado, args.erro_aproximação,
+        args.confiança_aproximação)
 
     try:
-        DIRETÓRIO_RAIZ.mkdir(mode=0o755, parents=True, exist_ok=True)
+        args.diretório.mkdir(mode=0o755, parents=True, exist_ok=True)
     except FileExistsError:
-        sys.stderr.write(f"ERRO: '{DIRETÓRIO_RAIZ}' existe e não é "
+        sys.stderr.write(f"ERRO: '{args.diretório}' existe e não é "
                          f"diretório. Abortando...\n")
         return
 
+    # Estatísticas dos livros analisados em execuções anteriores com a
+    # mesma configuração, consultadas pelo hash do texto de cada livro.
+    cache = None
+    if not args.sem_cache_resultados:
+        cache = CacheResultados(args.diretório, modelo_tokens)
+
+    # No modo incremental, os livros já analisados em execuções
+    # anteriores com a mesma configuração não são lidos nem analisados.
+    manifesto = None
+    if args.incremental:
+        manifesto = ManifestoIncremental(args.diretório, modelo_tokens)
+
     textos_livros = None
 
     # Caso autores sejam passados como argumento, serão buscados.
     # Caso contrário, será utilizado o default de coleta.
+    # Uma única sessão e um único limitador são utilizados por todos
+    # os downloads da execução.
     autores = frozenset(args.nome_autor)
-    if autores:
-        textos_livros = await coleta(autores)
-    else:
-        textos_livros = await coleta()
-
-    linhas_a_analisar_por_livro = await processa(textos_livros)
-
-    estatísticas_por_livro = await analisa(linhas_a_analisar_por_livro)
-
-    await exibe(estatísticas_por_livro)
+    limitador = LimitadorPorHost(args.intervalo_requisições)
+    async with cria_sessão(
+            limite_por_host=args.limite_conexões_por_host,
+            ttl_cache_dns=args.ttl_dns) as sessão:
+        # Caso solicitado, os livros são distribuídos entre mirrors,
+        # cada um com seu próprio intervalo entre requisições.
+        urls_espelhos = list(args.urls_espelhos)
+        if args.espelhos:
+            urls_espelhos.extend(
+                await obtém_espelhos(sessão, limitador,
+                                     url_base=args.url_base,
+                                     diretório=args.diretório))
+        espelhos = None
+        if urls_espelhos:
+            espelhos = ConjuntoEspelhos(urls_espelhos,
+                                        args.intervalo_requisições)
+
+        if autores:
+            textos_livros = await coleta(
+                autores, sessão=sessão, limitador=limitador,
+                espelhos=espelhos,
+                idade_máxima_índice=args.idade_máxima_índice,
+                url_base=args.url_base, diretório=args.diretório,
+                manifesto=manifesto)
+        else:
+            textos_livros = await coleta(
+                sessão=sessão, limitador=limitador, espelhos=espelhos,
+                idade_máxima_índice=args.idade_máxima_índice,
+                url_base=args.url_base, diretório=args.diretório,
+                manifesto=manifesto)
+
+    linhas_a_analisar_por_livro = await processa(textos_livros, cache=cache)
+
+    estatísticas_por_livro = await analisa(
+        linhas_a_analisar_por_livro,
+        backend_caracteres=args.backend_caracteres,
+        tamanho_lote=args.tamanho_lote,
+        modelo_tokens=modelo_tokens, cache=cache)
+
+    totais = await agrega(estatísticas_por_livro, manifesto=manifesto,
+                          cache=cache)
+
+    await exibe(estatísticas_por_livro, totais=totais,
+                livros_por_autor=(manifesto.livros_por_autor()
+                                  if manifesto is not None else None))
 
 
 if __name__ == "__main__":
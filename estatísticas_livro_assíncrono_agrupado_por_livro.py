@@ -6,16 +6,37 @@ livro.
 """
 
 import argparse
+import concurrent.futures
+import pathlib
 import asyncio
 import sys
 
 from _base_estatísticas_livro_assíncrono import (
     DIRETÓRIO_RAIZ,
+    LIMITE_CONEXÕES_POR_HOST,
+    TAMANHO_LOTE_LINHAS,
+    TTL_CACHE_DNS,
     coleta,
+    cria_sessão,
+    obtém_espelhos,
     processa_livro,
     analisa_livro,
+    processa_e_analisa_em_processo,
+    agrega,
     exibe,
 )
+from _espelhos import ConjuntoEspelhos
+from _limitador import INTERVALO_REQUISIÇÕES, LimitadorPorHost
+from _cache_resultados import CacheResultados
+from _esboços import CONFIANÇA_PADRÃO, ERRO_PADRÃO
+from _estatísticas import cria_modelo_tokens
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    BACKENDS_CARACTERES,
+)
+from _incremental import ManifestoIncremental
+from _resolução_url import URL_BASE_SÍTIO
+from _transporte import TransporteLivros, desempacota_estatísticas
 
 
 DESCRIÇÃO = ''.join("""\
@@ -26,7 +47,10 @@ livro.
 
 
 async def processa_e_analisa_por_livro(
-        tupla_livro, texto_bruto, saída, futuro):
+        tupla_livro, texto_bruto, saída, futuro,
+        backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+        tamanho_lote=TAMANHO_LOTE_LINHAS,
+        modelo_tokens=None, cache=None):
     """Efetua o processamento e a análise do textos de um livro
        solicitado disponível no Project Gutenberg: extrai o texto
        entre o cabeçalho e o rodapé inserido pelo Project Gutenberg
@@ -39,14 +63,31 @@ async def processa_e_analisa_por_livro(
         saída: instância com métodos write e flush para exibição do
                andamento do método.
         futuro: instância de asyncio.Future a armazenar o resultado.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        tamanho_lote: int do número de linhas distintas analisadas
+                      por tarefa.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados consultada antes do
+               processamento e atualizada após a análise, ou None.
 
     Returns:
         Oficialmente, None.
 
-        Via futuro.set_result, é entregue o dict contendo todas
-        as estatísticas analisadas do livro.
+        Via futuro.set_result, é entregue a instância de Estatísticas
+        contendo todas as estatísticas analisadas do livro.
     """
 
+    # Caso o texto do livro não tenha mudado desde a última análise,
+    # as estatísticas armazenadas são utilizadas diretamente.
+    if cache is not None:
+        estatísticas = cache.consulta(tupla_livro, texto_bruto, saída)
+        if estatísticas is not None:
+            futuro.set_result(estatísticas)
+            return
+
     # Instancia um asyncio.Future para o processamento do livro.
     futuro_processa_livro = asyncio.Future()
 
@@ -63,10 +104,18 @@ async def processa_e_analisa_por_livro(
         [asyncio.ensure_future(
             analisa_livro(tupla_livro,
                           linhas_a_analisar,
-                          saída, futuro))])
+                          saída, futuro, backend_caracteres,
+                          tamanho_lote, modelo_tokens))])
+
+    if cache is not None:
+        cache.armazena(tupla_livro, futuro.result())
 
 
-async def processa_e_analisa(textos_livros, saída=sys.stderr):
+async def processa_e_analisa(textos_livros, saída=sys.stderr,
+                             executor=None, memória_compartilhada=True,
+                             backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+                             tamanho_lote=TAMANHO_LOTE_LINHAS,
+                             modelo_tokens=None, cache=None):
     """Efetua o processamento e a análise dos textos dos livros
        solicitados disponíveis no Project Gutenberg: extrai o texto
        entre o cabeçalho e o rodapé inserido pelo Project Gutenberg em
@@ -81,30 +130,89 @@ async def processa_e_analisa(textos_livros, saída=sys.stderr):
                        txt dos livros.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        executor: instância de concurrent.futures.ProcessPoolExecutor
+                  a executar o processamento e a análise de cada livro
+                  ou None para executá-los no próprio event loop.
+        memória_compartilhada: bool indicando se os textos são
+                               enviados ao executor em memória
+                               compartilhada em vez de serializados.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        tamanho_lote: int do número de linhas distintas analisadas
+                      por tarefa.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados das estatísticas de
+               livros já analisados ou None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
-        nome do autor) e cujos respectivos valores são list das linhas
-        a serem analisadas de cada livro.
+        nome do autor) e cujos respectivos valores são instâncias de
+        Estatísticas obtidas de cada livro.
     """
 
+    if executor is not None:
+        # Os livros cujo texto não mudou desde a última análise não
+        # são enviados ao executor: as estatísticas armazenadas,
+        # empacotadas, são utilizadas diretamente.
+        pacotes = {}
+        if cache is not None:
+            for tupla_livro in textos_livros:
+                pacote = cache.consulta_empacotadas(
+                    tupla_livro, textos_livros[tupla_livro], saída)
+                if pacote is not None:
+                    pacotes[tupla_livro] = pacote
+
+        # Cada livro é processado e analisado inteiramente em um
+        # processo do executor, mantendo o event loop livre. Os textos
+        # são publicados em memória compartilhada e as estatísticas
+        # voltam empacotadas, evitando serializar ambos.
+        loop = asyncio.get_event_loop()
+        with TransporteLivros(memória_compartilhada) as transporte:
+            futuros_pacote = {
+                tupla_livro: loop.run_in_executor(
+                    executor, processa_e_analisa_em_processo,
+                    tupla_livro,
+                    transporte.publica(textos_livros[tupla_livro]),
+                    backend_caracteres, tamanho_lote, modelo_tokens)
+                for tupla_livro in textos_livros
+                if tupla_livro not in pacotes}
+            if futuros_pacote:
+                await asyncio.wait(list(futuros_pacote.values()))
+        for tupla_livro in futuros_pacote:
+            pacotes[tupla_livro] = futuros_pacote[tupla_livro].result()
+            if cache is not None:
+                cache.armazena_empacotadas(tupla_livro,
+                                           pacotes[tupla_livro])
+        return {tupla_livro: estatísticas
+                for tupla_livro in pacotes
+                for estatísticas in (desempacota_estatísticas(
+                    pacotes[tupla_livro]), )
+                if estatísticas}
+
     # Instancia um asyncio.Future para cada livro.
     futuros_texto = {tupla_livro: asyncio.Future()
                      for tupla_livro in textos_livros}
 
     # Obtém as estatísticas do livro processado.
-    await asyncio.wait(
-        [asyncio.ensure_future(
-            processa_e_analisa_por_livro(tupla_livro,
-                                         textos_livros[tupla_livro],
-                                         saída,
-                                         futuros_texto[tupla_livro]))
-         for tupla_livro in futuros_texto])
+    if futuros_texto:
+        await asyncio.wait(
+            [asyncio.ensure_future(
+                processa_e_analisa_por_livro(tupla_livro,
+                                             textos_livros[tupla_livro],
+                                             saída,
+                                             futuros_texto[tupla_livro],
+                                             backend_caracteres,
+                                             tamanho_lote,
+                                             modelo_tokens,
+                                             cache))
+             for tupla_livro in futuros_texto])
 
     # Uma vez analisadas as linhas do texto do livro, devolve um dict
     # cujas chaves são tuplas (nome do livro, nome do autor) e cujos
-    # respectivos valores são dict contendo as estatísticas obtidas
-    # por cada livro.
+    # respectivos valores são instâncias de Estatísticas obtidas por
+    # cada livro.
     estatísticas_por_livro = {tupla_livro: resultado
                               for tupla_livro in futuros_texto
                               for resultado in
@@ -126,28 +234,197 @@ async def main(argv):
     parser = argparse.ArgumentParser(description=DESCRIÇÃO)
     parser.add_argument('nome_autor', metavar='NOME_AUTOR', type=str,
                         nargs='*', help='autor cujos livros serão buscados')
+    parser.add_argument('--idade-máxima-índice', type=float, default=None,
+                        metavar='SEGUNDOS',
+                        help='idade máxima do GUTINDEX.ALL armazenado antes '
+                             'de ser revalidado por um GET condicional')
+    parser.add_argument('--url-base', default=URL_BASE_SÍTIO, metavar='URL',
+                        help='URL base do sítio de onde o índice e os livros '
+                             'são obtidos (por exemplo, a de '
+                             'servidor_gutenberg_local.py)')
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_RAIZ,
+                        help='diretório onde os arquivos obtidos são '
+                             'armazenados')
+    parser.add_argument('--limite-conexões-por-host', type=int,
+                        default=LIMITE_CONEXÕES_POR_HOST,
+                        help='número máximo de conexões simultâneas por host')
+    parser.add_argument('--ttl-dns', type=int, default=TTL_CACHE_DNS,
+                        help='tempo, em segundos, de cache das resoluções '
+                             'de DNS')
+    parser.add_argument('--intervalo-requisições', type=float,
+                        default=INTERVALO_REQUISIÇÕES,
+                        help='intervalo, em segundos, entre requisições a '
+                             'um mesmo host')
+    parser.add_argument('--espelhos', action='store_true',
+                        help='coleta os livros dos mirrors listados em '
+                             'MIRRORS.ALL')
+    parser.add_argument('--espelho', dest='urls_espelhos', metavar='URL',
+                        action='append', default=[],
+                        help='URL base de um mirror a ser utilizado '
+                             '(pode ser repetido)')
+    parser.add_argument('--workers', type=int, default=0, metavar='N',
+                        help='número de processos que processam e analisam '
+                             'os livros fora do event loop (0 para '
+                             'processá-los no próprio event loop)')
+    parser.add_argument('--transporte', choices=('memória', 'pickle'),
+                        default='memória',
+                        help='envio dos textos aos processos de --workers: '
+                             'em memória compartilhada ou serializados '
+                             'com pickle')
+    parser.add_argument('--agregação', choices=('local', 'processos'),
+                        default='local',
+                        help='redução em árvore dos totais por autor e de '
+                             'todos os livros: no próprio processo ou com '
+                             'os pares de cada nível combinados em paralelo '
+                             'nos processos de --workers')
+    parser.add_argument('--backend-caracteres', choices=BACKENDS_CARACTERES,
+                        default=BACKEND_CARACTERES_PADRÃO,
+                        help='cálculo das estatísticas de caracteres: linha '
+                             'a linha (python) ou sobre o livro inteiro, com '
+                             'NumPy caso disponível (numpy)')
+    parser.add_argument('--tamanho-lote', type=int,
+                        default=TAMANHO_LOTE_LINHAS,
+                        help='número de linhas distintas analisadas por '
+                             'tarefa')
+    parser.add_argument('--resumo-tokens', type=int, default=None,
+                        metavar='K',
+                        help='mantém, de cada livro, somente os K tokens '
+                             'mais frequentes, com contagens estimadas que '
+                             'excedem as reais em no máximo N/K para N '
+                             'tokens no livro, e os tokens mais longos, em '
+                             'vez dos histogramas exatos')
+    parser.add_argument('--aproximado', action='store_true',
+                        help='modo aproximado: contagens de tokens por '
+                             'Count-Min Sketch, além do resumo dos tokens '
+                             'mais frequentes, e número de tokens '
+                             'distintos por HyperLogLog, com memória fixa '
+                             'por livro')
+    parser.add_argument('--erro-aproximação', type=float,
+                        default=ERRO_PADRÃO, metavar='ERRO',
+                        help='erro máximo das contagens do modo aproximado, '
+                             'relativo ao total de tokens do livro')
+    parser.add_argument('--confiança-aproximação', type=float,
+                        default=CONFIANÇA_PADRÃO, metavar='PROBABILIDADE',
+                        help='probabilidade de cada contagem do modo '
+                             'aproximado respeitar o erro máximo')
+    parser.add_argument('--sem-cache-resultados', action='store_true',
+                        help='processa e analisa todos os livros, sem '
+                             'consultar nem atualizar as estatísticas '
+                             'armazenadas dos livros cujo texto não mudou')
+    parser.add_argument('--incremental', action='store_true',
+                        help='modo incremental: lê e analisa somente os '
+                             'livros novos ou alterados desde a execução '
+                             'anterior e soma suas estatísticas aos totais '
+                             'armazenados dos autores')
     args = parser.parse_args(argv[1:])
+    if args.incremental and args.sem_cache_resultados:
+        # Os totais de um autor com um livro alterado são reconstruídos
+        # a partir das estatísticas armazenadas dos demais livros.
+        parser.error('--incremental requer as estatísticas armazenadas '
+                     'dos livros e não pode ser usado com '
+                     '--sem-cache-resultados')
+    if args.tamanho_lote < 1:
+        parser.error('--tamanho-lote deve ser positivo')
+    if args.resumo_tokens is not None and args.resumo_tokens < 1:
+        parser.error('--resumo-tokens deve ser positivo')
+    if not 0 < args.erro_aproximação < 1:
+        parser.error('--erro-aproximação deve estar entre 0 e 1')
+    if not 0 < args.confiança_aproximação < 1:
+        parser.error('--confiança-aproximação deve estar entre 0 e 1')
+
+    # Modelo dos histogramas de tokens: exatos, resumidos ou
+    # aproximados.
+    modelo_tokens = cria_modelo_tokens(
+        args.resumo_tokens, args.aproximado, args.erro_aproximação,
+        args.confiança_aproximação)
 
     try:
-        DIRETÓRIO_RAIZ.mkdir(mode=0o755, parents=True, exist_ok=True)
+        args.diretório.mkdir(mode=0o755, parents=True, exist_ok=True)
     except FileExistsError:
-        sys.stderr.write(f"ERRO: '{DIRETÓRIO_RAIZ}' existe e não é "
+        sys.stderr.write(f"ERRO: '{args.diretório}' existe e não é "
                          f"diretório. Abortando...\n")
         return
 
+    # Estatísticas dos livros analisados em execuções anteriores com a
+    # mesma configuração, consultadas pelo hash do texto de cada livro.
+    cache = None
+    if not args.sem_cache_resultados:
+        cache = CacheResultados(args.diretório, modelo_tokens)
+
+    # No modo incremental, os livros já analisados em execuções
+    # anteriores com a mesma configuração não são lidos nem analisados.
+    manifesto = None
+    if args.incremental:
+        manifesto = ManifestoIncremental(args.diretório, modelo_tokens)
+
     textos_livros = None
 
     # Caso autores sejam passados como argumento, serão buscados.
     # Caso contrário, será utilizado o default de coleta.
+    # Uma única sessão e um único limitador são utilizados por todos
+    # os downloads da execução.
     autores = frozenset(args.nome_autor)
-    if autores:
-        textos_livros = await coleta(autores)
+    limitador = LimitadorPorHost(args.intervalo_requisições)
+    async with cria_sessão(
+            limite_por_host=args.limite_conexões_por_host,
+            ttl_cache_dns=args.ttl_dns) as sessão:
+        # Caso solicitado, os livros são distribuídos entre mirrors,
+        # cada um com seu próprio intervalo entre requisições.
+        urls_espelhos = list(args.urls_espelhos)
+        if args.espelhos:
+            urls_espelhos.extend(
+                await obtém_espelhos(sessão, limitador,
+                                     url_base=args.url_base,
+                                     diretório=args.diretório))
+        espelhos = None
+        if urls_espelhos:
+            espelhos = ConjuntoEspelhos(urls_espelhos,
+                                        args.intervalo_requisições)
+
+        if autores:
+            textos_livros = await coleta(
+                autores, sessão=sessão, limitador=limitador,
+                espelhos=espelhos,
+                idade_máxima_índice=args.idade_máxima_índice,
+                url_base=args.url_base, diretório=args.diretório,
+                manifesto=manifesto)
+        else:
+            textos_livros = await coleta(
+                sessão=sessão, limitador=limitador, espelhos=espelhos,
+                idade_máxima_índice=args.idade_máxima_índice,
+                url_base=args.url_base, diretório=args.diretório,
+                manifesto=manifesto)
+
+    # Caso solicitado, o processamento e a análise, limitados pela CPU,
+    # são distribuídos entre processos.
+    if args.workers > 0:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.workers) as executor:
+            estatísticas_por_livro = await processa_e_analisa(
+                textos_livros, executor=executor,
+                memória_compartilhada=args.transporte == 'memória',
+                backend_caracteres=args.backend_caracteres,
+                tamanho_lote=args.tamanho_lote,
+                modelo_tokens=modelo_tokens, cache=cache)
+            # Caso solicitado, os totais por autor e de todos os livros
+            # são reduzidos em paralelo nos mesmos processos.
+            totais = await agrega(
+                estatísticas_por_livro,
+                executor=(executor if args.agregação == 'processos'
+                          else None),
+                manifesto=manifesto, cache=cache)
     else:
-        textos_livros = await coleta()
-
-    estatísticas_por_livro = await processa_e_analisa(textos_livros)
-
-    await exibe(estatísticas_por_livro)
+        estatísticas_por_livro = await processa_e_analisa(
+            textos_livros, backend_caracteres=args.backend_caracteres,
+            tamanho_lote=args.tamanho_lote,
+            modelo_tokens=modelo_tokens, cache=cache)
+        totais = await agrega(estatísticas_por_livro, manifesto=manifesto,
+                              cache=cache)
+
+    await exibe(estatísticas_por_livro, totais=totais,
+                livros_por_autor=(manifesto.livros_por_autor()
+                                  if manifesto is not None else None))
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ etapas do processo.
 """
 
 import argparse
+import pathlib
 import sys
 
 from _base_estatísticas_livro_síncrono import (
@@ -13,8 +14,18 @@ from _base_estatísticas_livro_síncrono import (
     coleta,
     processa_livro,
     analisa_livro,
+    agrega,
     exibe,
 )
+from _cache_resultados import CacheResultados
+from _esboços import CONFIANÇA_PADRÃO, ERRO_PADRÃO
+from _estatísticas import cria_modelo_tokens
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    BACKENDS_CARACTERES,
+)
+from _incremental import ManifestoIncremental
+from _resolução_url import URL_BASE_SÍTIO
 
 
 DESCRIÇÃO = ''.join("""\
@@ -24,11 +35,12 @@ etapas do processo.
 """.replace('\n', ' ').replace('  ', ' '))
 
 
-def processa(textos_livros, saída=sys.stderr):
+def processa(textos_livros, saída=sys.stderr, cache=None):
     """Efetua o processamento dos textos dos livros solicitados
        disponíveis no Project Gutenberg: extrai o texto entre
        o cabeçalho e o rodapé inserido pelo Project Gutenberg em
-       cada livro.
+       cada livro. Livros cujas estatísticas estejam em cache não são
+       processados.
 
     Args:
         textos_livros: dict cujas chaves são tuplas
@@ -38,17 +50,30 @@ def processa(textos_livros, saída=sys.stderr):
                        txt dos livros.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        cache: instância de CacheResultados das estatísticas de
+               livros já analisados ou None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
         nome do autor) de livros solicitados disponíveis no
-        Project Gutenberg e cujos respectivos valores são list das
-        linhas a serem analisadas de cada livro.
+        Project Gutenberg e cujos respectivos valores são CorpoLivro
+        das linhas a serem analisadas de cada livro.
     """
 
     # Variável que irá armazenar o resultado intermediário.
     resultados_texto = {}
 
+    # Os livros cujo texto não mudou desde a última análise seguem
+    # diretamente para a exibição, com as estatísticas armazenadas.
+    if cache is not None:
+        textos_livros = {tupla_livro: textos_livros[tupla_livro]
+                         for tupla_livro in textos_livros
+                         if cache.consulta(tupla_livro,
+                                           textos_livros[tupla_livro],
+                                           saída) is None}
+    if not textos_livros:
+        return resultados_texto
+
     # Obtém o processamento de todos os livros.
     plural = len(textos_livros) > 1
     saída.write(f"Processando o corte do"
@@ -71,7 +96,8 @@ def processa(textos_livros, saída=sys.stderr):
     # Uma vez determinada a primeira linha do título e a última linha
     # com caracteres visíveis, devolve um dict cuja chaves são tuplas
     # (nome do livro, nome do autor) e cujos respectivos valores são
-    # list contendo todas as linhas a serem analisadas do livro.
+    # CorpoLivro contendo todas as linhas a serem analisadas do livro,
+    # visões sobre o texto bruto sem cópias das linhas.
     linhas_a_analisar_por_livro = {tupla_livro: resultado
                                    for tupla_livro in resultados_texto
                                    for resultado in
@@ -81,19 +107,29 @@ def processa(textos_livros, saída=sys.stderr):
     return linhas_a_analisar_por_livro
 
 
-def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
+def analisa(linhas_a_analisar_por_livro, saída=sys.stderr,
+            backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+            modelo_tokens=None, cache=None):
     """Efetua a análise dos textos de livros: efetua uma análise
        estatística arbitrária para fins de exemplo no texto de
-       cada livro.
+       cada livro. As estatísticas obtidas são armazenadas em cache e
+       somadas às encontradas em cache por processa.
 
     Args:
         linhas_a_analisar_por_livro: dict cujas chaves são tuplas
                                      (nome do livro, nome do autor) e
-                                     cujos respectivos valores são list
-                                     das linhas a serem analisadas de
-                                     cada livro.
+                                     cujos respectivos valores são
+                                     CorpoLivro das linhas a serem
+                                     analisadas de cada livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados passada a processa ou
+               None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
@@ -104,6 +140,12 @@ def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
     # Variável que irá armazenar o resultado intermediário.
     resultados_texto = {}
 
+    # Estatísticas dos livros encontrados em cache por processa.
+    encontradas = {} if cache is None else cache.encontradas
+
+    if not linhas_a_analisar_por_livro:
+        return dict(encontradas)
+
     # Obtém o processamento de todos os livros.
     plural = len(linhas_a_analisar_por_livro) > 1
     saída.write(f"Analisando as linhas do"
@@ -114,7 +156,10 @@ def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
     for tupla_livro in linhas_a_analisar_por_livro:
         resultado = analisa_livro(tupla_livro,
                                   linhas_a_analisar_por_livro[tupla_livro],
-                                  saída)
+                                  saída, backend_caracteres,
+                                  modelo_tokens)
+        if cache is not None:
+            cache.armazena(tupla_livro, resultado)
         if resultado:
             resultados_texto[tupla_livro] = resultado
     saída.write(f"Analisadas as linhas do"
@@ -125,13 +170,14 @@ def analisa(linhas_a_analisar_por_livro, saída=sys.stderr):
 
     # Uma vez analisadas as linhas do texto do livro, devolve um dict
     # cujas chaves são tuplas (nome do livro, nome do autor) e cujos
-    # respectivos valores são dict contendo as estatísticas obtidas
-    # por cada livro.
+    # respectivos valores são instâncias de Estatísticas obtidas por
+    # cada livro.
     estatísticas_por_livro = {tupla_livro: resultado
                               for tupla_livro in resultados_texto
                               for resultado in
                               (resultados_texto[tupla_livro], )
                               if resultado}
+    estatísticas_por_livro.update(encontradas)
 
     return estatísticas_por_livro
 
@@ -148,30 +194,121 @@ def main(argv):
     parser = argparse.ArgumentParser(description=DESCRIÇÃO)
     parser.add_argument('nome_autor', metavar='NOME_AUTOR', type=str,
                         nargs='*', help='autor cujos livros serão buscados')
+    parser.add_argument('--idade-máxima-índice', type=float, default=None,
+                        metavar='SEGUNDOS',
+                        help='idade máxima do GUTINDEX.ALL armazenado antes '
+                             'de ser revalidado por um GET condicional')
+    parser.add_argument('--url-base', default=URL_BASE_SÍTIO, metavar='URL',
+                        help='URL base do sítio de onde o índice e os livros '
+                             'são obtidos (por exemplo, a de '
+                             'servidor_gutenberg_local.py)')
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_RAIZ,
+                        help='diretório onde os arquivos obtidos são '
+                             'armazenados')
+    parser.add_argument('--backend-caracteres', choices=BACKENDS_CARACTERES,
+                        default=BACKEND_CARACTERES_PADRÃO,
+                        help='cálculo das estatísticas de caracteres: linha '
+                             'a linha (python) ou sobre o livro inteiro, com '
+                             'NumPy caso disponível (numpy)')
+    parser.add_argument('--resumo-tokens', type=int, default=None,
+                        metavar='K',
+                        help='mantém, de cada livro, somente os K tokens '
+                             'mais frequentes, com contagens estimadas que '
+                             'excedem as reais em no máximo N/K para N '
+                             'tokens no livro, e os tokens mais longos, em '
+                             'vez dos histogramas exatos')
+    parser.add_argument('--aproximado', action='store_true',
+                        help='modo aproximado: contagens de tokens por '
+                             'Count-Min Sketch, além do resumo dos tokens '
+                             'mais frequentes, e número de tokens '
+                             'distintos por HyperLogLog, com memória fixa '
+                             'por livro')
+    parser.add_argument('--erro-aproximação', type=float,
+                        default=ERRO_PADRÃO, metavar='ERRO',
+                        help='erro máximo das contagens do modo aproximado, '
+                             'relativo ao total de tokens do livro')
+    parser.add_argument('--confiança-aproximação', type=float,
+                        default=CONFIANÇA_PADRÃO, metavar='PROBABILIDADE',
+                        help='probabilidade de cada contagem do modo '
+                             'aproximado respeitar o erro máximo')
+    parser.add_argument('--sem-cache-resultados', action='store_true',
+                        help='processa e analisa todos os livros, sem '
+                             'consultar nem atualizar as estatísticas '
+                             'armazenadas dos livros cujo texto não mudou')
+    parser.add_argument('--incremental', action='store_true',
+                        help='modo incremental: lê e analisa somente os '
+                             'livros novos ou alterados desde a execução '
+                             'anterior e soma suas estatísticas aos totais '
+                             'armazenados dos autores')
     args = parser.parse_args(argv[1:])
+    if args.incremental and args.sem_cache_resultados:
+        # Os totais de um autor com um livro alterado são reconstruídos
+        # a partir das estatísticas armazenadas dos demais livros.
+        parser.error('--incremental requer as estatísticas armazenadas '
+                     'dos livros e não pode ser usado com '
+                     '--sem-cache-resultados')
+    if args.resumo_tokens is not None and args.resumo_tokens < 1:
+        parser.error('--resumo-tokens deve ser positivo')
+    if not 0 < args.erro_aproximação < 1:
+        parser.error('--erro-aproximação deve estar entre 0 e 1')
+    if not 0 < args.confiança_aproximação < 1:
+        parser.error('--confiança-aproximação deve estar entre 0 e 1')
+
+    # Modelo dos histogramas de tokens: exatos, resumidos ou
+    # aproximados.
+    modelo_tokens = cria_modelo_tokens(
+        args.resumo_tokens, args.aproximado, args.erro_aproximação,
+        args.confiança_aproximação)
 
     try:
-        DIRETÓRIO_RAIZ.mkdir(mode=0o755, parents=True, exist_ok=True)
+        args.diretório.mkdir(mode=0o755, parents=True, exist_ok=True)
     except FileExistsError:
-        sys.stderr.write(f"ERRO: '{DIRETÓRIO_RAIZ}' existe e não é "
+        sys.stderr.write(f"ERRO: '{args.diretório}' existe e não é "
                          f"diretório. Abortando...\n")
         return
 
+    # Estatísticas dos livros analisados em execuções anteriores com a
+    # mesma configuração, consultadas pelo hash do texto de cada livro.
+    cache = None
+    if not args.sem_cache_resultados:
+        cache = CacheResultados(args.diretório, modelo_tokens)
+
+    # No modo incremental, os livros já analisados em execuções
+    # anteriores com a mesma configuração não são lidos nem analisados.
+    manifesto = None
+    if args.incremental:
+        manifesto = ManifestoIncremental(args.diretório, modelo_tokens)
+
     textos_livros = None
 
     # Caso autores sejam passados como argumento, serão buscados.
     # Caso contrário, será utilizado o default de coleta.
     autores = frozenset(args.nome_autor)
     if autores:
-        textos_livros = coleta(autores)
+        textos_livros = coleta(
+            autores, idade_máxima_índice=args.idade_máxima_índice,
+            url_base=args.url_base, diretório=args.diretório,
+            manifesto=manifesto)
     else:
-        textos_livros = coleta()
+        textos_livros = coleta(
+            idade_máxima_índice=args.idade_máxima_índice,
+            url_base=args.url_base, diretório=args.diretório,
+            manifesto=manifesto)
+
+    linhas_a_analisar_por_livro = processa(textos_livros, cache=cache)
 
-    linhas_a_analisar_por_livro = processa(textos_livros)
+    estatísticas_por_livro = analisa(
+        linhas_a_analisar_por_livro,
+        backend_caracteres=args.backend_caracteres,
+        modelo_tokens=modelo_tokens, cache=cache)
 
-    estatísticas_por_livro = analisa(linhas_a_analisar_por_livro)
+    totais = agrega(estatísticas_por_livro, manifesto=manifesto,
+                    cache=cache)
 
-    exibe(estatísticas_por_livro)
+    exibe(estatísticas_por_livro, totais=totais,
+          livros_por_autor=(manifesto.livros_por_autor()
+                            if manifesto is not None else None))
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ livro.
 """
 
 import argparse
+import pathlib
 import sys
 
 from _base_estatísticas_livro_síncrono import (
@@ -13,8 +14,18 @@ from _base_estatísticas_livro_síncrono import (
     coleta,
     processa_livro,
     analisa_livro,
+    agrega,
     exibe,
 )
+from _cache_resultados import CacheResultados
+from _esboços import CONFIANÇA_PADRÃO, ERRO_PADRÃO
+from _estatísticas import cria_modelo_tokens
+from _estatísticas_caracteres import (
+    BACKEND_CARACTERES_PADRÃO,
+    BACKENDS_CARACTERES,
+)
+from _incremental import ManifestoIncremental
+from _resolução_url import URL_BASE_SÍTIO
 
 
 DESCRIÇÃO = ''.join("""\
@@ -24,7 +35,10 @@ livro.
 """.replace('\n', ' ').replace('  ', ' '))
 
 
-def processa_e_analisa_por_livro(tupla_livro, texto_bruto, saída):
+def processa_e_analisa_por_livro(
+        tupla_livro, texto_bruto, saída,
+        backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+        modelo_tokens=None, cache=None):
     """Efetua o processamento e a análise do textos de um livro
        solicitado disponível no Project Gutenberg: extrai o texto
        entre o cabeçalho e o rodapé inserido pelo Project Gutenberg
@@ -36,15 +50,29 @@ def processa_e_analisa_por_livro(tupla_livro, texto_bruto, saída):
         texto_bruto: str da versão txt do livro.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados consultada antes do
+               processamento e atualizada após a análise, ou None.
 
     Returns:
-        Entrega o dict contendo todas as estatísticas analisadas do
-        livro.
+        Entrega a instância de Estatísticas contendo todas as
+        estatísticas analisadas do livro.
     """
 
     # Variável que irá armazenar o resultado intermediário.
     resultado_análise = {}
 
+    # Caso o texto do livro não tenha mudado desde a última análise,
+    # as estatísticas armazenadas são utilizadas diretamente.
+    if cache is not None:
+        estatísticas = cache.consulta(tupla_livro, texto_bruto, saída)
+        if estatísticas is not None:
+            return estatísticas
+
     linhas_a_analisar = processa_livro(tupla_livro,
                                        texto_bruto,
                                        saída)
@@ -52,12 +80,21 @@ def processa_e_analisa_por_livro(tupla_livro, texto_bruto, saída):
     if not linhas_a_analisar:
         return resultado_análise
 
-    return analisa_livro(tupla_livro,
-                         linhas_a_analisar,
-                         saída)
+    estatísticas = analisa_livro(tupla_livro,
+                                 linhas_a_analisar,
+                                 saída,
+                                 backend_caracteres,
+                                 modelo_tokens)
+
+    if cache is not None:
+        cache.armazena(tupla_livro, estatísticas)
+
+    return estatísticas
 
 
-def processa_e_analisa(textos_livros, saída=sys.stderr):
+def processa_e_analisa(textos_livros, saída=sys.stderr,
+                       backend_caracteres=BACKEND_CARACTERES_PADRÃO,
+                       modelo_tokens=None, cache=None):
     """Efetua o processamento e a análise dos textos dos livros
        solicitados disponíveis no Project Gutenberg: extrai o texto
        entre o cabeçalho e o rodapé inserido pelo Project Gutenberg em
@@ -72,6 +109,13 @@ def processa_e_analisa(textos_livros, saída=sys.stderr):
                        txt dos livros.
         saída: instância com métodos write e flush para exibição do
                andamento do método.
+        backend_caracteres: str de BACKENDS_CARACTERES, a forma de
+                            cálculo das estatísticas de caracteres.
+        modelo_tokens: instância vazia, de cria_modelo_tokens, do tipo
+                       de histograma de tokens a ser utilizado, ou None
+                       para histogramas exatos.
+        cache: instância de CacheResultados das estatísticas de
+               livros já analisados ou None.
 
     Returns:
         Instância de dict cujas chaves são tuplas (nome do livro,
@@ -86,14 +130,17 @@ def processa_e_analisa(textos_livros, saída=sys.stderr):
     for tupla_livro in textos_livros:
         resultado = processa_e_analisa_por_livro(tupla_livro,
                                                  textos_livros[tupla_livro],
-                                                 saída)
+                                                 saída,
+                                                 backend_caracteres,
+                                                 modelo_tokens,
+                                                 cache)
         if resultado:
             resultados_texto[tupla_livro] = resultado
 
     # Uma vez analisadas as linhas do texto do livro, devolve um dict
     # cujas chaves são tuplas (nome do livro, nome do autor) e cujos
-    # respectivos valores são dict contendo as estatísticas obtidas
-    # por cada livro.
+    # respectivos valores são instâncias de Estatísticas obtidas por
+    # cada livro.
     estatísticas_por_livro = {tupla_livro: resultado
                               for tupla_livro in resultados_texto
                               for resultado in
@@ -115,28 +162,118 @@ def main(argv):
     parser = argparse.ArgumentParser(description=DESCRIÇÃO)
     parser.add_argument('nome_autor', metavar='NOME_AUTOR', type=str,
                         nargs='*', help='autor cujos livros serão buscados')
+    parser.add_argument('--idade-máxima-índice', type=float, default=None,
+                        metavar='SEGUNDOS',
+                        help='idade máxima do GUTINDEX.ALL armazenado antes '
+                             'de ser revalidado por um GET condicional')
+    parser.add_argument('--url-base', default=URL_BASE_SÍTIO, metavar='URL',
+                        help='URL base do sítio de onde o índice e os livros '
+                             'são obtidos (por exemplo, a de '
+                             'servidor_gutenberg_local.py)')
+    parser.add_argument('--diretório', type=pathlib.Path,
+                        default=DIRETÓRIO_RAIZ,
+                        help='diretório onde os arquivos obtidos são '
+                             'armazenados')
+    parser.add_argument('--backend-caracteres', choices=BACKENDS_CARACTERES,
+                        default=BACKEND_CARACTERES_PADRÃO,
+                        help='cálculo das estatísticas de caracteres: linha '
+                             'a linha (python) ou sobre o livro inteiro, com '
+                             'NumPy caso disponível (numpy)')
+    parser.add_argument('--resumo-tokens', type=int, default=None,
+                        metavar='K',
+                        help='mantém, de cada livro, somente os K tokens '
+                             'mais frequentes, com contagens estimadas que '
+                             'excedem as reais em no máximo N/K para N '
+                             'tokens no livro, e os tokens mais longos, em '
+                             'vez dos histogramas exatos')
+    parser.add_argument('--aproximado', action='store_true',
+                        help='modo aproximado: contagens de tokens por '
+                             'Count-Min Sketch, além do resumo dos tokens '
+                             'mais frequentes, e número de tokens '
+                             'distintos por HyperLogLog, com memória fixa '
+                             'por livro')
+    parser.add_argument('--erro-aproximação', type=float,
+                        default=ERRO_PADRÃO, metavar='ERRO',
+                        help='erro máximo das contagens do modo aproximado, '
+                             'relativo ao total de tokens do livro')
+    parser.add_argument('--confiança-aproximação', type=float,
+                        default=CONFIANÇA_PADRÃO, metavar='PROBABILIDADE',
+                        help='probabilidade de cada contagem do modo '
+                             'aproximado respeitar o erro máximo')
+    parser.add_argument('--sem-cache-resultados', action='store_true',
+                        help='processa e analisa todos os livros, sem '
+                             'consultar nem atualizar as estatísticas '
+                             'armazenadas dos livros cujo texto não mudou')
+    parser.add_argument('--incremental', action='store_true',
+                        help='modo incremental: lê e analisa somente os '
+                             'livros novos ou alterados desde a execução '
+                             'anterior e soma suas estatísticas aos totais '
+                             'armazenados dos autores')
     args = parser.parse_args(argv[1:])
+    if args.incremental and args.sem_cache_resultados:
+        # Os totais de um autor com um livro alterado são reconstruídos
+        # a partir das estatísticas armazenadas dos demais livros.
+        parser.error('--incremental requer as estatísticas armazenadas '
+                     'dos livros e não pode ser usado com '
+                     '--sem-cache-resultados')
+    if args.resumo_tokens is not None and args.resumo_tokens < 1:
+        parser.error('--resumo-tokens deve ser positivo')
+    if not 0 < args.erro_aproximação < 1:
+        parser.error('--erro-aproximação deve estar entre 0 e 1')
+    if not 0 < args.confiança_aproximação < 1:
+        parser.error('--confiança-aproximação deve estar entre 0 e 1')
+
+    # Modelo dos histogramas de tokens: exatos, resumidos ou
+    # aproximados.
+    modelo_tokens = cria_modelo_tokens(
+        args.resumo_tokens, args.aproximado, args.erro_aproximação,
+        args.confiança_aproximação)
 
     try:
-        DIRETÓRIO_RAIZ.mkdir(mode=0o755, parents=True, exist_ok=True)
+        args.diretório.mkdir(mode=0o755, parents=True, exist_ok=True)
     except FileExistsError:
-        sys.stderr.write(f"ERRO: '{DIRETÓRIO_RAIZ}' existe e não é "
+        sys.stderr.write(f"ERRO: '{args.diretório}' existe e não é "
                          f"diretório. Abortando...\n")
         return
 
+    # Estatísticas dos livros analisados em execuções anteriores com a
+    # mesma configuração, consultadas pelo hash do texto de cada livro.
+    cache = None
+    if not args.sem_cache_resultados:
+        cache = CacheResultados(args.diretório, modelo_tokens)
+
+    # No modo incremental, os livros já analisados em execuções
+    # anteriores com a mesma configuração não são lidos nem analisados.
+    manifesto = None
+    if args.incremental:
+        manifesto = ManifestoIncremental(args.diretório, modelo_tokens)
+
     textos_livros = None
 
     # Caso autores sejam passados como argumento, serão buscados.
     # Caso contrário, será utilizado o default de coleta.
     autores = frozenset(args.nome_autor)
     if autores:
-        textos_livros = coleta(autores)
+        textos_livros = coleta(
+            autores, idade_máxima_índice=args.idade_máxima_índice,
+            url_base=args.url_base, diretório=args.diretório,
+            manifesto=manifesto)
     else:
-        textos_livros = coleta()
+        textos_livros = coleta(
+            idade_máxima_índice=args.idade_máxima_índice,
+            url_base=args.url_base, diretório=args.diretório,
+            manifesto=manifesto)
+
+    estatísticas_por_livro = processa_e_analisa(
+        textos_livros, backend_caracteres=args.backend_caracteres,
+        modelo_tokens=modelo_tokens, cache=cache)
 
-    estatísticas_por_livro = processa_e_analisa(textos_livros)
+    totais = agrega(estatísticas_por_livro, manifesto=manifesto,
+                    cache=cache)
 
-    exibe(estatísticas_por_livro)
+    exibe(estatísticas_por_livro, totais=totais,
+          livros_por_autor=(manifesto.livros_por_autor()
+                            if manifesto is not None else None))
 
 
 if __name__ == "__main__":
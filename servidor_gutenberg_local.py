@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita a estrutura do Project Gutenberg
+(GUTINDEX.ALL, MIRRORS.ALL, páginas dos livros, arquivos txt e
+estrutura de diretórios de mirror) com livros sintéticos, para medir a
+etapa de coleta sem depender do sítio real. Latência, banda, taxa de
+erros 5xx e inícios lentos são configuráveis.
+
+Exemplo de uso, em dois terminais:
+
+    $ python3 servidor_gutenberg_local.py --porta 8080 --latência 50
+    $ python3 estatísticas_livro_assíncrono_agrupado_por_livro.py \\
+          --url-base http://127.0.0.1:8080/ --diretório /tmp/local \\
+          --intervalo-requisições 0 'Autor Sintético 1'
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import random
+import re
+import signal
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+from _espelhos import caminho_espelho
+
+
+DESCRIÇÃO = ''.join("""\
+Servidor HTTP local que imita a estrutura do Project Gutenberg com
+livros sintéticos, com latência, banda, taxa de erros 5xx e inícios
+lentos configuráveis, para medir a etapa de coleta.
+""".replace('\n', ' ').replace('  ', ' '))
+
+# TAMANHO_BLOCO_ENVIO é o tamanho, em bytes, dos blocos em que os
+# corpos das respostas são enviados, para que a banda seja limitada de
+# forma gradual.
+TAMANHO_BLOCO_ENVIO = 16 * 2**10
+
+# PALAVRAS são as palavras dos livros sintéticos; as acentuadas fazem
+# com que os livros servidos em Latin-1 sem charset exercitem a
+# detecção de codificação.
+PALAVRAS = ('a', 'o', 'de', 'que', 'e', 'do', 'da', 'em', 'um', 'para',
+            'com', 'não', 'uma', 'os', 'no', 'se', 'na', 'por', 'mais',
+            'as', 'dos', 'como', 'mas', 'ao', 'ele', 'das', 'à', 'seu',
+            'sua', 'ou', 'quando', 'muito', 'nos', 'já', 'também', 'só',
+            'pelo', 'pela', 'até', 'isso', 'ela', 'entre', 'depois',
+            'sem', 'mesmo', 'aos', 'seus', 'quem', 'nas', 'me', 'esse',
+            'eles', 'você', 'essa', 'num', 'nem', 'suas', 'meu', 'às',
+            'minha', 'numa', 'pelos', 'elas', 'qual', 'nós', 'lhe',
+            'deles', 'essas', 'esses', 'pelas', 'este', 'dele', 'tu',
+            'coração', 'alma', 'olhos', 'Capitu', 'Bentinho', 'Brás',
+            'Cubas', 'memórias', 'póstumas', 'ação', 'razão', 'então')
+
+# LIVRO_ESPELHO é uma regex para o caminho de um livro na estrutura de
+# diretórios de mirror, como '1/2/3/4/12345/12345-0.txt'.
+LIVRO_ESPELHO = re.compile(r'^(?:[0-9]/)+([0-9]+)/([0-9]+)(-0|-8)?\.txt$')
+
+
+class Catálogo:
+    """Livros sintéticos determinísticos: o livro de índice i pertence
+       ao autor 'Autor Sintético {i % autores + 1}' e o seu texto é
+       sempre o mesmo para uma mesma semente.
+    """
+
+    def __init__(self, livros, autores, tamanho_livro, semente):
+        """Inicializa o catálogo.
+
+        Args:
+            livros: número de livros.
+            autores: número de autores entre os quais os livros são
+                     distribuídos.
+            tamanho_livro: tamanho aproximado, em bytes, de cada livro.
+            semente: semente dos textos gerados.
+        """
+        self.livros = livros
+        self.autores = autores
+        self.tamanho_livro = tamanho_livro
+        self.semente = semente
+        self._corpos = {}
+
+    def autor(self, índice):
+        return f"Autor Sintético {índice % self.autores + 1}"
+
+    def título(self, índice):
+        return f"Livro Sintético {índice}"
+
+    def existe(self, índice):
+        return 1 <= índice <= self.livros
+
+    def leiaute(self, índice):
+        """Indica onde a versão txt de um livro é servida, para que
+           todos os caminhos de resolução da coleta sejam exercitados.
+
+        Args:
+            índice: int do índice do livro.
+
+        Returns:
+            'cache' para cache/epub/{i}/pg{i}.txt, 'files' para
+            files/{i}/{i}-0.txt ou 'página' para um link encontrado
+            somente na página do livro.
+        """
+        return ('cache', 'files', 'página')[índice % 3]
+
+    def latin_1(self, índice):
+        """Indica se o livro é servido em Latin-1 sem charset."""
+        return índice % 4 == 0
+
+    def índice(self):
+        """Gera o conteúdo de GUTINDEX.ALL.
+
+        Returns:
+            bytes do arquivo de índices.
+        """
+        linhas = ['GUTINDEX.ALL sintético de servidor_gutenberg_local.py',
+                  '',
+                  'TITLE and AUTHOR                                  '
+                  'ETEXT NO.',
+                  '']
+        for índice in range(self.livros, 0, -1):
+            linhas.append(f"{self.título(índice)}, by "
+                          f"{self.autor(índice)}"
+                          f"{' ' * 8}{índice}")
+        return '\n'.join(linhas).encode('utf-8')
+
+    def espelhos(self, url_base):
+        """Gera o conteúdo de MIRRORS.ALL apontando para o próprio
+           servidor.
+
+        Args:
+            url_base: str da URL base do servidor.
+
+        Returns:
+            bytes da lista de mirrors.
+        """
+        return (f"| continent | nation | location | provider | url |\n"
+                f"| Local | - | - | servidor_gutenberg_local | "
+                f"{url_base}espelho/ |\n").encode('utf-8')
+
+    def página(self, índice, url_texto):
+        """Gera a página HTML de um livro, com o link para a versão txt
+           após os links das demais versões.
+
+        Args:
+            índice: int do índice do livro.
+            url_texto: str do caminho da versão txt.
+
+        Returns:
+            bytes da página.
+        """
+        outros = ''.join(f'<a href="/ebooks/{índice}.{formato}">'
+                         f'{formato}</a>\n'
+                         for formato in ('epub.images', 'epub.noimages',
+                                         'kindle.images', 'html.images'))
+        return (f'<html><head><title>{self.título(índice)}</title>'
+                f'</head><body>\n<h1>{self.título(índice)}</h1>\n'
+                f'{outros}'
+                f'<a href="/files/{índice}/{índice}-readme.txt">readme'
+                f'</a>\n'
+                f'<a href="{url_texto}">Plain Text UTF-8</a>\n'
+                f'</body></html>\n').encode('utf-8')
+
+    def texto(self, índice):
+        """Gera, uma única vez, a versão txt de um livro com cabeçalho
+           e rodapé do Project Gutenberg.
+
+        Args:
+            índice: int do índice do livro.
+
+        Returns:
+            Tupla (bytes do livro, str do charset ou None).
+        """
+        if índice not in self._corpos:
+            aleatório = random.Random(self.semente * 1000003 + índice)
+            título = self.título(índice)
+            linhas = [f"The Project Gutenberg EBook of {título}, by "
+                      f"{self.autor(índice)}",
+                      '',
+                      f"*** START OF THIS PROJECT GUTENBERG EBOOK "
+                      f"{título.upper()} ***",
+                      '',
+                      'Produced by servidor_gutenberg_local.py',
+                      '',
+                      título.upper(),
+                      '']
+            tamanho = 0
+            while tamanho < self.tamanho_livro:
+                if aleatório.random() < .1:
+                    linha = ''
+                else:
+                    linha = ' '.join(aleatório.choice(PALAVRAS)
+                                     for _ in range(aleatório.randint(4,
+                                                                      14)))
+                linhas.append(linha)
+                tamanho += len(linha) + 1
+            linhas.extend(['',
+                           f"End of the Project Gutenberg EBook of "
+                           f"{título}",
+                           '',
+                           f"*** END OF THIS PROJECT GUTENBERG EBOOK "
+                           f"{título.upper()} ***",
+                           ''])
+            texto = '\n'.join(linhas)
+            if self.latin_1(índice):
+                self._corpos[índice] = (texto.encode('latin-1'), None)
+            else:
+                self._corpos[índice] = (texto.encode('utf-8'), 'utf-8')
+        return self._corpos[índice]
+
+
+class Estatísticas:
+    """Contadores das requisições atendidas pelo servidor."""
+
+    def __init__(self):
+        self.status = collections.Counter()
+        self.durações = collections.defaultdict(list)
+        self.bytes_enviados = 0
+        self.em_andamento = 0
+        self.máximo_simultâneo = 0
+        self.início = time.perf_counter()
+
+    def exibe(self, saída):
+        """Exibe os contadores acumulados.
+
+        Args:
+            saída: instância com métodos write e flush para exibição do
+                   resumo.
+        """
+        decorrido = time.perf_counter() - self.início
+        saída.write(f"\nRequisições por tipo e status: "
+                    f"{dict(sorted(self.status.items()))}\n")
+        for tipo in sorted(self.durações):
+            durações = sorted(self.durações[tipo])
+            p95 = durações[min(len(durações) - 1, int(len(durações) * .95))]
+            p99 = durações[min(len(durações) - 1, int(len(durações) * .99))]
+            mediana = statistics.median(durações)
+            saída.write(f"{tipo:>8}: {len(durações)} respostas, "
+                        f"mediana {mediana*1e3:.1f} ms, "
+                        f"p95 {p95*1e3:.1f} ms, p99 {p99*1e3:.1f} ms\n")
+        saída.write(f"Enviados {self.bytes_enviados} bytes em "
+                    f"{decorrido:.1f} s "
+                    f"({self.bytes_enviados / decorrido / 2**20:.2f} "
+                    f"MiB/s); máximo de {self.máximo_simultâneo} "
+                    f"respostas simultâneas.\n")
+        saída.flush()
+
+
+class ServidorGutenberg:
+    """Rotas do servidor local com injeção de latência, limite de
+       banda, erros 5xx e inícios lentos.
+    """
+
+    def __init__(self, catálogo, latência=0., desvio_latência=0.,
+                 banda=0, taxa_erros=0., taxa_início_lento=0.,
+                 atraso_início_lento=0., semente=0):
+        """Inicializa o servidor.
+
+        Args:
+            catálogo: instância de Catálogo.
+            latência: latência média, em segundos, antes dos cabeçalhos.
+            desvio_latência: desvio padrão, em segundos, da latência.
+            banda: limite, em bytes por segundo, de cada resposta; 0
+                   para ilimitado.
+            taxa_erros: fração das requisições de livros respondidas
+                        com 503.
+            taxa_início_lento: fração das respostas com atraso extra
+                               antes dos cabeçalhos.
+            atraso_início_lento: atraso extra, em segundos, dos inícios
+                                 lentos.
+            semente: semente das decisões aleatórias.
+        """
+        self.catálogo = catálogo
+        self.latência = latência
+        self.desvio_latência = desvio_latência
+        self.banda = banda
+        self.taxa_erros = taxa_erros
+        self.taxa_início_lento = taxa_início_lento
+        self.atraso_início_lento = atraso_início_lento
+        self.aleatório = random.Random(semente)
+        self.estatísticas = Estatísticas()
+        self.url_base = ''
+
+        self._índice = catálogo.índice()
+        self._etag_índice = (
+            f'"{hashlib.sha1(self._índice).hexdigest()}"')
+        self._modificação_índice = time.strftime(
+            '%a, %d %b %Y %H:%M:%S GMT', time.gmtime())
+
+    def aplicação(self):
+        """Monta a aplicação com as rotas do servidor.
+
+        Returns:
+            Instância de aiohttp.web.Application.
+        """
+        aplicação = web.Application()
+        rotas = aplicação.router
+        rotas.add_get('/dirs/GUTINDEX.ALL', self.responde_índice)
+        rotas.add_get('/MIRRORS.ALL', self.responde_espelhos)
+        rotas.add_get(r'/ebooks/{id:[0-9]+}', self.responde_página)
+        rotas.add_get(r'/ebooks/{id:[0-9]+}.txt.utf-8',
+                      self.responde_página_texto)
+        rotas.add_get(r'/cache/epub/{id:[0-9]+}/pg{arquivo:[0-9]+}.txt',
+                      self.responde_cache)
+        rotas.add_get(r'/files/{id:[0-9]+}/{arquivo:[0-9]+}'
+                      r'{sufixo:(?:-0|-8)?}.txt',
+                      self.responde_files)
+        rotas.add_get('/espelho/{caminho:.*}', self.responde_espelho)
+        return aplicação
+
+    async def _atrasa(self):
+        """Aguarda a latência sorteada e, eventualmente, um início
+           lento.
+        """
+        atraso = max(0., self.aleatório.gauss(self.latência,
+                                              self.desvio_latência))
+        if self.aleatório.random() < self.taxa_início_lento:
+            atraso += self.atraso_início_lento
+        if atraso:
+            await asyncio.sleep(atraso)
+
+    async def _envia(self, requisição, tipo, corpo, charset=None,
+                     cabeçalhos=None, falhável=True):
+        """Envia uma resposta em blocos, respeitando a banda, após a
+           latência sorteada.
+
+        Args:
+            requisição: instância de aiohttp.web.Request.
+            tipo: str do tipo da resposta, para as estatísticas.
+            corpo: bytes do corpo ou None para 404.
+            charset: str do charset declarado ou None.
+            cabeçalhos: dict de cabeçalhos adicionais.
+            falhável: se a resposta está sujeita à taxa de erros.
+
+        Returns:
+            Instância de aiohttp.web.StreamResponse ou
+            aiohttp.web.Response.
+        """
+        estatísticas = self.estatísticas
+        estatísticas.em_andamento += 1
+        estatísticas.máximo_simultâneo = max(estatísticas.máximo_simultâneo,
+                                             estatísticas.em_andamento)
+        início = time.perf_counter()
+        try:
+            await self._atrasa()
+            if falhável and self.aleatório.random() < self.taxa_erros:
+                estatísticas.status[(tipo, 503)] += 1
+                return web.Response(status=503)
+            if corpo is None:
+                estatísticas.status[(tipo, 404)] += 1
+                return web.Response(status=404)
+
+            resposta = web.StreamResponse(headers=cabeçalhos)
+            resposta.content_type = 'text/plain'
+            if charset is not None:
+                resposta.charset = charset
+            resposta.content_length = len(corpo)
+            await resposta.prepare(requisição)
+            for posição in range(0, len(corpo), TAMANHO_BLOCO_ENVIO):
+                bloco = corpo[posição:posição + TAMANHO_BLOCO_ENVIO]
+                await resposta.write(bloco)
+                estatísticas.bytes_enviados += len(bloco)
+                if self.banda:
+                    await asyncio.sleep(len(bloco) / self.banda)
+            await resposta.write_eof()
+            estatísticas.status[(tipo, 200)] += 1
+            estatísticas.durações[tipo].append(
+                time.perf_counter() - início)
+            return resposta
+        finally:
+            estatísticas.em_andamento -= 1
+
+    def _livro(self, requisição, leiaute):
+        """Obtém o corpo de um livro caso seja servido no leiaute
+           requisitado.
+
+        Args:
+            requisição: instância de aiohttp.web.Request.
+            leiaute: str do leiaute da rota.
+
+        Returns:
+            Tupla (bytes do livro ou None, str do charset ou None).
+        """
+        índice = int(requisição.match_info['id'])
+        arquivo = int(requisição.match_info.get('arquivo', índice))
+        if (índice != arquivo or not self.catálogo.existe(índice) or
+                self.catálogo.leiaute(índice) != leiaute):
+            return None, None
+        return self.catálogo.texto(índice)
+
+    async def responde_índice(self, requisição):
+        if requisição.headers.get('If-None-Match') == self._etag_índice:
+            self.estatísticas.status[('índice', 304)] += 1
+            return web.Response(status=304,
+                                headers={'ETag': self._etag_índice})
+        return await self._envia(
+            requisição, 'índice', self._índice, 'utf-8',
+            {'ETag': self._etag_índice,
+             'Last-Modified': self._modificação_índice},
+            falhável=False)
+
+    async def responde_espelhos(self, requisição):
+        return await self._envia(
+            requisição, 'espelhos', self.catálogo.espelhos(self.url_base),
+            'utf-8', falhável=False)
+
+    async def responde_página(self, requisição):
+        índice = int(requisição.match_info['id'])
+        if not self.catálogo.existe(índice):
+            return await self._envia(requisição, 'página', None)
+        leiaute = self.catálogo.leiaute(índice)
+        url_texto = {'cache': f"/cache/epub/{índice}/pg{índice}.txt",
+                     'files': f"/files/{índice}/{índice}-0.txt",
+                     'página': f"/ebooks/{índice}.txt.utf-8"}[leiaute]
+        return await self._envia(requisição, 'página',
+                                 self.catálogo.página(índice, url_texto),
+                                 'utf-8')
+
+    async def responde_página_texto(self, requisição):
+        return await self._envia(requisição, 'livro',
+                                 *self._livro(requisição, 'página'))
+
+    async def responde_cache(self, requisição):
+        return await self._envia(requisição, 'livro',
+                                 *self._livro(requisição, 'cache'))
+
+    async def responde_files(self, requisição):
+        if requisição.match_info['sufixo'] != '-0':
+            return await self._envia(requisição, 'livro', None)
+        return await self._envia(requisição, 'livro',
+                                 *self._livro(requisição, 'files'))
+
+    async def responde_espelho(self, requisição):
+        # Nos mirrors, todos os livros existem como {i}-0.txt na
+        # estrutura de diretórios por dígito.
+        correspondência = LIVRO_ESPELHO.match(requisição.match_info['caminho'])
+        corpo = charset = None
+        if correspondência is not None:
+            diretório, arquivo, sufixo = correspondência.groups()
+            índice = int(arquivo)
+            if (diretório == arquivo and sufixo == '-0' and
+                    self.catálogo.existe(índice) and
+                    requisição.match_info['caminho'] ==
+                    f"{caminho_espelho(índice)}{índice}-0.txt"):
+                corpo, charset = self.catálogo.texto(índice)
+        return await self._envia(requisição, 'espelho', corpo, charset)
+
+
+async def main(argv):
+    """Função main para servir o Project Gutenberg sintético até
+       SIGINT ou até o fim da duração solicitada.
+
+    Args:
+        argv: lista de argumentos a serem tratados.
+    """
+
+    parser = argparse.ArgumentParser(description=DESCRIÇÃO)
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='endereço em que o servidor escuta')
+    parser.add_argument('--porta', type=int, default=8080,
+                        help='porta em que o servidor escuta (0 escolhe '
+                             'uma porta livre)')
+    parser.add_argument('--livros', type=int, default=300,
+                        help='número de livros sintéticos')
+    parser.add_argument('--autores', type=int, default=10,
+                        help='número de autores sintéticos')
+    parser.add_argument('--tamanho-livro', type=int, default=400 * 2**10,
+                        help='tamanho aproximado, em bytes, de cada livro')
+    parser.add_argument('--latência', type=float, default=0.,
+                        metavar='MS',
+                        help='latência média, em milissegundos, antes dos '
+                             'cabeçalhos de cada resposta')
+    parser.add_argument('--desvio-latência', type=float, default=0.,
+                        metavar='MS',
+                        help='desvio padrão, em milissegundos, da latência')
+    parser.add_argument('--banda', type=float, default=0.,
+                        metavar='KIB_POR_SEGUNDO',
+                        help='limite de banda de cada resposta, em KiB/s '
+                             '(0 para ilimitado)')
+    parser.add_argument('--taxa-erros', type=float, default=0.,
+                        help='fração das requisições de livros e páginas '
+                             'respondidas com 503')
+    parser.add_argument('--taxa-início-lento', type=float, default=0.,
+                        help='fração das respostas com início lento')
+    parser.add_argument('--atraso-início-lento', type=float, default=2.,
+                        metavar='SEGUNDOS',
+                        help='atraso extra dos inícios lentos')
+    parser.add_argument('--semente', type=int, default=0,
+                        help='semente dos livros e das falhas sorteadas')
+    parser.add_argument('--duração', type=float, default=None,
+                        metavar='SEGUNDOS',
+                        help='encerra o servidor após a duração informada')
+    args = parser.parse_args(argv[1:])
+
+    catálogo = Catálogo(args.livros, args.autores, args.tamanho_livro,
+                        args.semente)
+    servidor = ServidorGutenberg(
+        catálogo,
+        latência=args.latência / 1e3,
+        desvio_latência=args.desvio_latência / 1e3,
+        banda=args.banda * 2**10,
+        taxa_erros=args.taxa_erros,
+        taxa_início_lento=args.taxa_início_lento,
+        atraso_início_lento=args.atraso_início_lento,
+        semente=args.semente)
+
+    executor = web.AppRunner(servidor.aplicação())
+    await executor.setup()
+    sítio = web.TCPSite(executor, args.host, args.porta)
+    await sítio.start()
+    host, porta = executor.addresses[0][:2]
+    servidor.url_base = f"http://{host}:{porta}/"
+
+    sys.stderr.write(f"Servindo {args.livros} livros de {args.autores} "
+                     f"autores em '{servidor.url_base}'.\n")
+    sys.stderr.flush()
+
+    parada = asyncio.Event()
+    try:
+        asyncio.get_event_loop().add_signal_handler(signal.SIGINT,
+                                                    parada.set)
+    except NotImplementedError:
+        pass
+    try:
+        await asyncio.wait_for(parada.wait(), args.duração)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        await executor.cleanup()
+        servidor.estatísticas.exibe(sys.stderr)
+
+
+if __name__ == "__main__":
+    LOOP = asyncio.get_event_loop()
+    LOOP.run_until_complete(main(sys.argv))
+    LOOP.close()